@@ -1,23 +1,40 @@
 import asyncio
+import base64
+import json
 import uuid
 from contextlib import asynccontextmanager
-from typing import List
-
-from fastapi import FastAPI, HTTPException, Body, responses, status
-from fastapi import Depends, FastAPI
-from openai import OpenAI
-from db import User, create_db_and_tables, JobDescription, get_async_session
+from datetime import datetime, timezone
+from typing import AsyncGenerator, List, Literal, Optional, Union
+
+from fastapi import FastAPI, HTTPException, Body, Response, responses, status
+from fastapi import Depends, FastAPI, Query
+from fastapi.encoders import jsonable_encoder
+from db import User, run_migrations, JobDescription, BeautifiedVariant, get_async_session, \
+    load_compression_dictionaries, init_replica_router, close_replica_router, read_session_maker, record_write
 from schemas import UserCreate, UserRead, UserUpdate, JobDescriptionRequest, BeautifiedJobDescriptionResponse, \
-    JobDescriptionResponse
-from users import auth_backend, current_active_user, fastapi_users
+    JobDescriptionResponse, BatchBeautifiedJobDescriptionItem, BatchBeautifiedJobDescriptionResponse, \
+    JobStatusResponse, JobDescriptionSummary, SQLStatementStats, SQLStatementStatsResponse
+from users import auth_backend, close_password_helper, current_active_user, fastapi_users, init_password_helper
 import os
 from dotenv import load_dotenv
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import session
-from sqlalchemy import select,text
+from sqlalchemy.orm import selectinload, session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import delete, func, insert, select, text, tuple_, update
 from  db import engine,async_session_maker
 from sqlalchemy.exc import OperationalError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from llm import Completion, CompletionBackend, close_completion_client, get_completion_client, init_completion_client, \
+    LLM_BACKEND, LLM_MODEL
+from jobs import JobQueue, JobRecord, close_job_queue, get_job_queue, init_job_queue
+from cache import ResultCache, close_result_cache, get_result_cache, init_result_cache, make_cache_key, \
+    normalize_text
+import users
+from metrics import CONTENT_TYPE, DB_COMMIT_SECONDS, METRICS_ENABLED, MetricsMiddleware, \
+    instrument_password_helper, registry
+from sqltrace import DEBUG, SQL_SAMPLE_RATE, SQL_SLOW_QUERY_SECONDS, SQL_TRACE_ENABLED, QueryCountMiddleware, \
+    statement_recorder
 
 
 
@@ -25,6 +42,15 @@ from fastapi.middleware.cors import CORSMiddleware
 
 load_dotenv()
 
+BEAUTIFY_MAX_TOKENS = 3800
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", "500"))
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", "8"))
+DB_MIGRATE_ON_STARTUP = os.environ.get("DB_MIGRATE_ON_STARTUP", "true").lower() == "true"
+HISTORY_DEFAULT_LIMIT = 50
+HISTORY_MAX_LIMIT = 500
+SQL_STATEMENTS_DEFAULT_LIMIT = 20
+JOB_EVENTS_TIMEOUT_SECONDS = float(os.environ.get("JOB_EVENTS_TIMEOUT_SECONDS", "600"))
+
 ### Prompt Concepts ##
 
 job_description_template_prompt = """
@@ -53,11 +79,151 @@ job_description_template_prompt = """
 """
 
 
+def build_messages(request: JobDescriptionRequest) -> list[dict]:
+    prompt = f"Job Description: {request.job_description}\nRole: {request.role}\nExperience: {request.experience}\nLocation: {request.location}\n"
+    return [
+        {"role": "system", "content": job_description_template_prompt},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def beautify_cache_key(request: JobDescriptionRequest) -> str:
+    return make_cache_key(
+        LLM_BACKEND,
+        LLM_MODEL,
+        str(request.variants),
+        str(BEAUTIFY_MAX_TOKENS),
+        job_description_template_prompt,
+        normalize_text(request.job_description),
+        normalize_text(request.role, casefold=True),
+        normalize_text(request.experience, casefold=True),
+        normalize_text(request.location, casefold=True),
+    )
+
+
+async def generate_beautified_description(request: JobDescriptionRequest,
+                                          completion_client: CompletionBackend,
+                                          result_cache: Optional[ResultCache],
+                                          bypass_cache: bool = False) -> Completion:
+    key = beautify_cache_key(request)
+    if result_cache is not None and not bypass_cache:
+        cached = await result_cache.get(key)
+        if cached is not None:
+            return Completion(choices=cached, model=LLM_MODEL)
+
+    completion = await completion_client.complete(
+        build_messages(request), n=request.variants, max_tokens=BEAUTIFY_MAX_TOKENS
+    )
+    if result_cache is not None:
+        await result_cache.set(key, completion.choices)
+    return completion
+
+
+def job_description_values(request: JobDescriptionRequest, user_id: uuid.UUID) -> dict:
+    return dict(
+        job_description=request.job_description,
+        role=request.role,
+        experience=request.experience,
+        location=request.location,
+        user_id=user_id
+    )
+
+
+def variant_values(completion: Completion) -> list[dict]:
+    # Usage is only reported for the whole n-choice request: every variant records the
+    # shared prompt, and completion tokens are apportioned by content length.
+    total_length = sum(len(choice) for choice in completion.choices) or 1
+    return [
+        dict(
+            variant_index=index,
+            content=choice,
+            model=completion.model,
+            prompt_tokens=completion.prompt_tokens,
+            completion_tokens=None if completion.completion_tokens is None
+            else round(completion.completion_tokens * len(choice) / total_length),
+        )
+        for index, choice in enumerate(completion.choices)
+    ]
+
+
+def build_job_description(request: JobDescriptionRequest, user_id: uuid.UUID,
+                          completion: Completion) -> JobDescription:
+    return JobDescription(
+        **job_description_values(request, user_id),
+        variants=[BeautifiedVariant(**values) for values in variant_values(completion)],
+    )
+
+
+async def process_beautify_job(job: JobRecord) -> dict:
+    request = JobDescriptionRequest(**job.payload["request"])
+    completion = await generate_beautified_description(
+        request, get_completion_client(), get_result_cache(), bypass_cache=job.payload["bypass_cache"]
+    )
+    async with async_session_maker() as session:
+        new_job = build_job_description(request, job.user_id, completion)
+        session.add(new_job)
+        with DB_COMMIT_SECONDS.time(("beautify_job",)):
+            await session.commit()
+    record_write(job.user_id)
+    return {"id": new_job.id, "beautified_job_description": completion.choices}
+
+
+def job_status(job: JobRecord) -> JobStatusResponse:
+    return JobStatusResponse(id=job.id, status=job.status, result=job.result, error=job.error)
+
+
+def as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # created_at is stored as a naive UTC timestamp: aware datetimes are
+    # converted to UTC before comparing, naive ones are taken as UTC.
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def escape_like(value: str) -> str:
+    # User input matches literally: % and _ are not wildcards.
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def encode_history_cursor(job) -> str:
+    raw = f"{job.created_at.isoformat()}|{job.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_history_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, job_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return as_naive_utc(datetime.fromisoformat(created_at)), int(job_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def get_read_session(user: User = Depends(current_active_user)) -> AsyncGenerator[AsyncSession, None]:
+    # Read-only requests: a replica, unless the user just wrote.
+    async with read_session_maker(user.id)() as session:
+        yield session
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Not needed if you setup a migration system like Alembic
-    await create_db_and_tables()
+    if DB_MIGRATE_ON_STARTUP:
+        await run_migrations()
+    await load_compression_dictionaries()
+    await init_replica_router()
+    await init_password_helper()
+    await init_completion_client()
+    await init_result_cache()
+    await init_job_queue(process_beautify_job)
     yield
+    await close_job_queue()
+    await close_result_cache()
+    await close_completion_client()
+    await close_password_helper()
+    await close_replica_router()
 
 
 
@@ -83,7 +249,7 @@ app.include_router(
     tags=["auth"],
 )
 app.include_router(
-    fastapi_users.get_users_router(UserRead, UserUpdate),
+    fastapi_users.get_users_router(UserRead, UserUpdate, bulk=True, user_create_schema=UserCreate),
     prefix="/users",
     tags=["users"],
 )
@@ -101,8 +267,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST"],
     allow_headers=["Authorization", "Content-Type"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    instrument_password_helper(lambda: users.password_helper)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+if DEBUG and SQL_TRACE_ENABLED:
+    app.add_middleware(QueryCountMiddleware)
+
 
 
 
@@ -118,83 +296,315 @@ async def authenticated_route(user: User = Depends(current_active_user)):
     return {"message": f"Hello {user.email}!"}
 
 
-@app.post("/beautify_job_description", response_model=BeautifiedJobDescriptionResponse)
+@app.get("/admin/sql/statements", response_model=SQLStatementStatsResponse)
+async def sql_statements(limit: int = Query(SQL_STATEMENTS_DEFAULT_LIMIT, ge=1, le=500),
+                         user: User = Depends(fastapi_users.current_user(active=True, superuser=True))):
+    return SQLStatementStatsResponse(
+        sample_rate=SQL_SAMPLE_RATE,
+        slow_query_seconds=SQL_SLOW_QUERY_SECONDS,
+        statements=[
+            SQLStatementStats(
+                statement=stats.statement,
+                calls=stats.calls,
+                slow_calls=stats.slow_calls,
+                total_seconds=stats.total_seconds,
+                mean_seconds=stats.mean_seconds,
+                max_seconds=stats.max_seconds,
+            )
+            for stats in statement_recorder.top(limit)
+        ],
+    )
+
+
+@app.delete("/admin/sql/statements", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_sql_statements(user: User = Depends(fastapi_users.current_user(active=True, superuser=True))):
+    statement_recorder.reset()
+
+
+@app.post("/beautify_job_description", response_model=BeautifiedJobDescriptionResponse,
+          responses={202: {"model": JobStatusResponse}})
 async def beautify_job_description(
         request: JobDescriptionRequest,
         user: User = Depends(fastapi_users.current_user(active=True, verified=False)),
-        session: AsyncSession = Depends(get_async_session)
+        cache: Literal["use", "bypass"] = "use",
+        run_async: bool = Query(False, alias="async"),
+        session: AsyncSession = Depends(get_async_session),
+        completion_client: CompletionBackend = Depends(get_completion_client),
+        result_cache: Optional[ResultCache] = Depends(get_result_cache),
+        job_queue: JobQueue = Depends(get_job_queue)
 ):
     try:
-        prompt = f"Job Description: {request.job_description}\nRole: {request.role}\nExperience: {request.experience}\nLocation: {request.location}\n"
-        client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": job_description_template_prompt},
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=3800,
-            n=3,
-            stop=None,
-            temperature=1,
-            top_p=1,
-            frequency_penalty=0,
-            presence_penalty=0,
-        )
-        beautified_description = [choice.message.content.strip() for choice in response.choices]
-
-        new_job = JobDescription(
-            job_description=request.job_description,
-            role=request.role,
-            experience=request.experience,
-            location=request.location,
-            beautified_description_1=beautified_description[0],
-            beautified_description_2=beautified_description[1],
-            beautified_description_3=beautified_description[2],
-            user_id=user.id
+        if run_async:
+            job = await job_queue.enqueue(
+                user.id, {"request": request.model_dump(), "bypass_cache": cache == "bypass"}
+            )
+            return responses.JSONResponse(status_code=202, content=jsonable_encoder(job_status(job)))
+
+        completion = await generate_beautified_description(
+            request, completion_client, result_cache, bypass_cache=cache == "bypass"
         )
+
+        new_job = build_job_description(request, user.id, completion)
         session.add(new_job)
-        await session.commit()
-        await session.refresh(new_job)
+        with DB_COMMIT_SECONDS.time(("beautify",)):
+            await session.commit()
+        record_write(user.id)
 
-        return {"beautified_job_description": beautified_description[0:3]}
+        return {"beautified_job_description": completion.choices}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
+@app.post("/beautify_job_description/stream")
+async def stream_beautify_job_description(
+        request: JobDescriptionRequest,
+        cache: Literal["use", "bypass"] = "use",
+        user: User = Depends(fastapi_users.current_user(active=True, verified=False)),
+        completion_client: CompletionBackend = Depends(get_completion_client),
+        result_cache: Optional[ResultCache] = Depends(get_result_cache)
+):
+    user_id = user.id
+    key = beautify_cache_key(request)
+
+    async def event_stream():
+        try:
+            cached = None
+            if result_cache is not None and cache != "bypass":
+                cached = await result_cache.get(key)
+
+            if cached is not None:
+                beautified_description = cached
+                for index, description in enumerate(beautified_description):
+                    yield sse_event("delta", {"index": index, "content": description})
+            else:
+                beautified_description = [""] * request.variants
+                async for index, delta in completion_client.stream(
+                        build_messages(request), n=request.variants, max_tokens=BEAUTIFY_MAX_TOKENS
+                ):
+                    beautified_description[index] += delta
+                    yield sse_event("delta", {"index": index, "content": delta})
+
+                beautified_description = [description.strip() for description in beautified_description]
+                if result_cache is not None:
+                    await result_cache.set(key, beautified_description)
+
+            # The request-scoped session is closed before a streamed body is sent,
+            # so the finished row is persisted with a session of its own.
+            async with async_session_maker() as session:
+                new_job = build_job_description(
+                    request, user_id, Completion(choices=beautified_description, model=LLM_MODEL)
+                )
+                session.add(new_job)
+                with DB_COMMIT_SECONDS.time(("beautify_stream",)):
+                    await session.commit()
+            record_write(user_id)
+
+            yield sse_event("done", {"id": new_job.id, "beautified_job_description": beautified_description})
+        except Exception as e:
+            yield sse_event("error", {"detail": f"An error occurred: {str(e)}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/beautify_job_description/batch", response_model=BatchBeautifiedJobDescriptionResponse)
+async def batch_beautify_job_description(
+        requests: List[JobDescriptionRequest],
+        cache: Literal["use", "bypass"] = "use",
+        user: User = Depends(fastapi_users.current_user(active=True, verified=False)),
+        session: AsyncSession = Depends(get_async_session),
+        completion_client: CompletionBackend = Depends(get_completion_client),
+        result_cache: Optional[ResultCache] = Depends(get_result_cache)
+):
+    if len(requests) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"A batch can contain at most {BATCH_MAX_ITEMS} job descriptions")
+
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def beautify(request: JobDescriptionRequest) -> Completion:
+        async with semaphore:
+            return await generate_beautified_description(
+                request, completion_client, result_cache, bypass_cache=cache == "bypass"
+            )
+
+    outcomes = await asyncio.gather(*(beautify(request) for request in requests), return_exceptions=True)
+
+    results = [BatchBeautifiedJobDescriptionItem(index=index) for index in range(len(requests))]
+    succeeded = []
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, Exception):
+            results[index].error = f"An error occurred: {str(outcome)}"
+        else:
+            results[index].beautified_job_description = outcome.choices
+            succeeded.append(index)
+
+    try:
+        if succeeded:
+            # One multi-row INSERT ... RETURNING for the whole batch, then one for its variants.
+            new_job_ids = (await session.scalars(
+                insert(JobDescription).returning(JobDescription.id, sort_by_parameter_order=True),
+                [job_description_values(requests[index], user.id) for index in succeeded],
+            )).all()
+            await session.execute(
+                insert(BeautifiedVariant),
+                [
+                    dict(values, job_description_id=new_job_id)
+                    for index, new_job_id in zip(succeeded, new_job_ids)
+                    for values in variant_values(outcomes[index])
+                ],
+            )
+            with DB_COMMIT_SECONDS.time(("beautify_batch",)):
+                await session.commit()
+            record_write(user.id)
+            for index, new_job_id in zip(succeeded, new_job_ids):
+                results[index].id = new_job_id
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+    return {"results": results}
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str,
+                  user: User = Depends(fastapi_users.current_user(active=True, verified=False)),
+                  job_queue: JobQueue = Depends(get_job_queue)):
+    job = await job_queue.get(job_id)
+    if job is None or job.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
+
+
+@app.get("/jobs/{job_id}/events")
+async def get_job_events(job_id: str,
+                         user: User = Depends(fastapi_users.current_user(active=True, verified=False)),
+                         job_queue: JobQueue = Depends(get_job_queue)):
+    job = await job_queue.get(job_id)
+    if job is None or job.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        yield sse_event("status", jsonable_encoder(job_status(job)))
+        if not job.finished:
+            finished_job = await job_queue.wait(job_id, JOB_EVENTS_TIMEOUT_SECONDS)
+            yield sse_event("status", jsonable_encoder(job_status(finished_job)))
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # Job history details
 
-@app.get("/job_description_history", response_model=list[JobDescriptionResponse])
-async def get_job_description_history(user: User = Depends(fastapi_users.current_user(active=True, verified=False)),
-                                      session: AsyncSession = Depends(get_async_session)):
+@app.get("/job_description_history",
+         response_model=Union[list[JobDescriptionResponse], list[JobDescriptionSummary]])
+async def get_job_description_history(response: Response,
+                                      fields: Literal["full", "summary"] = "full",
+                                      limit: int = Query(HISTORY_DEFAULT_LIMIT, ge=1, le=HISTORY_MAX_LIMIT),
+                                      cursor: Optional[str] = None,
+                                      archived: Optional[bool] = None,
+                                      created_from: Optional[datetime] = None,
+                                      created_to: Optional[datetime] = None,
+                                      role: Optional[str] = None,
+                                      user: User = Depends(current_active_user),
+                                      session: AsyncSession = Depends(get_read_session)):
+    # Keyset pagination, newest first: the X-Next-Cursor response header holds
+    # the cursor of the next page and is absent on the last one.
+    if fields == "summary":
+        # Listing columns only: the large text columns are never read.
+        statement = select(JobDescription.id, JobDescription.role, JobDescription.created_at)
+    else:
+        statement = select(JobDescription).options(selectinload(JobDescription.variants))
+    statement = statement.filter_by(user_id=user.id)
+    if cursor is not None:
+        cursor_created_at, cursor_id = decode_history_cursor(cursor)
+        statement = statement.where(tuple_(JobDescription.created_at, JobDescription.id) < (cursor_created_at, cursor_id))
+    if archived is not None:
+        # Rows written before the column had a default hold NULL: not archived.
+        statement = statement.where(func.coalesce(JobDescription.archived, False).is_(archived))
+    if created_from is not None:
+        statement = statement.where(JobDescription.created_at >= as_naive_utc(created_from))
+    if created_to is not None:
+        statement = statement.where(JobDescription.created_at < as_naive_utc(created_to))
+    if role:
+        statement = statement.where(JobDescription.role.ilike(f"%{escape_like(role)}%", escape="\\"))
+    statement = statement.order_by(JobDescription.created_at.desc(), JobDescription.id.desc()).limit(limit + 1)
+
     try:
-        # Retrieve all job descriptions associated with the current user
-        job_descriptions = await session.execute(select(JobDescription).filter_by(user_id=user.id))
-        job_description_history = job_descriptions.scalars().all()
+        job_descriptions = await session.execute(statement)
+        if fields == "summary":
+            job_description_history = [JobDescriptionSummary(id=row.id, role=row.role, created_at=row.created_at)
+                                       for row in job_descriptions]
+        else:
+            job_description_history = job_descriptions.scalars().all()
+
+        if len(job_description_history) > limit:
+            job_description_history = job_description_history[:limit]
+            response.headers["X-Next-Cursor"] = encode_history_cursor(job_description_history[-1])
 
         return job_description_history
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
+@app.get("/job_description/{job_id}", response_model=JobDescriptionResponse)
+async def get_job_description(job_id: int,
+                              user: User = Depends(current_active_user),
+                              session: AsyncSession = Depends(get_read_session)):
+    job_description = await session.execute(
+        select(JobDescription).options(selectinload(JobDescription.variants)).filter_by(id=job_id, user_id=user.id)
+    )
+    job = job_description.scalars().first()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job Description not found")
+
+    return job
+
+
 @app.delete("/job_description/{job_id}", response_model=JobDescriptionResponse)
 async def delete_job_description(job_id: int,
                                  user: User = Depends(fastapi_users.current_user(active=True, verified=False)),
                                  session: AsyncSession = Depends(get_async_session)):
+    # Ownership is checked by the WHERE clause of each statement: nothing is read before writing.
+    # The variants go first and are returned for the response: SQLite doesn't enforce ON DELETE CASCADE.
     try:
-
-        job_description = await session.execute(select(JobDescription).filter_by(id=job_id, user_id=user.id))
+        owned_job = select(JobDescription.id).filter_by(id=job_id, user_id=user.id)
+        variants = await session.execute(
+            delete(BeautifiedVariant).where(BeautifiedVariant.job_description_id.in_(owned_job))
+            .returning(BeautifiedVariant)
+        )
+        variants = sorted(variants.scalars().all(), key=lambda variant: variant.variant_index)
+        job_description = await session.execute(
+            delete(JobDescription).filter_by(id=job_id, user_id=user.id).returning(JobDescription)
+        )
         job = job_description.scalars().first()
+        if job is not None:
+            set_committed_value(job, "variants", variants)
+            await session.commit()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
-        if not job:
-            raise HTTPException(status_code=404, detail="Job Description not found")
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job Description not found")
+    record_write(user.id)
+    return job
 
-        session.delete(job)
-        await session.commit()
-        return job
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+async def update_job_description(session: AsyncSession, job_id: int, user: User, **values) -> Optional[JobDescription]:
+    """Update a job description of the user in one statement, or return None if it doesn't exist."""
+    job_description = await session.execute(
+        update(JobDescription).filter_by(id=job_id, user_id=user.id).values(**values)
+        .returning(JobDescription).options(selectinload(JobDescription.variants))
+    )
+    job = job_description.scalars().first()
+    if job is not None:
+        await session.commit()
+    return job
 
 
 @app.put("/job_description/{job_id}/rename", response_model=JobDescriptionResponse)
@@ -203,20 +613,15 @@ async def rename_job_description(job_id: int, new_name=str,
                            session: AsyncSession = Depends(get_async_session)
                            ):
     try:
-        job_description = await session.execute(select(JobDescription).filter_by(id=job_id, user_id=user.id))
-        job = job_description.scalars().first()
-
-        if not job:
-            raise HTTPException(status_code=404, detail="Job Description not found")
-
-        job.role = new_name
-        await session.commit()
-
-        return job
-
+        job = await update_job_description(session, job_id, user, role=new_name)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job Description not found")
+    record_write(user.id)
+    return job
+
 
 
 #archive job description
@@ -226,27 +631,15 @@ async def  archive_job_description(
         job_id: int,
         user:User=Depends(fastapi_users.current_user(active=True,verified=False)),
         session:AsyncSession=Depends(get_async_session)):
-
-
-
     try:
-
-
-        job_description = await session.execute(select(JobDescription).filter_by(id=job_id,user_id=user.id))
-        job = job_description.scalars().first()
-
-        if not job:
-            raise HTTPException(status_code=404, detail="Job description not found")
-
-        job.archived = True
-        await session.commit()
-
-        return job
-
+        job = await update_job_description(session, job_id, user, archived=True)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
-
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job description not found")
+    record_write(user.id)
+    return job
 
 
 
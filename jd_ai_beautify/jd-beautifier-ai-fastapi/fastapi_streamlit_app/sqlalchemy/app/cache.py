@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import List, Optional, Protocol, Tuple
+
+import redis.asyncio
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RESULT_CACHE_BACKEND = os.environ.get("RESULT_CACHE_BACKEND", "memory")
+RESULT_CACHE_TTL_SECONDS = int(os.environ.get("RESULT_CACHE_TTL_SECONDS", "86400"))
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", "1024"))
+RESULT_CACHE_KEY_PREFIX = "jd_beautify:"
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379")
+
+
+def normalize_text(value: str, casefold: bool = False) -> str:
+    normalized = " ".join(value.split())
+    return normalized.casefold() if casefold else normalized
+
+
+def make_cache_key(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        encoded = part.encode("utf-8")
+        # Length-prefix every part so ("ab", "c") and ("a", "bc") never collide.
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class ResultCache(Protocol):
+    async def get(self, key: str) -> Optional[List[str]]: ...
+
+    async def set(self, key: str, value: List[str]) -> None: ...
+
+    async def aclose(self) -> None: ...
+
+
+class MemoryResultCache:
+    """In-process LRU cache whose entries also expire after a TTL."""
+
+    def __init__(
+        self,
+        max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = RESULT_CACHE_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, List[str]]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[List[str]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return list(value)
+
+    async def set(self, key: str, value: List[str]) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, list(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def aclose(self) -> None:
+        self._entries.clear()
+
+
+class RedisResultCache:
+    """
+    Redis-backed cache shared by every backend process.
+
+    Entries expire after the TTL; LRU eviction is delegated to Redis,
+    which should run with `maxmemory-policy allkeys-lru`.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.asyncio.Redis,
+        ttl_seconds: int = RESULT_CACHE_TTL_SECONDS,
+        key_prefix: str = RESULT_CACHE_KEY_PREFIX,
+    ):
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+
+    async def get(self, key: str) -> Optional[List[str]]:
+        value = await self.redis.get(f"{self.key_prefix}{key}")
+        if value is None:
+            return None
+        return json.loads(value)
+
+    async def set(self, key: str, value: List[str]) -> None:
+        await self.redis.set(
+            f"{self.key_prefix}{key}", json.dumps(value), ex=self.ttl_seconds
+        )
+
+    async def aclose(self) -> None:
+        await self.redis.aclose()
+
+
+result_cache: Optional[ResultCache] = None
+
+
+def create_result_cache(backend: str = RESULT_CACHE_BACKEND) -> Optional[ResultCache]:
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return MemoryResultCache()
+    if backend == "redis":
+        return RedisResultCache(redis.asyncio.from_url(REDIS_URL))
+    raise ValueError(f"Unknown result cache backend: {backend}")
+
+
+async def init_result_cache() -> Optional[ResultCache]:
+    global result_cache
+    result_cache = create_result_cache()
+    return result_cache
+
+
+async def close_result_cache() -> None:
+    global result_cache
+    if result_cache is not None:
+        await result_cache.aclose()
+        result_cache = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    return result_cache
@@ -0,0 +1,400 @@
+import argparse
+import asyncio
+import os
+import re
+import struct
+import zlib
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from dotenv import load_dotenv
+from sqlalchemy import Column, LargeBinary, Text, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.types import TypeDecorator
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+load_dotenv()
+
+TEXT_COMPRESSION = os.environ.get("TEXT_COMPRESSION", "none")
+TEXT_COMPRESSION_LEVEL = int(os.environ.get("TEXT_COMPRESSION_LEVEL", "6"))
+TEXT_COMPRESSION_MIN_BYTES = int(os.environ.get("TEXT_COMPRESSION_MIN_BYTES", "256"))
+TEXT_COMPRESSION_DICTIONARY_BYTES = int(os.environ.get("TEXT_COMPRESSION_DICTIONARY_BYTES", "32768"))
+TEXT_COMPRESSION_TRAINING_SAMPLES = int(os.environ.get("TEXT_COMPRESSION_TRAINING_SAMPLES", "2000"))
+# Rows converted or rewritten per batch by compression.py.
+TEXT_COMPRESSION_BATCH_SIZE = int(os.environ.get("TEXT_COMPRESSION_BATCH_SIZE", "1000"))
+
+CODEC_IDS = {"none": 0, "zlib": 1, "zstd": 2}
+CODEC_NAMES = {codec_id: name for name, codec_id in CODEC_IDS.items()}
+# Compressed values start with the codec and the id of their dictionary (0: none);
+# uncompressed values only with the codec.
+HEADER = struct.Struct(">BI")
+# zlib only looks back 32 KiB, so a longer preset dictionary is never used.
+ZLIB_MAX_DICTIONARY_BYTES = 32 * 1024
+
+# (table, primary key, column) of every CompressedText column.
+COMPRESSED_COLUMNS = (
+    ("job_descriptions", "id", "job_description"),
+    ("beautified_variants", "id", "content"),
+)
+
+
+class TextCodec:
+    """
+    Encodes the values of CompressedText columns.
+
+    Values are written with `codec` and the newest dictionary trained for it,
+    and read back with whatever codec and dictionary they were written with,
+    so the setting can change without rewriting existing rows.
+    """
+
+    def __init__(
+        self,
+        codec: str = TEXT_COMPRESSION,
+        level: int = TEXT_COMPRESSION_LEVEL,
+        min_bytes: int = TEXT_COMPRESSION_MIN_BYTES,
+    ):
+        if codec not in CODEC_IDS:
+            raise ValueError(f"Unknown text compression codec: {codec}")
+        self.codec = codec
+        self.level = level
+        self.min_bytes = min_bytes
+        self.dictionaries: Dict[int, Tuple[str, bytes]] = {}
+        self.active_dictionary_id = 0
+        self._zstd_dictionaries: Dict[int, "zstandard.ZstdCompressionDict"] = {}
+        if codec == "zstd":
+            self._require_zstandard()
+
+    @property
+    def compressed(self) -> bool:
+        """Whether CompressedText columns hold encoded bytes rather than plain text."""
+        return self.codec != "none"
+
+    @staticmethod
+    def _require_zstandard() -> None:
+        if zstandard is None:
+            raise RuntimeError("zstd text compression needs the zstandard package")
+
+    def add_dictionary(self, dictionary_id: int, codec: str, data: bytes) -> None:
+        self.dictionaries[dictionary_id] = (codec, data)
+        if codec == self.codec:
+            self.active_dictionary_id = max(self.active_dictionary_id, dictionary_id)
+
+    def encode(self, value: str) -> bytes:
+        data = value.encode("utf-8")
+        if self.codec == "none" or len(data) < self.min_bytes:
+            return bytes([CODEC_IDS["none"]]) + data
+        dictionary_id = self.active_dictionary_id
+        if self.codec == "zlib":
+            # Raw deflate: the zlib header and checksum are redundant inside a database row.
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15, **self._zlib_dictionary(dictionary_id))
+            payload = compressor.compress(data) + compressor.flush()
+        else:
+            compressor = zstandard.ZstdCompressor(
+                level=self.level, dict_data=self._zstd_dictionary(dictionary_id) if dictionary_id else None
+            )
+            payload = compressor.compress(data)
+        # Keep incompressible values as they are.
+        if len(payload) + HEADER.size >= len(data) + 1:
+            return bytes([CODEC_IDS["none"]]) + data
+        return HEADER.pack(CODEC_IDS[self.codec], dictionary_id) + payload
+
+    def decode(self, value: bytes) -> str:
+        value = bytes(value)
+        codec = CODEC_NAMES[value[0]]
+        if codec == "none":
+            return value[1:].decode("utf-8")
+        _, dictionary_id = HEADER.unpack_from(value)
+        payload = value[HEADER.size:]
+        if dictionary_id and dictionary_id not in self.dictionaries:
+            raise LookupError(f"Compression dictionary {dictionary_id} is not loaded")
+        if codec == "zlib":
+            decompressor = zlib.decompressobj(-15, **self._zlib_dictionary(dictionary_id))
+            data = decompressor.decompress(payload) + decompressor.flush()
+        else:
+            self._require_zstandard()
+            decompressor = zstandard.ZstdDecompressor(
+                dict_data=self._zstd_dictionary(dictionary_id) if dictionary_id else None
+            )
+            data = decompressor.decompress(payload)
+        return data.decode("utf-8")
+
+    def _zlib_dictionary(self, dictionary_id: int) -> dict:
+        return {"zdict": self.dictionaries[dictionary_id][1]} if dictionary_id else {}
+
+    def _zstd_dictionary(self, dictionary_id: int) -> "zstandard.ZstdCompressionDict":
+        if dictionary_id not in self._zstd_dictionaries:
+            self._zstd_dictionaries[dictionary_id] = zstandard.ZstdCompressionDict(self.dictionaries[dictionary_id][1])
+        return self._zstd_dictionaries[dictionary_id]
+
+
+text_codec = TextCodec()
+
+
+class CompressedText(TypeDecorator):
+    """
+    Plain text, or bytes compressed by `text_codec` when TEXT_COMPRESSION is set.
+
+    The columns are converted between the two with `compression.py --enable`
+    and `--disable`; check_storage refuses to start on a mismatch.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        return dialect.type_descriptor(LargeBinary() if text_codec.compressed else Text())
+
+    def process_bind_param(self, value, dialect):
+        return text_codec.encode(value) if value is not None and text_codec.compressed else value
+
+    def process_result_value(self, value, dialect):
+        return text_codec.decode(value) if value is not None and text_codec.compressed else value
+
+
+def _segments(sample: str) -> List[str]:
+    return [segment.strip() for segment in re.split(r"\n|(?<=[.:!?])\s", sample) if len(segment.strip()) > 3]
+
+
+def train_dictionary(samples: List[str], codec: str = TEXT_COMPRESSION,
+                     size: int = TEXT_COMPRESSION_DICTIONARY_BYTES) -> bytes:
+    if codec == "zstd":
+        TextCodec._require_zstandard()
+        return zstandard.train_dictionary(size, [sample.encode("utf-8") for sample in samples]).as_bytes()
+    if codec != "zlib":
+        raise ValueError(f"No dictionary to train for text compression codec: {codec}")
+
+    # Keep the lines and sentences repeated most across samples (template
+    # headings, boilerplate), placing the most valuable ones last, where
+    # deflate back-references are cheapest.
+    counts = Counter()
+    for sample in samples:
+        counts.update(set(_segments(sample)))
+    scored = sorted(
+        ((count - 1) * len(segment.encode("utf-8")), segment) for segment, count in counts.items() if count > 1
+    )
+    budget = min(size, ZLIB_MAX_DICTIONARY_BYTES)
+    chosen: List[bytes] = []
+    for _, segment in reversed(scored):
+        encoded = segment.encode("utf-8") + b"\n"
+        if len(encoded) <= budget:
+            chosen.append(encoded)
+            budget -= len(encoded)
+    return b"".join(reversed(chosen))
+
+
+def binary_columns(connection: Connection) -> Dict[Tuple[str, str], bool]:
+    """Whether each CompressedText column is stored as bytes."""
+    database = inspect(connection)
+    return {
+        (table, column["name"]): isinstance(column["type"], LargeBinary)
+        for table, _, name in COMPRESSED_COLUMNS
+        for column in database.get_columns(table)
+        if column["name"] == name
+    }
+
+
+def check_storage(connection: Connection) -> None:
+    """Raise if the CompressedText columns don't match TEXT_COMPRESSION."""
+    for (table, column), binary in binary_columns(connection).items():
+        if binary != text_codec.compressed:
+            if binary:
+                action = "set TEXT_COMPRESSION, or convert it back with `compression.py --disable`"
+            else:
+                action = "convert it with `compression.py --enable` first"
+            raise RuntimeError(
+                f"{table}.{column} is {'compressed' if binary else 'plain text'} "
+                f"but TEXT_COMPRESSION={text_codec.codec}: {action}"
+            )
+
+
+def load_dictionaries(connection: Connection, codec: Optional[TextCodec] = None) -> None:
+    codec = codec or text_codec
+    for dictionary_id, codec_name, data in connection.execute(
+            text("SELECT id, codec, data FROM compression_dictionaries ORDER BY id")
+    ):
+        codec.add_dictionary(dictionary_id, codec_name, bytes(data))
+
+
+def sample_texts(connection: Connection, limit: int = TEXT_COMPRESSION_TRAINING_SAMPLES,
+                 decode: bool = True) -> List[str]:
+    samples = []
+    for table, primary_key, column in COMPRESSED_COLUMNS:
+        rows = connection.execute(
+            text(f"SELECT {column} FROM {table} ORDER BY {primary_key} DESC LIMIT :limit"), {"limit": limit}
+        )
+        samples.extend(text_codec.decode(value) if decode else value for value, in rows)
+    return samples
+
+
+def add_trained_dictionary(connection: Connection, samples: List[str], codec: Optional[TextCodec] = None) -> int:
+    """Train a dictionary for the codec, store it and make it the active one; 0 if there is too little data."""
+    codec = codec or text_codec
+    try:
+        data = train_dictionary(samples, codec.codec)
+    except Exception:
+        # zstd refuses to train on a handful of samples.
+        return 0
+    if not data:
+        return 0
+    dictionary_id = connection.execute(
+        text("INSERT INTO compression_dictionaries (codec, data) VALUES (:codec, :data) RETURNING id"),
+        {"codec": codec.codec, "data": data},
+    ).scalar_one()
+    codec.add_dictionary(dictionary_id, codec.codec, data)
+    return dictionary_id
+
+
+def compress_existing_rows(connection: Connection, batch_size: int = TEXT_COMPRESSION_BATCH_SIZE,
+                           commit: bool = False) -> int:
+    """Rewrite every CompressedText value with the active codec and dictionary, one batch at a time."""
+    rewritten = 0
+    for table, primary_key, column in COMPRESSED_COLUMNS:
+        last_id = 0
+        while True:
+            rows = connection.execute(
+                text(f"SELECT {primary_key}, {column} FROM {table} WHERE {primary_key} > :last_id "
+                     f"ORDER BY {primary_key} LIMIT :limit"),
+                {"last_id": last_id, "limit": batch_size},
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            updates = []
+            for row_id, value in rows:
+                encoded = text_codec.encode(text_codec.decode(value))
+                if encoded != bytes(value):
+                    updates.append({"row_id": row_id, "value": encoded})
+            if updates:
+                connection.execute(
+                    text(f"UPDATE {table} SET {column} = :value WHERE {primary_key} = :row_id"), updates
+                )
+                rewritten += len(updates)
+            if commit:
+                connection.commit()
+    return rewritten
+
+
+def _convert_column(connection: Connection, table: str, primary_key: str, column: str,
+                    new_type, convert: Callable, batch_size: int) -> None:
+    op = Operations(MigrationContext.configure(connection))
+    converted = f"{column}_converted"
+    op.add_column(table, Column(converted, new_type, nullable=True))
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            text(f"SELECT {primary_key}, {column} FROM {table} WHERE {primary_key} > :last_id "
+                 f"ORDER BY {primary_key} LIMIT :limit"),
+            {"last_id": last_id, "limit": batch_size},
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        connection.execute(
+            text(f"UPDATE {table} SET {converted} = :value WHERE {primary_key} = :row_id"),
+            [{"row_id": row_id, "value": convert(value)} for row_id, value in rows],
+        )
+    op.drop_column(table, column)
+    op.alter_column(table, converted, new_column_name=column)
+    if connection.dialect.name != "sqlite":
+        op.alter_column(table, column, existing_type=new_type, nullable=False)
+
+
+def enable_compression(connection: Connection, batch_size: int = TEXT_COMPRESSION_BATCH_SIZE) -> int:
+    """Train a dictionary on the plain text columns, then convert them to compressed bytes."""
+    load_dictionaries(connection)
+    dictionary_id = add_trained_dictionary(connection, sample_texts(connection, decode=False))
+    for table, primary_key, column in COMPRESSED_COLUMNS:
+        _convert_column(connection, table, primary_key, column, LargeBinary(), text_codec.encode, batch_size)
+    return dictionary_id
+
+
+def disable_compression(connection: Connection, batch_size: int = TEXT_COMPRESSION_BATCH_SIZE) -> None:
+    """Convert the compressed columns back to plain text."""
+    load_dictionaries(connection)
+    for table, primary_key, column in COMPRESSED_COLUMNS:
+        _convert_column(connection, table, primary_key, column, Text(), text_codec.decode, batch_size)
+
+
+def _storage_is(connection: Connection, binary: bool) -> bool:
+    return all(stored == binary for stored in binary_columns(connection).values())
+
+
+def _enable(connection: Connection, batch_size: int) -> str:
+    if _storage_is(connection, binary=True):
+        return "already enabled"
+    dictionary_id = enable_compression(connection, batch_size)
+    connection.commit()
+    return f"enabled with dictionary {dictionary_id}" if dictionary_id else "enabled, without a dictionary"
+
+
+def _disable(connection: Connection, batch_size: int) -> str:
+    if _storage_is(connection, binary=False):
+        return "already disabled"
+    disable_compression(connection, batch_size)
+    connection.commit()
+    return "disabled"
+
+
+def _train(connection: Connection) -> int:
+    check_storage(connection)
+    load_dictionaries(connection)
+    dictionary_id = add_trained_dictionary(connection, sample_texts(connection))
+    connection.commit()
+    return dictionary_id
+
+
+def _compress(connection: Connection, batch_size: int) -> int:
+    check_storage(connection)
+    load_dictionaries(connection)
+    return compress_existing_rows(connection, batch_size, commit=True)
+
+
+# Compression is opt-in. With the backend and workers stopped, convert the
+# columns, then start them with the same TEXT_COMPRESSION:
+#
+#   TEXT_COMPRESSION=zstd python compression.py --enable
+#
+# To retrain the dictionary later, train one, restart the backend processes
+# and workers so that they load it, then rewrite the rows:
+#
+#   TEXT_COMPRESSION=zstd python compression.py --train
+#   TEXT_COMPRESSION=zstd python compression.py
+#
+# `TEXT_COMPRESSION=none python compression.py --disable` converts the columns
+# back to plain text, again with the backend and workers stopped.
+async def main():
+    parser = argparse.ArgumentParser(description="Enable text compression, train a dictionary or compress rows")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--enable", action="store_true", help="convert the text columns to compressed bytes")
+    mode.add_argument("--disable", action="store_true", help="convert the compressed columns back to text")
+    mode.add_argument("--train", action="store_true", help="train a new dictionary on the latest rows")
+    parser.add_argument("--batch-size", type=int, default=TEXT_COMPRESSION_BATCH_SIZE)
+    args = parser.parse_args()
+    if args.disable and text_codec.compressed:
+        raise SystemExit("Set TEXT_COMPRESSION=none")
+    if not args.disable and not text_codec.compressed:
+        raise SystemExit("Set TEXT_COMPRESSION to zlib or zstd")
+
+    from db import engine
+
+    async with engine.connect() as connection:
+        if args.enable:
+            print(await connection.run_sync(_enable, args.batch_size))
+        elif args.disable:
+            print(await connection.run_sync(_disable, args.batch_size))
+        elif args.train:
+            dictionary_id = await connection.run_sync(_train)
+            print(f"trained dictionary {dictionary_id}" if dictionary_id else "not enough rows to train a dictionary")
+        else:
+            print(f"compressed {await connection.run_sync(_compress, args.batch_size)} values")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
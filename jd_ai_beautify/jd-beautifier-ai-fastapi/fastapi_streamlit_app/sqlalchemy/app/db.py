@@ -1,39 +1,123 @@
 import asyncio
+import dataclasses
+import time
 import uuid
-from typing import AsyncGenerator
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Sequence, Set, Tuple
 
 from fastapi import Depends
 from fastapi_users.db import SQLAlchemyBaseUserTableUUID, SQLAlchemyUserDatabase
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import Column, Integer, String, Text, ForeignKey,Boolean,DateTime, func,event
+from sqlalchemy import Column, Integer, String, Text, ForeignKey,Boolean,DateTime, func,event, JSON, Index, UniqueConstraint, inspect, \
+    LargeBinary, select, text
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship, DeclarativeBase
+from sqlalchemy.dialects.sqlite import DATETIME as SQLITE_DATETIME
+from sqlalchemy.orm import relationship, DeclarativeBase, make_transient_to_detached
 
 import os
+from alembic import command
+from alembic.config import Config
 from dotenv import load_dotenv
 
+from compression import CompressedText, check_storage, load_dictionaries
+from metrics import METRICS_ENABLED, instrument_engine
+from sqltrace import SQL_ECHO, SQL_TRACE_ENABLED, instrument_sql
+
 
 
 # DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 load_dotenv()
+
+# SQLite stores func.now() as "YYYY-MM-DD HH:MM:SS"; bind Python datetimes in the
+# same format so that comparisons against server-side defaults (keyset cursors,
+# date filters) are consistent.
+Timestamp = DateTime().with_variant(
+    SQLITE_DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
+
 class Base(DeclarativeBase):
     pass
 class JobDescription(Base):
     __tablename__ = 'job_descriptions'
     id = Column(Integer, primary_key=True, autoincrement=True)
-    job_description = Column(String, nullable=False)
+    job_description = Column(CompressedText, nullable=False)
     role = Column(String, nullable=False)
     experience = Column(String, nullable=False)
     location = Column(String, nullable=False)
-    beautified_description_1 = Column(Text, nullable=True)
-    beautified_description_2 = Column(Text, nullable=True)
-    beautified_description_3 = Column(Text, nullable=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey('user.id'), nullable=False)
     archived = Column(Boolean, default=False)
     user = relationship("User", back_populates="job_descriptions")
+    # Never loaded implicitly: use selectinload(JobDescription.variants) where needed.
+    variants = relationship("BeautifiedVariant", back_populates="job", order_by="BeautifiedVariant.variant_index",
+                            cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
+    created_at = Column(Timestamp, default=func.now(), nullable=False)
+    updated_at = Column(Timestamp, default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_job_descriptions_user_id_created_at", user_id, created_at.desc(), id.desc()),
+        Index("ix_job_descriptions_user_id_archived", user_id, archived),
+    )
+
+    @property
+    def beautified_descriptions(self) -> list[str]:
+        return [variant.content for variant in self.variants]
+
+    def _beautified_description(self, index: int):
+        return self.variants[index].content if index < len(self.variants) else None
+
+    @property
+    def beautified_description_1(self):
+        return self._beautified_description(0)
+
+    @property
+    def beautified_description_2(self):
+        return self._beautified_description(1)
+
+    @property
+    def beautified_description_3(self):
+        return self._beautified_description(2)
+
+
+class BeautifiedVariant(Base):
+    __tablename__ = 'beautified_variants'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_description_id = Column(Integer, ForeignKey('job_descriptions.id', ondelete='CASCADE'), nullable=False)
+    variant_index = Column(Integer, nullable=False)
+    content = Column(CompressedText, nullable=False)
+    model = Column(String, nullable=True)
+    prompt_tokens = Column(Integer, nullable=True)
+    completion_tokens = Column(Integer, nullable=True)
+    job = relationship("JobDescription", back_populates="variants")
+
+    __table_args__ = (
+        UniqueConstraint(job_description_id, variant_index, name="uq_beautified_variants_job_description_id_index"),
+    )
+
+
+class CompressionDictionary(Base):
+    __tablename__ = 'compression_dictionaries'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    codec = Column(String, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+
+class BeautifyJob(Base):
+    __tablename__ = 'beautify_jobs'
+    id = Column(String(36), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('user.id'), nullable=False)
+    status = Column(String, nullable=False, index=True)
+    payload = Column(JSON, nullable=False)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
     created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
 
 
 class User(SQLAlchemyBaseUserTableUUID, Base):
@@ -48,10 +132,105 @@ class User(SQLAlchemyBaseUserTableUUID, Base):
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
 
+    __table_args__ = (
+        Index("ix_user_email_lower", func.lower(email), unique=True),
+    )
 
-engine = create_async_engine(os.environ.get("DATABASE_URL"),echo=True)
-print(engine,'value')
+
+@dataclass(frozen=True)
+class EngineSettings:
+    # None keeps the SQLAlchemy default, e.g. for SQLite pools that don't take a size.
+    pool_size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    pool_timeout: Optional[float] = None
+    # Seconds after which a connection is replaced; -1 never replaces it.
+    pool_recycle: int = -1
+    # Test connections with a round trip on checkout, to survive server restarts.
+    pool_pre_ping: bool = False
+    # No pool at all: every checkout opens a connection, e.g. to PgBouncer.
+    null_pool: bool = False
+    # asyncpg only: prepared statements cached per connection by asyncpg
+    # itself and by the SQLAlchemy dialect. 0 disables them.
+    statement_cache_size: int = 100
+    prepared_statement_cache_size: int = 100
+    # asyncpg only: random prepared statement names, which never collide
+    # on server connections shared through PgBouncer.
+    unique_statement_names: bool = False
+
+
+ENGINE_PRESETS = {
+    "sqlite-dev": EngineSettings(),
+    # One Postgres server: a pool sized for a single worker, with dropped
+    # connections detected and connections recycled before server timeouts.
+    "postgres": EngineSettings(pool_size=10, max_overflow=10, pool_timeout=30, pool_recycle=1800,
+                               pool_pre_ping=True),
+    # PgBouncer in transaction mode pools the connections and may run two
+    # statements of a session on different server connections: no
+    # client-side pool and no prepared statement reuse.
+    "pgbouncer": EngineSettings(null_pool=True, statement_cache_size=0, prepared_statement_cache_size=0,
+                                unique_statement_names=True),
+}
+
+
+def _env(name: str, parse):
+    value = os.environ.get(name)
+    return None if value is None or value == "" else parse(value)
+
+
+def engine_settings(url: str, preset: Optional[str] = None) -> EngineSettings:
+    """Settings of the preset, by default sqlite-dev or postgres after the URL, with DB_* overrides."""
+    if not preset:
+        preset = "sqlite-dev" if make_url(url).get_backend_name() == "sqlite" else "postgres"
+    if preset not in ENGINE_PRESETS:
+        raise ValueError(f"Unknown engine preset: {preset}")
+    overrides = {
+        "pool_size": _env("DB_POOL_SIZE", int),
+        "max_overflow": _env("DB_MAX_OVERFLOW", int),
+        "pool_timeout": _env("DB_POOL_TIMEOUT_SECONDS", float),
+        "pool_recycle": _env("DB_POOL_RECYCLE_SECONDS", int),
+        "pool_pre_ping": _env("DB_POOL_PRE_PING", lambda value: value.lower() == "true"),
+        "statement_cache_size": _env("DB_STATEMENT_CACHE_SIZE", int),
+        "prepared_statement_cache_size": _env("DB_PREPARED_STATEMENT_CACHE_SIZE", int),
+    }
+    return dataclasses.replace(
+        ENGINE_PRESETS[preset], **{name: value for name, value in overrides.items() if value is not None}
+    )
+
+
+def _prepared_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def create_database_engine(url: str, settings: EngineSettings) -> AsyncEngine:
+    options: Dict[str, Any] = dict(echo=SQL_ECHO, pool_recycle=settings.pool_recycle,
+                                   pool_pre_ping=settings.pool_pre_ping)
+    if settings.null_pool:
+        options["poolclass"] = NullPool
+    else:
+        for name in ("pool_size", "max_overflow", "pool_timeout"):
+            if getattr(settings, name) is not None:
+                options[name] = getattr(settings, name)
+    if make_url(url).get_driver_name() == "asyncpg":
+        connect_args: Dict[str, Any] = dict(
+            statement_cache_size=settings.statement_cache_size,
+            prepared_statement_cache_size=settings.prepared_statement_cache_size,
+        )
+        if settings.unique_statement_names:
+            connect_args["prepared_statement_name_func"] = _prepared_statement_name
+        options["connect_args"] = connect_args
+    return create_async_engine(url, **options)
+
+
+DATABASE_URL = os.environ.get("DATABASE_URL")
+# sqlite-dev, postgres or pgbouncer; by default sqlite-dev or postgres after DATABASE_URL.
+DB_ENGINE_PRESET = os.environ.get("DB_ENGINE_PRESET", "")
+
+engine = create_database_engine(DATABASE_URL, engine_settings(DATABASE_URL, DB_ENGINE_PRESET))
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+if METRICS_ENABLED:
+    instrument_engine(engine)
+if SQL_TRACE_ENABLED:
+    instrument_sql(engine)
 
 
 # async def connect_to_db():
@@ -71,17 +250,248 @@ async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
 
 
-async def create_db_and_tables():
+ALEMBIC_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+# Schema that create_all produced before migrations existed.
+BASELINE_REVISION = "0001"
+
+
+def _upgrade_database(connection):
+    config = Config(ALEMBIC_CONFIG_PATH)
+    config.attributes["connection"] = connection
+    database = inspect(connection)
+    if not database.has_table("alembic_version") and database.has_table("job_descriptions"):
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
+
+
+async def run_migrations():
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_upgrade_database)
+
+
+async def load_compression_dictionaries():
+    async with engine.connect() as conn:
+        # Refuse to start if the columns don't match TEXT_COMPRESSION.
+        await conn.run_sync(check_storage)
+        await conn.run_sync(load_dictionaries)
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         yield session
 
+
+# Comma-separated URLs of read replicas of DATABASE_URL, with the same engine preset.
+DATABASE_REPLICA_URLS = [url.strip() for url in os.environ.get("DATABASE_REPLICA_URLS", "").split(",")
+                         if url.strip()]
+# After a write, the reads of that user go to the primary for this long, so
+# that replication lag never hides the write from them.
+DB_READ_YOUR_WRITES_SECONDS = float(os.environ.get("DB_READ_YOUR_WRITES_SECONDS", "5"))
+# Replicas are checked with a SELECT 1 this often; failing ones are skipped until a check succeeds.
+DB_REPLICA_CHECK_INTERVAL_SECONDS = float(os.environ.get("DB_REPLICA_CHECK_INTERVAL_SECONDS", "10"))
+DB_REPLICA_CHECK_TIMEOUT_SECONDS = float(os.environ.get("DB_REPLICA_CHECK_TIMEOUT_SECONDS", "2"))
+# Recent writers kept before expired entries are dropped.
+READ_YOUR_WRITES_MAX_USERS = 10000
+
+
+class ReplicaRouter:
+    """
+    Spreads reads over the healthy replicas in turn.
+
+    A replica is skipped as soon as one of its connections fails, and taken
+    back by the next successful health check. Users who wrote within the
+    read-your-writes window, and every read when no replica is healthy, go
+    to the primary. Recent writes are only known to the process that made
+    them.
+    """
+
+    def __init__(self, replicas: Sequence[AsyncEngine], primary_session_maker: async_sessionmaker,
+                 read_your_writes_seconds: float = DB_READ_YOUR_WRITES_SECONDS,
+                 check_interval_seconds: float = DB_REPLICA_CHECK_INTERVAL_SECONDS,
+                 check_timeout_seconds: float = DB_REPLICA_CHECK_TIMEOUT_SECONDS,
+                 timer: Callable[[], float] = time.monotonic):
+        self.replicas = list(replicas)
+        self.primary_session_maker = primary_session_maker
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.check_timeout_seconds = check_timeout_seconds
+        self.timer = timer
+        # Replaced as a whole, never mutated: choose() may run between two checks.
+        self.healthy: List[AsyncEngine] = list(replicas)
+        self._session_makers = {replica: async_sessionmaker(replica, expire_on_commit=False)
+                                for replica in replicas}
+        self._next = 0
+        self._recent_writes: Dict[Any, float] = {}
+        self._check_task: Optional[asyncio.Task] = None
+        for replica in replicas:
+            self._watch(replica)
+
+    def record_write(self, user_id: Any) -> None:
+        now = self.timer()
+        if len(self._recent_writes) >= READ_YOUR_WRITES_MAX_USERS:
+            self._recent_writes = {key: until for key, until in self._recent_writes.items() if until > now}
+        self._recent_writes[user_id] = now + self.read_your_writes_seconds
+
+    def choose(self, user_id: Any = None) -> Optional[AsyncEngine]:
+        """Return the replica serving the next read, or None for the primary."""
+        if user_id is not None:
+            pinned_until = self._recent_writes.get(user_id)
+            if pinned_until is not None and pinned_until > self.timer():
+                return None
+        healthy = self.healthy
+        if not healthy:
+            return None
+        self._next = (self._next + 1) % len(healthy)
+        return healthy[self._next]
+
+    def session_maker(self, user_id: Any = None) -> async_sessionmaker:
+        replica = self.choose(user_id)
+        return self.primary_session_maker if replica is None else self._session_makers[replica]
+
+    def mark_unhealthy(self, replica: AsyncEngine) -> None:
+        self.healthy = [engine for engine in self.healthy if engine is not replica]
+
+    async def check(self) -> None:
+        # Connecting is under the timeout too: a replica hanging on connect is down as well.
+        results = await asyncio.gather(
+            *(asyncio.wait_for(self._ping(replica), self.check_timeout_seconds) for replica in self.replicas),
+            return_exceptions=True,
+        )
+        self.healthy = [replica for replica, result in zip(self.replicas, results) if not isinstance(result, Exception)]
+
+    async def start(self) -> None:
+        if self.replicas:
+            await self.check()
+            self._check_task = asyncio.create_task(self._run_checks())
+
+    async def aclose(self) -> None:
+        if self._check_task is not None:
+            self._check_task.cancel()
+            await asyncio.gather(self._check_task, return_exceptions=True)
+            self._check_task = None
+        for replica in self.replicas:
+            await replica.dispose()
+
+    async def _ping(self, replica: AsyncEngine) -> None:
+        async with replica.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def _run_checks(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval_seconds)
+            await self.check()
+
+    def _watch(self, replica: AsyncEngine) -> None:
+        @event.listens_for(replica.sync_engine, "handle_error")
+        def on_error(context):
+            # Connection refused, dropped or reset: not an error of the statement.
+            if context.is_disconnect or context.connection is None:
+                self.mark_unhealthy(replica)
+
+
+replica_router: Optional[ReplicaRouter] = None
+
+
+def create_replica_router(urls: Sequence[str] = DATABASE_REPLICA_URLS) -> ReplicaRouter:
+    replicas = []
+    for url in urls:
+        replica = create_database_engine(url, engine_settings(url, DB_ENGINE_PRESET))
+        if SQL_TRACE_ENABLED:
+            instrument_sql(replica)
+        replicas.append(replica)
+    return ReplicaRouter(replicas, async_session_maker)
+
+
+async def init_replica_router() -> ReplicaRouter:
+    global replica_router
+    replica_router = create_replica_router()
+    await replica_router.start()
+    return replica_router
+
+
+async def close_replica_router() -> None:
+    global replica_router
+    if replica_router is not None:
+        await replica_router.aclose()
+        replica_router = None
+
+
+def record_write(user_id: uuid.UUID) -> None:
+    if replica_router is not None:
+        replica_router.record_write(user_id)
+
+
+def read_session_maker(user_id: uuid.UUID) -> async_sessionmaker:
+    """Session maker of a read-only request of a user: a replica when possible."""
+    if replica_router is None:
+        return async_session_maker
+    return replica_router.session_maker(user_id)
+
+class UserDatabase(SQLAlchemyUserDatabase[User, uuid.UUID]):
+    """Adds the bulk operations of the users router, one query or one commit each, and cacheable user snapshots."""
+
+    async def get_many(self, ids: Sequence[uuid.UUID]) -> List[User]:
+        if not ids:
+            return []
+        statement = select(User).where(User.id.in_(set(ids)))
+        return list((await self.session.scalars(statement)).all())
+
+    async def get_many_by_email(self, emails: Sequence[str]) -> List[User]:
+        if not emails:
+            return []
+        statement = select(User).where(
+            func.lower(User.email).in_({email.lower() for email in emails})
+        )
+        return list((await self.session.scalars(statement)).all())
+
+    def snapshot(self, user: User) -> Dict[str, Any]:
+        # Column values only: the instance belongs to the session of its request.
+        return {attribute.key: getattr(user, attribute.key) for attribute in inspect(User).column_attrs}
+
+    async def restore(self, snapshot: Dict[str, Any]) -> User:
+        return await self.attach(User(**snapshot))
+
+    async def attach(self, user: User) -> User:
+        # Attached to this request's session as if loaded, without a query; the
+        # columns it lacks are expired, and loaded by the refresh of an update.
+        make_transient_to_detached(user)
+        return await self.session.merge(user, load=False)
+
+    async def get_page(self, after: Optional[uuid.UUID] = None, limit: int = 100) -> List[User]:
+        statement = select(User).order_by(User.id).limit(limit)
+        if after is not None:
+            statement = statement.where(User.id > after)
+        return list((await self.session.scalars(statement)).all())
+
+    async def get_existing_emails(self, emails: Sequence[str]) -> Set[str]:
+        if not emails:
+            return set()
+        statement = select(func.lower(User.email)).where(
+            func.lower(User.email).in_({email.lower() for email in emails})
+        )
+        return set((await self.session.scalars(statement)).all())
+
+    async def create_many(self, create_dicts: Sequence[Dict[str, Any]]) -> List[User]:
+        users = [User(**create_dict) for create_dict in create_dicts]
+        self.session.add_all(users)
+        await self.session.commit()
+        return users
+
+    async def update_many(self, updates: Sequence[Tuple[User, Dict[str, Any]]]) -> List[User]:
+        for user, update_dict in updates:
+            for key, value in update_dict.items():
+                setattr(user, key, value)
+        await self.session.commit()
+        return [user for user, _ in updates]
+
+    async def delete_many(self, users: Sequence[User]) -> None:
+        for user in users:
+            await self.session.delete(user)
+        await self.session.commit()
+
+
 async def get_user_db(session: AsyncSession = Depends(get_async_session)):
-    yield SQLAlchemyUserDatabase(session, User)
+    yield UserDatabase(session, User)
 
 
 @event.listens_for(JobDescription, 'before_update')
@@ -0,0 +1,298 @@
+import asyncio
+import logging
+import os
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Protocol
+
+from dotenv import load_dotenv
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from db import BeautifyJob, async_session_maker
+
+load_dotenv()
+
+JOB_QUEUE_BACKEND = os.environ.get("JOB_QUEUE_BACKEND", "memory")
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+JOB_POLL_INTERVAL_SECONDS = float(os.environ.get("JOB_POLL_INTERVAL_SECONDS", "1"))
+JOB_STALE_SECONDS = int(os.environ.get("JOB_STALE_SECONDS", "600"))
+JOB_MAX_FINISHED_ENTRIES = int(os.environ.get("JOB_MAX_FINISHED_ENTRIES", "10000"))
+# Pause of a worker after a queue error (e.g. the database is unreachable) before it tries again.
+JOB_ERROR_BACKOFF_SECONDS = float(os.environ.get("JOB_ERROR_BACKOFF_SECONDS", "5"))
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_FINISHED_STATUSES = (JOB_SUCCEEDED, JOB_FAILED)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class JobRecord:
+    id: str
+    user_id: uuid.UUID
+    status: str
+    payload: Dict[str, Any]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in JOB_FINISHED_STATUSES
+
+
+class JobQueue(Protocol):
+    async def enqueue(self, user_id: uuid.UUID, payload: Dict[str, Any]) -> JobRecord: ...
+
+    async def dequeue(self) -> JobRecord: ...
+
+    async def get(self, job_id: str) -> Optional[JobRecord]: ...
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[JobRecord]: ...
+
+    async def complete(self, job_id: str, result: Dict[str, Any]) -> None: ...
+
+    async def fail(self, job_id: str, error: str) -> None: ...
+
+    async def aclose(self) -> None: ...
+
+
+class MemoryJobQueue:
+    """asyncio queue living in the API process; jobs are lost on restart."""
+
+    def __init__(self, max_finished_entries: int = JOB_MAX_FINISHED_ENTRIES):
+        self.max_finished_entries = max_finished_entries
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._jobs: Dict[str, JobRecord] = {}
+        self._finished_events: Dict[str, asyncio.Event] = {}
+        self._finished_ids: "deque[str]" = deque()
+
+    async def enqueue(self, user_id: uuid.UUID, payload: Dict[str, Any]) -> JobRecord:
+        job = JobRecord(id=str(uuid.uuid4()), user_id=user_id, status=JOB_QUEUED, payload=payload)
+        self._jobs[job.id] = job
+        self._finished_events[job.id] = asyncio.Event()
+        await self._queue.put(job.id)
+        return job
+
+    async def dequeue(self) -> JobRecord:
+        job = self._jobs[await self._queue.get()]
+        job.status = JOB_RUNNING
+        return job
+
+    async def get(self, job_id: str) -> Optional[JobRecord]:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[JobRecord]:
+        finished_event = self._finished_events.get(job_id)
+        if finished_event is not None:
+            try:
+                await asyncio.wait_for(finished_event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self._jobs.get(job_id)
+
+    async def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        self._finish(job_id, JOB_SUCCEEDED, result=result)
+
+    async def fail(self, job_id: str, error: str) -> None:
+        self._finish(job_id, JOB_FAILED, error=error)
+
+    async def aclose(self) -> None:
+        return None
+
+    def _finish(self, job_id: str, status: str, result=None, error=None) -> None:
+        job = self._jobs[job_id]
+        job.status, job.result, job.error = status, result, error
+        self._finished_events.pop(job_id).set()
+        # Finished jobs are kept for polling, oldest dropped first.
+        self._finished_ids.append(job_id)
+        while len(self._finished_ids) > self.max_finished_entries:
+            del self._jobs[self._finished_ids.popleft()]
+
+
+class SQLJobQueue:
+    """
+    Queue stored in the `beautify_jobs` table, shared by every process
+    and surviving restarts.
+
+    Jobs left `running` for longer than `stale_seconds` by a worker that
+    died are picked up again.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession] = async_session_maker,
+        poll_interval: float = JOB_POLL_INTERVAL_SECONDS,
+        stale_seconds: int = JOB_STALE_SECONDS,
+    ):
+        self.session_maker = session_maker
+        self.poll_interval = poll_interval
+        self.stale_seconds = stale_seconds
+
+    async def enqueue(self, user_id: uuid.UUID, payload: Dict[str, Any]) -> JobRecord:
+        async with self.session_maker() as session:
+            job = BeautifyJob(id=str(uuid.uuid4()), user_id=user_id, status=JOB_QUEUED, payload=payload)
+            session.add(job)
+            await session.commit()
+            return self._to_record(job)
+
+    async def dequeue(self) -> JobRecord:
+        while True:
+            async with self.session_maker() as session:
+                stale_before = datetime.utcnow() - timedelta(seconds=self.stale_seconds)
+                statement = (
+                    select(BeautifyJob)
+                    .where(or_(
+                        BeautifyJob.status == JOB_QUEUED,
+                        and_(BeautifyJob.status == JOB_RUNNING, BeautifyJob.started_at < stale_before),
+                    ))
+                    .order_by(BeautifyJob.created_at)
+                    .limit(1)
+                    .with_for_update(skip_locked=True)
+                )
+                job = (await session.execute(statement)).scalars().first()
+                if job is not None:
+                    # Claim with a compare-and-set so two workers never run the
+                    # same job, even where SKIP LOCKED is not supported.
+                    started_at = datetime.utcnow()
+                    claim = await session.execute(
+                        update(BeautifyJob)
+                        .where(
+                            BeautifyJob.id == job.id,
+                            BeautifyJob.status == job.status,
+                            BeautifyJob.started_at.is_(None) if job.started_at is None
+                            else BeautifyJob.started_at == job.started_at,
+                        )
+                        .values(status=JOB_RUNNING, started_at=started_at)
+                        .execution_options(synchronize_session=False)
+                    )
+                    await session.commit()
+                    if claim.rowcount == 1:
+                        job.status, job.started_at = JOB_RUNNING, started_at
+                        return self._to_record(job)
+                    continue
+            await asyncio.sleep(self.poll_interval)
+
+    async def get(self, job_id: str) -> Optional[JobRecord]:
+        async with self.session_maker() as session:
+            job = await session.get(BeautifyJob, job_id)
+            return self._to_record(job) if job is not None else None
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[JobRecord]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        job = await self.get(job_id)
+        while job is not None and not job.finished and loop.time() < deadline:
+            await asyncio.sleep(min(self.poll_interval, max(deadline - loop.time(), 0)))
+            job = await self.get(job_id)
+        return job
+
+    async def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        await self._finish(job_id, JOB_SUCCEEDED, result=result)
+
+    async def fail(self, job_id: str, error: str) -> None:
+        await self._finish(job_id, JOB_FAILED, error=error)
+
+    async def aclose(self) -> None:
+        return None
+
+    async def _finish(self, job_id: str, status: str, result=None, error=None) -> None:
+        async with self.session_maker() as session:
+            job = await session.get(BeautifyJob, job_id)
+            job.status, job.result, job.error = status, result, error
+            job.finished_at = datetime.utcnow()
+            await session.commit()
+
+    @staticmethod
+    def _to_record(job: BeautifyJob) -> JobRecord:
+        return JobRecord(
+            id=job.id,
+            user_id=job.user_id,
+            status=job.status,
+            payload=job.payload,
+            result=job.result,
+            error=job.error,
+        )
+
+
+JobHandler = Callable[[JobRecord], Awaitable[Dict[str, Any]]]
+
+
+class JobWorkerPool:
+    def __init__(self, queue: JobQueue, handler: JobHandler, workers: int = JOB_WORKERS,
+                 error_backoff: float = JOB_ERROR_BACKOFF_SECONDS):
+        self.queue = queue
+        self.handler = handler
+        self.workers = workers
+        self.error_backoff = error_backoff
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._process(await self.queue.dequeue())
+            except Exception:
+                # A failing queue must not end the worker. With the sql backend, a job
+                # whose result could not be stored stays running and is picked up
+                # again after JOB_STALE_SECONDS.
+                logger.exception("Job worker error, retrying in %.1f s", self.error_backoff)
+                await asyncio.sleep(self.error_backoff)
+
+    async def _process(self, job: JobRecord) -> None:
+        try:
+            result = await self.handler(job)
+        except Exception as e:
+            await self.queue.fail(job.id, f"An error occurred: {str(e)}")
+        else:
+            await self.queue.complete(job.id, result)
+
+
+job_queue: Optional[JobQueue] = None
+worker_pool: Optional[JobWorkerPool] = None
+
+
+def create_job_queue(backend: str = JOB_QUEUE_BACKEND) -> JobQueue:
+    if backend == "memory":
+        return MemoryJobQueue()
+    if backend == "sql":
+        return SQLJobQueue()
+    raise ValueError(f"Unknown job queue backend: {backend}")
+
+
+async def init_job_queue(handler: JobHandler, workers: int = JOB_WORKERS) -> JobQueue:
+    global job_queue, worker_pool
+    job_queue = create_job_queue()
+    if workers > 0:
+        worker_pool = JobWorkerPool(job_queue, handler, workers)
+        worker_pool.start()
+    return job_queue
+
+
+async def close_job_queue() -> None:
+    global job_queue, worker_pool
+    if worker_pool is not None:
+        await worker_pool.stop()
+        worker_pool = None
+    if job_queue is not None:
+        await job_queue.aclose()
+        job_queue = None
+
+
+def get_job_queue() -> JobQueue:
+    if job_queue is None:
+        raise RuntimeError("Job queue is not initialized")
+    return job_queue
@@ -0,0 +1,219 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Protocol, Tuple
+
+import httpx
+from dotenv import load_dotenv
+from openai import AsyncOpenAI
+
+from metrics import LLM_COMPLETION_ERRORS, LLM_COMPLETION_SECONDS, LLM_COMPLETIONS_IN_FLIGHT, LLM_TOKENS, \
+    METRICS_ENABLED, track_in_flight
+
+load_dotenv()
+
+LLM_BACKEND = os.environ.get("LLM_BACKEND", "openai")
+LLM_MODEL = os.environ.get("LLM_MODEL", "gpt-3.5-turbo")
+LLM_MAX_CONNECTIONS = int(os.environ.get("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_TIMEOUT_SECONDS = float(os.environ.get("LLM_TIMEOUT_SECONDS", "120"))
+LLM_STUB_LATENCY_SECONDS = float(os.environ.get("LLM_STUB_LATENCY_SECONDS", "2"))
+
+
+@dataclass
+class Completion:
+    choices: List[str]
+    model: str
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+
+
+class CompletionBackend(Protocol):
+    async def complete(
+        self, messages: List[Dict[str, str]], n: int, max_tokens: int
+    ) -> Completion: ...
+
+    def stream(
+        self, messages: List[Dict[str, str]], n: int, max_tokens: int
+    ) -> AsyncIterator[Tuple[int, str]]: ...
+
+    async def aclose(self) -> None: ...
+
+
+class OpenAICompletionBackend:
+    """Chat completions over a single pooled, keep-alive HTTP client."""
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        model: str = LLM_MODEL,
+        max_connections: int = LLM_MAX_CONNECTIONS,
+        max_keepalive_connections: int = LLM_MAX_KEEPALIVE_CONNECTIONS,
+        timeout: float = LLM_TIMEOUT_SECONDS,
+    ):
+        self.model = model
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            timeout=timeout,
+        )
+        self.client = AsyncOpenAI(api_key=api_key, http_client=self.http_client)
+
+    def _completion_kwargs(
+        self, messages: List[Dict[str, str]], n: int, max_tokens: int
+    ) -> dict:
+        return dict(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            n=n,
+            stop=None,
+            temperature=1,
+            top_p=1,
+            frequency_penalty=0,
+            presence_penalty=0,
+        )
+
+    async def complete(
+        self, messages: List[Dict[str, str]], n: int, max_tokens: int
+    ) -> Completion:
+        response = await self.client.chat.completions.create(
+            **self._completion_kwargs(messages, n, max_tokens)
+        )
+        return Completion(
+            choices=[choice.message.content.strip() for choice in response.choices],
+            model=response.model,
+            prompt_tokens=response.usage.prompt_tokens if response.usage else None,
+            completion_tokens=response.usage.completion_tokens if response.usage else None,
+        )
+
+    async def stream(
+        self, messages: List[Dict[str, str]], n: int, max_tokens: int
+    ) -> AsyncIterator[Tuple[int, str]]:
+        response = await self.client.chat.completions.create(
+            **self._completion_kwargs(messages, n, max_tokens), stream=True
+        )
+        async for chunk in response:
+            for choice in chunk.choices:
+                if choice.delta.content:
+                    yield choice.index, choice.delta.content
+
+    async def aclose(self) -> None:
+        await self.client.close()
+
+
+class StubCompletionBackend:
+    """Offline backend that sleeps like a real completion, for load tests."""
+
+    def __init__(self, latency: float = LLM_STUB_LATENCY_SECONDS):
+        self.latency = latency
+
+    async def complete(
+        self, messages: List[Dict[str, str]], n: int, max_tokens: int
+    ) -> Completion:
+        await asyncio.sleep(self.latency)
+        choices = [self._variant(messages, i) for i in range(n)]
+        # Word counts stand in for tokens so that accounting paths are exercised.
+        return Completion(
+            choices=choices,
+            model="stub",
+            prompt_tokens=sum(len(message["content"].split()) for message in messages),
+            completion_tokens=sum(len(choice.split()) for choice in choices),
+        )
+
+    async def stream(
+        self, messages: List[Dict[str, str]], n: int, max_tokens: int
+    ) -> AsyncIterator[Tuple[int, str]]:
+        variants = [self._variant(messages, i).split(" ") for i in range(n)]
+        steps = max(len(words) for words in variants)
+        for step in range(steps):
+            await asyncio.sleep(self.latency / steps)
+            for index, words in enumerate(variants):
+                if step < len(words):
+                    yield index, words[step] if step == 0 else f" {words[step]}"
+
+    @staticmethod
+    def _variant(messages: List[Dict[str, str]], index: int) -> str:
+        prompt = messages[-1]["content"]
+        return f"**Variant {index + 1}**\n\n{prompt}".strip()
+
+    async def aclose(self) -> None:
+        return None
+
+
+class MeteredCompletionBackend:
+    """Records the latency, errors and token usage of another backend."""
+
+    def __init__(self, backend: CompletionBackend, name: str = LLM_BACKEND):
+        self.backend = backend
+        self.name = name
+
+    async def complete(
+        self, messages: List[Dict[str, str]], n: int, max_tokens: int
+    ) -> Completion:
+        labels = (self.name, "complete")
+        start = time.perf_counter()
+        with track_in_flight(LLM_COMPLETIONS_IN_FLIGHT, (self.name,)):
+            try:
+                completion = await self.backend.complete(messages, n, max_tokens)
+            except Exception:
+                LLM_COMPLETION_ERRORS.inc(labels=labels)
+                raise
+        LLM_COMPLETION_SECONDS.observe(time.perf_counter() - start, labels)
+        if completion.prompt_tokens is not None:
+            LLM_TOKENS.inc(completion.prompt_tokens, (self.name, "prompt"))
+        if completion.completion_tokens is not None:
+            LLM_TOKENS.inc(completion.completion_tokens, (self.name, "completion"))
+        return completion
+
+    async def stream(
+        self, messages: List[Dict[str, str]], n: int, max_tokens: int
+    ) -> AsyncIterator[Tuple[int, str]]:
+        labels = (self.name, "stream")
+        start = time.perf_counter()
+        with track_in_flight(LLM_COMPLETIONS_IN_FLIGHT, (self.name,)):
+            try:
+                async for chunk in self.backend.stream(messages, n, max_tokens):
+                    yield chunk
+            except Exception:
+                LLM_COMPLETION_ERRORS.inc(labels=labels)
+                raise
+        LLM_COMPLETION_SECONDS.observe(time.perf_counter() - start, labels)
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
+
+
+completion_client: Optional[CompletionBackend] = None
+
+
+def create_completion_client(backend: str = LLM_BACKEND) -> CompletionBackend:
+    if backend == "openai":
+        return OpenAICompletionBackend(api_key=os.environ.get("OPENAI_API_KEY"))
+    if backend == "stub":
+        return StubCompletionBackend()
+    raise ValueError(f"Unknown LLM backend: {backend}")
+
+
+async def init_completion_client() -> CompletionBackend:
+    global completion_client
+    completion_client = create_completion_client()
+    if METRICS_ENABLED:
+        completion_client = MeteredCompletionBackend(completion_client)
+    return completion_client
+
+
+async def close_completion_client() -> None:
+    global completion_client
+    if completion_client is not None:
+        await completion_client.aclose()
+        completion_client = None
+
+
+def get_completion_client() -> CompletionBackend:
+    if completion_client is None:
+        raise RuntimeError("Completion client is not initialized")
+    return completion_client
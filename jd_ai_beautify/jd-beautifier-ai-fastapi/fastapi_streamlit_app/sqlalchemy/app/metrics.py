@@ -0,0 +1,323 @@
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+load_dotenv()
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request and query latencies, in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# LLM completions take seconds, not milliseconds.
+LLM_LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+# Metrics are only updated from the event loop thread, so plain dict and list
+# updates are enough: no lock is taken on the hot path. Histograms count each
+# observation in its own bucket; cumulative counts are computed when scraped.
+
+
+def _format_labels(labelnames: Sequence[str], labels: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labels)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        raise NotImplementedError()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, labels: Tuple[str, ...] = ()) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        for labels, value in self._values.items():
+            yield "_total", _format_labels(self.labelnames, labels), value
+
+
+class Gauge(Metric):
+    """Gauge set by the application, or read from `function` when scraped."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 function: Optional[Callable[[], Optional[float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, labels: Tuple[str, ...] = ()) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, amount: float = 1, labels: Tuple[str, ...] = ()) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value: float, labels: Tuple[str, ...] = ()) -> None:
+        self._values[labels] = value
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        if self.function is not None:
+            value = self.function()
+            if value is not None:
+                yield "", "", value
+            return
+        for labels, value in self._values.items():
+            yield "", _format_labels(self.labelnames, labels), value
+
+
+class CounterFunction(Gauge):
+    """Counter read from `function` when scraped, e.g. a counter of a library object."""
+
+    kind = "counter"
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        for suffix, labels, value in super().samples():
+            yield "_total", labels, value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: one count per bucket plus +Inf, then the sum.
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, labels: Tuple[str, ...] = ()) -> None:
+        counts = self._values.get(labels)
+        if counts is None:
+            counts = self._values[labels] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    @contextmanager
+    def time(self, labels: Tuple[str, ...] = ()) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, labels)
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        for labels, counts in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield "_bucket", _format_labels(self.labelnames, labels, le), cumulative
+            formatted = _format_labels(self.labelnames, labels)
+            yield "_sum", formatted, counts[-1]
+            yield "_count", formatted, cumulative
+
+
+M = TypeVar("M", bound=Metric)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: M) -> M:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.register(Counter(
+    "http_requests", "HTTP requests by route and status code.", ("method", "route", "status")))
+HTTP_REQUEST_SECONDS = registry.register(Histogram(
+    "http_request_duration_seconds", "Time to answer HTTP requests, until the response is sent.",
+    ("method", "route")))
+HTTP_REQUESTS_IN_FLIGHT = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests being answered.", ("method",)))
+
+LLM_COMPLETION_SECONDS = registry.register(Histogram(
+    "llm_completion_duration_seconds", "Time of LLM completions; streams are timed until the last chunk.",
+    ("backend", "mode"), LLM_LATENCY_BUCKETS))
+LLM_COMPLETIONS_IN_FLIGHT = registry.register(Gauge(
+    "llm_completions_in_flight", "LLM completions running.", ("backend",)))
+LLM_COMPLETION_ERRORS = registry.register(Counter(
+    "llm_completion_errors", "LLM completions that failed.", ("backend", "mode")))
+LLM_TOKENS = registry.register(Counter(
+    "llm_tokens", "Tokens reported by the LLM usage, by kind (prompt or completion).", ("backend", "kind")))
+
+DB_COMMIT_SECONDS = registry.register(Histogram(
+    "db_commit_duration_seconds", "Time of the commits saving job descriptions.", ("operation",)))
+DB_QUERY_SECONDS = registry.register(Histogram(
+    "db_query_duration_seconds", "Time of SQL statements, from cursor execution to its end."))
+DB_POOL_CHECKOUTS = registry.register(Counter(
+    "db_pool_checkouts", "Connections checked out of the pool."))
+DB_POOL_CONNECTS = registry.register(Counter(
+    "db_pool_connects", "Database connections opened by the pool."))
+DB_POOL_WAIT_SECONDS = registry.register(Histogram(
+    "db_pool_wait_seconds", "Time to get a connection from the pool, including opening a new one."))
+DB_POOL_HOLD_SECONDS = registry.register(Histogram(
+    "db_pool_hold_seconds", "Time connections stay checked out."))
+
+
+@contextmanager
+def track_in_flight(gauge: Gauge, labels: Tuple[str, ...] = ()) -> Iterator[None]:
+    gauge.inc(labels=labels)
+    try:
+        yield
+    finally:
+        gauge.dec(labels=labels)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request.
+
+    Requests are labelled with the path template of their route, e.g.
+    `/job_description/{job_id}`, so that ids don't create new series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc(labels=(method,))
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec(labels=(method,))
+            # The router stores the matched route in the scope.
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, (method, path))
+            HTTP_REQUESTS.inc(labels=(method, path, str(status_code)))
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    pool = engine.sync_engine.pool
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTS.inc()
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.inc()
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            DB_POOL_HOLD_SECONDS.observe(time.perf_counter() - checked_out_at)
+
+    # The pool has no event before a checkout: time its connect method instead.
+    connect = pool.connect
+
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+
+    pool.connect = timed_connect
+
+    def pool_status(method: str) -> Callable[[], Optional[float]]:
+        # Not every pool class keeps these counts, e.g. NullPool.
+        def read() -> Optional[float]:
+            current_pool = engine.sync_engine.pool
+            return getattr(current_pool, method)() if hasattr(current_pool, method) else None
+
+        return read
+
+    registry.register(Gauge("db_pool_size", "Connections the pool keeps open.",
+                            function=pool_status("size")))
+    registry.register(Gauge("db_pool_checked_out", "Connections checked out of the pool.",
+                            function=pool_status("checkedout")))
+    registry.register(Gauge("db_pool_checked_in", "Idle connections in the pool.",
+                            function=pool_status("checkedin")))
+    registry.register(Gauge("db_pool_overflow", "Connections open beyond the pool size.",
+                            function=pool_status("overflow")))
+
+
+def instrument_password_helper(get_password_helper: Callable[[], object]) -> None:
+    # The helper is created at startup: read its counters through a getter.
+    def password_metric(attribute: str) -> Callable[[], Optional[float]]:
+        def read() -> Optional[float]:
+            metrics = getattr(get_password_helper(), "metrics", None)
+            return getattr(metrics, attribute) if metrics is not None else None
+
+        return read
+
+    registry.register(CounterFunction(
+        "password_hash_operations", "Password hashes and verifications completed.",
+        function=password_metric("completed")))
+    registry.register(CounterFunction(
+        "password_hash_run_seconds", "Time spent hashing and verifying passwords in the pool.",
+        function=password_metric("run_seconds")))
+    registry.register(CounterFunction(
+        "password_hash_wait_seconds", "Time password operations waited for a free slot.",
+        function=password_metric("wait_seconds")))
+    registry.register(Gauge(
+        "password_hash_in_flight", "Password operations running in the pool.",
+        function=password_metric("in_flight")))
+    registry.register(Gauge(
+        "password_hash_queued", "Password operations waiting for a free slot.",
+        function=password_metric("queued")))
@@ -0,0 +1,68 @@
+import asyncio
+import os
+from logging.config import fileConfig
+
+from alembic import context
+from dotenv import load_dotenv
+import dataclasses
+
+from sqlalchemy.engine import Connection
+
+from db import DB_ENGINE_PRESET, Base, create_database_engine, engine_settings
+
+load_dotenv()
+
+config = context.config
+
+# Skip logging setup when migrations run from the application, which passes
+# its own connection and already configured logging.
+if config.config_file_name is not None and "connection" not in config.attributes:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=os.environ.get("DATABASE_URL"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata)
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    # One connection for the whole run, with the statement cache settings of the preset.
+    url = os.environ.get("DATABASE_URL")
+    settings = dataclasses.replace(engine_settings(url, DB_ENGINE_PRESET), null_pool=True)
+    connectable = create_database_engine(url, settings)
+
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await connectable.dispose()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        # Called from db.run_migrations() with a connection of the app engine.
+        do_run_migrations(connection)
+    else:
+        asyncio.run(run_async_migrations())
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
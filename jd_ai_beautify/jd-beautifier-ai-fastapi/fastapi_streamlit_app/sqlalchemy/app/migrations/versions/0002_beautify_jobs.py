@@ -0,0 +1,45 @@
+"""Add the beautify_jobs table of the SQL job queue
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:31:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Databases set up by create_all before migrations existed may already have it.
+    if sa.inspect(op.get_bind()).has_table("beautify_jobs"):
+        return
+    op.create_table(
+        "beautify_jobs",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_beautify_jobs_status", "beautify_jobs", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_beautify_jobs_status", table_name="beautify_jobs")
+    op.drop_table("beautify_jobs")
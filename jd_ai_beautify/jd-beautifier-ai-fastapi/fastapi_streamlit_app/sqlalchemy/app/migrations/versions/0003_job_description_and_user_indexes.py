@@ -0,0 +1,50 @@
+"""Index per-user job description queries and user e-mails
+
+The (user_id, created_at DESC, id DESC) index serves the keyset-paginated
+history and ownership checks; (user_id, archived) serves archived filters.
+
+fastapi-users looks users up with lower(email) = lower(:email), so the unique
+index is on lower(email): it enforces case-insensitive uniqueness and is the
+one the lookup can use. Creating it fails if duplicate e-mails already exist.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 12:32:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_job_descriptions_user_id_created_at",
+        "job_descriptions",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    op.create_index(
+        "ix_job_descriptions_user_id_archived",
+        "job_descriptions",
+        ["user_id", "archived"],
+    )
+    op.create_index(
+        "ix_user_email_lower",
+        "user",
+        [sa.text("lower(email)")],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_email_lower", table_name="user")
+    op.drop_index("ix_job_descriptions_user_id_archived", table_name="job_descriptions")
+    op.drop_index("ix_job_descriptions_user_id_created_at", table_name="job_descriptions")
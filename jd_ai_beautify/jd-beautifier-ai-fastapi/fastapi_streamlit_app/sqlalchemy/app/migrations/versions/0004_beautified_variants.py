@@ -0,0 +1,65 @@
+"""Move beautified descriptions into a beautified_variants child table
+
+Every non-null beautified_description_N column becomes one variant row with
+variant_index N - 1, then the three columns are dropped. Existing rows were all
+generated with the formerly hard-coded gpt-3.5-turbo model; their token counts
+were never recorded.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 12:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LEGACY_COLUMNS = ("beautified_description_1", "beautified_description_2", "beautified_description_3")
+LEGACY_MODEL = "gpt-3.5-turbo"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "beautified_variants",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("job_description_id", sa.Integer(), nullable=False),
+        sa.Column("variant_index", sa.Integer(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("model", sa.String(), nullable=True),
+        sa.Column("prompt_tokens", sa.Integer(), nullable=True),
+        sa.Column("completion_tokens", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["job_description_id"], ["job_descriptions.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "job_description_id", "variant_index", name="uq_beautified_variants_job_description_id_index"
+        ),
+    )
+    for index, column in enumerate(LEGACY_COLUMNS):
+        op.execute(
+            sa.text(
+                "INSERT INTO beautified_variants (job_description_id, variant_index, content, model) "
+                f"SELECT id, {index}, {column}, :model FROM job_descriptions WHERE {column} IS NOT NULL"
+            ).bindparams(model=LEGACY_MODEL)
+        )
+    for column in LEGACY_COLUMNS:
+        op.drop_column("job_descriptions", column)
+
+
+def downgrade() -> None:
+    for column in LEGACY_COLUMNS:
+        op.add_column("job_descriptions", sa.Column(column, sa.Text(), nullable=True))
+    for index, column in enumerate(LEGACY_COLUMNS):
+        op.execute(
+            f"UPDATE job_descriptions SET {column} = ("
+            "SELECT content FROM beautified_variants "
+            f"WHERE beautified_variants.job_description_id = job_descriptions.id AND variant_index = {index})"
+        )
+    op.drop_table("beautified_variants")
@@ -11,6 +11,10 @@ from db  import  Base,DeclarativeBase,Depends,engine
 from sqlalchemy import create_engine, Column, Integer, String, Text, ForeignKey
 
 
+BEAUTIFY_DEFAULT_VARIANTS = 3
+BEAUTIFY_MAX_VARIANTS = 5
+
+
 class UserRead(schemas.BaseUser[uuid.UUID]):
     pass
 
@@ -29,6 +33,7 @@ class JobDescriptionRequest(CreateUpdateDictModel):
     role: constr(min_length=1)
     experience: constr(min_length=1)
     location: constr(min_length=1)
+    variants: int = Field(BEAUTIFY_DEFAULT_VARIANTS, ge=1, le=BEAUTIFY_MAX_VARIANTS)
     beautified_job_description: Optional[List[str]] = None
 
 
@@ -39,14 +44,58 @@ class JobDescriptionResponse(BaseModel):
     role: str
     experience: str
     location: str
-    beautified_description_1: str
-    beautified_description_2: str
-    beautified_description_3: str
+    beautified_descriptions: List[str]
+    beautified_description_1: Optional[str] = None
+    beautified_description_2: Optional[str] = None
+    beautified_description_3: Optional[str] = None
+    created_at: datetime
+
+
+class JobDescriptionSummary(BaseModel):
+    id: int
+    role: str
     created_at: datetime
 
 
+class SQLStatementStats(BaseModel):
+    statement: str
+    calls: int
+    slow_calls: int
+    total_seconds: float
+    mean_seconds: float
+    max_seconds: float
+
+
+class SQLStatementStatsResponse(BaseModel):
+    sample_rate: float
+    slow_query_seconds: float
+    statements: List[SQLStatementStats]
+
+
 
 
 class BeautifiedJobDescriptionResponse(CreateUpdateDictModel):
     beautified_job_description: list[str]
 
+
+class BatchBeautifiedJobDescriptionItem(BaseModel):
+    index: int
+    id: Optional[int] = None
+    beautified_job_description: Optional[List[str]] = None
+    error: Optional[str] = None
+
+
+class BatchBeautifiedJobDescriptionResponse(BaseModel):
+    results: List[BatchBeautifiedJobDescriptionItem]
+
+
+class BeautifyJobResult(BaseModel):
+    id: int
+    beautified_job_description: List[str]
+
+
+class JobStatusResponse(BaseModel):
+    id: str
+    status: str
+    result: Optional[BeautifyJobResult] = None
+    error: Optional[str] = None
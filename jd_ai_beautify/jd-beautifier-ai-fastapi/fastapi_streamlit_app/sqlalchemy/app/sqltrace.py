@@ -0,0 +1,164 @@
+import logging
+import os
+import random
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from metrics import DB_QUERY_SECONDS, METRICS_ENABLED
+
+load_dotenv()
+
+# Echo every statement, as echo=True used to. Slow and noisy: for local debugging only.
+SQL_ECHO = os.environ.get("SQL_ECHO", "false").lower() == "true"
+SQL_TRACE_ENABLED = os.environ.get("SQL_TRACE_ENABLED", "true").lower() == "true"
+# Statements at least this slow are logged and always recorded in the statistics.
+SQL_SLOW_QUERY_SECONDS = float(os.environ.get("SQL_SLOW_QUERY_SECONDS", "0.5"))
+# Share of the other statements recorded in the statistics.
+SQL_SAMPLE_RATE = float(os.environ.get("SQL_SAMPLE_RATE", "0.05"))
+# Distinct normalized statements kept; the cheapest are dropped beyond that.
+SQL_STATS_MAX_STATEMENTS = int(os.environ.get("SQL_STATS_MAX_STATEMENTS", "500"))
+# Adds X-Query-Count and X-Query-Duration-Ms headers to every response.
+DEBUG = os.environ.get("DEBUG", "false").lower() == "true"
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+|\?")
+# asyncpg casts each parameter, e.g. ($1::UUID, $2::UUID).
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:::\w+)?(?:\s*,\s*\?(?:::\w+)?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+# Normalized forms by raw statement: SQLAlchemy reuses the same strings.
+_NORMALIZED_CACHE_SIZE = 4096
+_normalized: Dict[str, str] = {}
+
+
+def normalize_statement(statement: str) -> str:
+    """Replace literals and placeholders with ?, and IN lists of any length with (?, ...)."""
+    normalized = _normalized.get(statement)
+    if normalized is None:
+        normalized = _WHITESPACE.sub(" ", statement).strip()
+        normalized = _STRING_LITERAL.sub("?", normalized)
+        normalized = _PLACEHOLDER.sub("?", normalized)
+        normalized = _NUMBER_LITERAL.sub("?", normalized)
+        normalized = _PLACEHOLDER_LIST.sub("(?, ...)", normalized)
+        if len(_normalized) >= _NORMALIZED_CACHE_SIZE:
+            _normalized.clear()
+        _normalized[statement] = normalized
+    return normalized
+
+
+@dataclass
+class StatementStats:
+    statement: str
+    calls: int = 0
+    slow_calls: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+class StatementRecorder:
+    """Aggregates the recorded executions by normalized statement."""
+
+    def __init__(self, max_statements: int = SQL_STATS_MAX_STATEMENTS):
+        self.max_statements = max_statements
+        self._stats: Dict[str, StatementStats] = {}
+
+    def record(self, statement: str, seconds: float, slow: bool) -> None:
+        normalized = normalize_statement(statement)
+        stats = self._stats.get(normalized)
+        if stats is None:
+            if len(self._stats) >= self.max_statements:
+                self._prune()
+            stats = self._stats[normalized] = StatementStats(normalized)
+        stats.calls += 1
+        stats.total_seconds += seconds
+        if seconds > stats.max_seconds:
+            stats.max_seconds = seconds
+        if slow:
+            stats.slow_calls += 1
+
+    def top(self, limit: int) -> List[StatementStats]:
+        return sorted(self._stats.values(), key=lambda stats: stats.total_seconds, reverse=True)[:limit]
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+    def _prune(self) -> None:
+        # Keep the most expensive half: pruning runs once per max_statements / 2 new statements.
+        kept = self.top(self.max_statements // 2)
+        self._stats = {stats.statement: stats for stats in kept}
+
+
+class QueryCounter:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+statement_recorder = StatementRecorder()
+_query_counter: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+
+def instrument_sql(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._sqltrace_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - context._sqltrace_start
+        if METRICS_ENABLED:
+            DB_QUERY_SECONDS.observe(seconds)
+        counter = _query_counter.get()
+        if counter is not None:
+            counter.count += 1
+            counter.seconds += seconds
+        slow = seconds >= SQL_SLOW_QUERY_SECONDS
+        if slow:
+            logger.warning("Slow query (%.3f s): %s", seconds, normalize_statement(statement))
+        if slow or random.random() < SQL_SAMPLE_RATE:
+            statement_recorder.record(statement, seconds, slow)
+
+
+class QueryCountMiddleware:
+    """Adds the number and total time of the SQL statements of a request to its response headers."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counter = QueryCounter()
+        token = _query_counter.set(counter)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-query-count", str(counter.count).encode()),
+                    (b"x-query-duration-ms", f"{counter.seconds * 1000:.1f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _query_counter.reset(token)
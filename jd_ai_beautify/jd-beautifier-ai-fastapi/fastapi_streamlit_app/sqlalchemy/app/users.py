@@ -1,6 +1,6 @@
 import os
 import uuid
-from typing import Optional
+from typing import Any, Dict, Optional
 from fastapi import Depends, Request
 from fastapi_users import BaseUserManager, FastAPIUsers, UUIDIDMixin
 from fastapi_users.authentication import (
@@ -8,12 +8,38 @@ from fastapi_users.authentication import (
     BearerTransport,
     JWTStrategy,
 )
-from fastapi_users.db import SQLAlchemyUserDatabase
+from fastapi_users.cache import TTLCache
+from fastapi_users.db import SQLAlchemyUserDatabase, UserLoader
+from fastapi_users.jwt import DecodedJWTCache
+from fastapi_users.password import AsyncPasswordHelper, PasswordHelper, PasswordHelperProtocol
 from httpx_oauth.clients.google import GoogleOAuth2
 
 from db import User, get_user_db
 
 SECRET = "SECRET"
+# Argon2 runs in a pool of this many threads (processes with
+# PASSWORD_HASH_USE_PROCESSES=true) so that logins don't block the event loop;
+# 0 hashes on the event loop.
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_CONCURRENCY = int(os.environ.get("PASSWORD_HASH_MAX_CONCURRENCY", "0")) or None
+PASSWORD_HASH_USE_PROCESSES = os.environ.get("PASSWORD_HASH_USE_PROCESSES", "false").lower() == "true"
+# Authenticated requests reuse users read in the last USER_CACHE_TTL_SECONDS
+# instead of selecting them again; 0 disables the cache.
+USER_CACHE_TTL_SECONDS = float(os.environ.get("USER_CACHE_TTL_SECONDS", "30"))
+USER_CACHE_MAX_ENTRIES = int(os.environ.get("USER_CACHE_MAX_ENTRIES", "10000"))
+# Verified tokens are remembered until they expire, so that their signature is
+# only checked on first use; 0 disables the cache.
+JWT_DECODE_CACHE_MAX_ENTRIES = int(os.environ.get("JWT_DECODE_CACHE_MAX_ENTRIES", "10000"))
+
+# Holds column snapshots, never User instances: those belong to the session of one request.
+user_cache: Optional[TTLCache[uuid.UUID, Dict[str, Any]]] = (
+    TTLCache(max_size=USER_CACHE_MAX_ENTRIES, ttl_seconds=USER_CACHE_TTL_SECONDS)
+    if USER_CACHE_TTL_SECONDS > 0 else None
+)
+decoded_token_cache: Optional[DecodedJWTCache] = (
+    DecodedJWTCache(max_size=JWT_DECODE_CACHE_MAX_ENTRIES)
+    if JWT_DECODE_CACHE_MAX_ENTRIES > 0 else None
+)
 
 
 # google_oauth_client = GoogleOAuth2(
@@ -22,6 +48,33 @@ SECRET = "SECRET"
 # )
 
 
+def create_password_helper() -> PasswordHelperProtocol:
+    if PASSWORD_HASH_WORKERS <= 0:
+        return PasswordHelper()
+    return AsyncPasswordHelper(
+        max_workers=PASSWORD_HASH_WORKERS,
+        max_concurrency=PASSWORD_HASH_MAX_CONCURRENCY,
+        use_processes=PASSWORD_HASH_USE_PROCESSES,
+    )
+
+
+# Until init_password_helper() runs, UserManager falls back to PasswordHelper().
+password_helper: Optional[PasswordHelperProtocol] = None
+
+
+async def init_password_helper() -> PasswordHelperProtocol:
+    global password_helper
+    password_helper = create_password_helper()
+    return password_helper
+
+
+async def close_password_helper() -> None:
+    global password_helper
+    if isinstance(password_helper, AsyncPasswordHelper):
+        password_helper.close()
+    password_helper = None
+
+
 class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
     reset_password_token_secret = SECRET
     verification_token_secret = SECRET
@@ -41,14 +94,21 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
 
 
 async def get_user_manager(user_db: SQLAlchemyUserDatabase = Depends(get_user_db)):
-    yield UserManager(user_db)
+    # One loader per request: lookups made concurrently share a single query.
+    user_loader = UserLoader(user_db)
+    yield UserManager(user_db, password_helper, user_cache=user_cache, user_loader=user_loader)
 
 
 bearer_transport = BearerTransport(tokenUrl="auth/jwt/login")
 
 
 def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(secret=SECRET, lifetime_seconds=3600)
+    return JWTStrategy(
+        secret=SECRET,
+        lifetime_seconds=3600,
+        user_cache=user_cache,
+        decoded_token_cache=decoded_token_cache,
+    )
 
 
 auth_backend = AuthenticationBackend(
@@ -0,0 +1,28 @@
+import asyncio
+
+from app import process_beautify_job
+from cache import close_result_cache, init_result_cache
+from db import load_compression_dictionaries
+from jobs import JOB_QUEUE_BACKEND, JOB_WORKERS, close_job_queue, init_job_queue
+from llm import close_completion_client, init_completion_client
+
+
+# Standalone generation workers for the `sql` job queue backend: run as many
+# of these as needed and start the API processes with JOB_WORKERS=0.
+async def main():
+    if JOB_QUEUE_BACKEND != "sql":
+        raise RuntimeError("Standalone workers need JOB_QUEUE_BACKEND=sql")
+    await load_compression_dictionaries()
+    await init_completion_client()
+    await init_result_cache()
+    await init_job_queue(process_beautify_job, max(JOB_WORKERS, 1))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await close_job_queue()
+        await close_result_cache()
+        await close_completion_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
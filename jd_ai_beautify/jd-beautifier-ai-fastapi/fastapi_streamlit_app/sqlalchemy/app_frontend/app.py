@@ -1,22 +1,40 @@
+import os
 import streamlit as st
 import requests
 import logging
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from streamlit.components.v1 import html
 from datetime import datetime, timedelta
+from html import escape
+from urllib.parse import urlencode
 # from streamlit_autorefresh import st_autorefresh
 # import login_decorator
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Backend API URL
-# BACKEND_URL = "http://127.0.0.1:8000" # local url
-BACKEND_URL = "http://backend:8000"   # only purpose  docker  backend url
+# Backend API URL: http://127.0.0.1:8000 when running locally, the default is the docker backend
+BACKEND_URL = os.environ.get("BACKEND_URL", "http://backend:8000").rstrip("/")
+# Timeouts of backend calls, in seconds. Beautifying waits for the LLM, so it gets its own read timeout.
+BACKEND_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("BACKEND_CONNECT_TIMEOUT_SECONDS", "3.05"))
+BACKEND_READ_TIMEOUT_SECONDS = float(os.environ.get("BACKEND_READ_TIMEOUT_SECONDS", "30"))
+BEAUTIFY_READ_TIMEOUT_SECONDS = float(os.environ.get("BEAUTIFY_READ_TIMEOUT_SECONDS", "300"))
+# Retries of idempotent calls (GET, PUT, DELETE) on connection errors and 502/503/504,
+# waiting BACKEND_RETRY_BACKOFF_SECONDS, then twice as long, and so on.
+BACKEND_RETRIES = int(os.environ.get("BACKEND_RETRIES", "3"))
+BACKEND_RETRY_BACKOFF_SECONDS = float(os.environ.get("BACKEND_RETRY_BACKOFF_SECONDS", "0.5"))
+# Keep-alive connections kept open to the backend, shared by every session of the process.
+BACKEND_POOL_SIZE = int(os.environ.get("BACKEND_POOL_SIZE", "10"))
 # job_names_history = {}
 SESSION_EXPIRATION = timedelta(minutes=30)
 
 FRONTEND_URL = "http://localhost:8501"
 
+# The sidebar history is fetched at most once per token in this window, unless
+# a beautify, delete, rename or archive invalidates it first.
+HISTORY_CACHE_TTL_SECONDS = 60
+
 
 #Deploy Button and Developer option  hide
 hide_streamlit_style = """
@@ -31,6 +49,32 @@ footer {visibility: hidden;}
 """
 st.markdown(hide_streamlit_style, unsafe_allow_html=True)
 
+@st.cache_resource
+def api_session():
+    # One pooled session per process: reruns reuse the open connections
+    # instead of connecting to the backend for every call.
+    retry = Retry(
+        total=BACKEND_RETRIES,
+        backoff_factor=BACKEND_RETRY_BACKOFF_SECONDS,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=BACKEND_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def api_request(method, path, token=None, read_timeout=BACKEND_READ_TIMEOUT_SECONDS, **kwargs):
+    headers = kwargs.pop("headers", {})
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return api_session().request(method, f"{BACKEND_URL}{path}", headers=headers,
+                                 timeout=(BACKEND_CONNECT_TIMEOUT_SECONDS, read_timeout), **kwargs)
+
+
 def copy_to_clipboard(text, key):
     return html(f"""
         <button onclick="navigator.clipboard.writeText(document.getElementById('text_{key}').value)">Copy</button>
@@ -99,7 +143,7 @@ def register():
                 "is_verified": is_verified
             }
             try:
-                response = requests.post(f"{BACKEND_URL}/auth/register", json=payload)
+                response = api_request("POST", "/auth/register", json=payload)
                 response.raise_for_status()
                 if response.status_code == 201:
                     st.success("Registered successfully")
@@ -119,7 +163,7 @@ def login():
 
     if submit_button:
         try:
-            response = requests.post(f"{BACKEND_URL}/auth/jwt/login", data={"username": email, "password": password})
+            response = api_request("POST", "/auth/jwt/login", data={"username": email, "password": password})
             response.raise_for_status()
             if response.status_code == 200:
                 token = response.json().get("access_token")
@@ -197,12 +241,12 @@ def beautify_job_description(token, job_data):
             st.warning("Job Description should be a valid non-empty  string")
         elif job_description.strip():
             try:
-                response = requests.post(f"{BACKEND_URL}/beautify_job_description",
-                                         json={"job_description": job_description,
-                                               "role": role_input,
-                                               "experience": experience_input,
-                                               "location": location_input},
-                                         headers={"Authorization": f"Bearer {token}"})
+                response = api_request("POST", "/beautify_job_description", token=token,
+                                       read_timeout=BEAUTIFY_READ_TIMEOUT_SECONDS,
+                                       json={"job_description": job_description,
+                                             "role": role_input,
+                                             "experience": experience_input,
+                                             "location": location_input})
                 response.raise_for_status()
 
                 data = response.json()
@@ -212,6 +256,7 @@ def beautify_job_description(token, job_data):
                     st.error("No beautified job descriptions found.")
 
                 else:
+                    invalidate_job_description_history(token)
                     for i, description in enumerate(beautified_job_description):
                         st.text_area(f"Beautified Job Description {i + 1}", description,
                                      key=f"beautified_job_description_{i + 1}", height=600)
@@ -234,84 +279,190 @@ def beautify_job_description(token, job_data):
 
 # job description history
 
+@st.cache_resource
+def _history_versions():
+    # Shared by every session: bumping the version of a token makes the
+    # sessions of that user fetch their history again.
+    return {}
+
+
+def invalidate_job_description_history(token):
+    versions = _history_versions()
+    versions[token] = versions.get(token, 0) + 1
+
+
+@st.cache_data(ttl=HISTORY_CACHE_TTL_SECONDS, show_spinner=False)
+def _fetch_job_description_history(token, version):
+    # Sidebar listing only needs id, role and created_at: fetch the summary
+    # projection, following the keyset cursor until the last page.
+    # Errors are raised, so that they are not cached.
+    job_descriptions = []
+    params = {"fields": "summary", "limit": 500}
+    while True:
+        response = api_request("GET", "/job_description_history", token=token, params=params)
+        response.raise_for_status()
+        job_descriptions.extend(response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            # Newest first, as returned by the keyset pagination.
+            return job_descriptions
+        params["cursor"] = next_cursor
+
+
 def get_job_description_history(token):
+    version = _history_versions().get(token, 0)
     try:
-        response = requests.get(f"{BACKEND_URL}/job_description_history",
-                                headers={"Authorization": f"Bearer {token}"})
-        response.raise_for_status()
-        return response.json()
+        return _fetch_job_description_history(token, version)
     except requests.exceptions.RequestException as e:
         st.error(f"Failed to fetch job description history: {e}")
         return []
 
 
+def get_job_description(token, job_id):
+    try:
+        response = api_request("GET", f"/job_description/{job_id}", token=token)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Job description fetch error: {e}")
+        return None
+
+
 def display_beautified_descriptions(job):
     st.title("Beautified Job Descriptions")
     st.write(f"**Role:** {job['role']}")
     st.write(f"**Experience:** {job['experience']}")
     st.write(f"**Location:** {job['location']}")
     st.write(f"**Job Description:**\n{job['job_description']}")
-    st.write(f"**Beautified Description 1:**\n{job['beautified_description_1']}")
-    st.write(f"**Beautified Description 2:**\n{job['beautified_description_2']}")
-    st.write(f"**Beautified Description 3:**\n{job['beautified_description_3']}")
+    for index, description in enumerate(job['beautified_descriptions'], start=1):
+        st.write(f"**Beautified Description {index}:**\n{description}")
 
 
-def delete_job_description(job_id: int):
+def delete_job_description(token, job_id: int):
     try:
-        response = requests.delete(f"{BACKEND_URL}/job_description/{job_id}")
+        response = api_request("DELETE", f"/job_description/{job_id}", token=token)
         response.raise_for_status()
+        invalidate_job_description_history(token)
         st.success("Job description deleted successfully.")
+        return True
     except requests.exceptions.RequestException as e:
         st.error(f"Failed to delete job description: {e}")
+        return False
 
 
-def rename_job_description(job_id: int, new_name: str):
+def rename_job_description(token, job_id: int, new_name: str):
     try:
-        response = requests.put(f"{BACKEND_URL}/job_description/{job_id}/rename", json={"new_name": new_name})
+        # The backend reads new_name from the query string.
+        response = api_request("PUT", f"/job_description/{job_id}/rename", token=token,
+                               params={"new_name": new_name})
         response.raise_for_status()
+        invalidate_job_description_history(token)
         st.success("Job description renamed successfully.")
+        return True
     except requests.exceptions.RequestException as e:
         st.error(f"Failed to rename job description: {e}")
+        return False
 
 
-def display_job_descriptions(jobs, heading):
-    from urllib.parse import urlencode
-    if jobs:
-        st.sidebar.markdown(f"### {heading}")
-        for idx, job in enumerate(jobs):
-            if st.session_state.get("authenticated", True):
-                token = st.session_state["token"]
-                token_param = urlencode({"token": token})
-                job_display = f"{job['role']}"
-                job_link = f"{FRONTEND_URL}/?page=beautify&job_id={job['id']}&{token_param}"
-
-                st.sidebar.markdown(
-                    f"""
-                    <style>
-                    .link-style a {{
-                        text-decoration: inherit !important;
-                        color: #000 !important;
-                        padding: .5rem !important;
-                        font-size: .875rem !important;
-                        line-height:1.25rem !important;
-                        height: 35px;
-                        align-items: center;
-                        display: flex;
-                    }}
-                    .link-style:hover a {{
-                      background-color: #dcdcdc;
-                      border-radius: 7px;
-                    }}
-
-                    </style>
-                    <div class="link-style">
-                        <a href="{job_link}" target="_blank">{job_display}</a>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-
-                # st.sidebar.markdown(f'<a href="{job_link}" style="text-decoration:inherit !important;" target="_blank">{job_display}</a>', unsafe_allow_html=True)
+def archive_job_description(token, job_id: int):
+    try:
+        response = api_request("PUT", f"/job_description/{job_id}/archive", token=token)
+        response.raise_for_status()
+        invalidate_job_description_history(token)
+        st.success("Job description archived successfully.")
+        return True
+    except requests.exceptions.RequestException as e:
+        st.error(f"Failed to archive job description: {e}")
+        return False
+
+
+def manage_job_description(token, job):
+    # The sidebar is drawn before the page: rerun after a change, so that it
+    # shows the history the mutation just invalidated.
+    with st.expander("Manage Job Description"):
+        new_name = st.text_input("New name", value=job['role'], key=f"rename_{job['id']}")
+        rename_column, archive_column, delete_column = st.columns(3)
+        with rename_column:
+            if st.button("Rename", key=f"rename_button_{job['id']}"):
+                if not new_name.strip():
+                    st.warning("Please enter a valid name")
+                elif rename_job_description(token, job['id'], new_name.strip()):
+                    st.rerun()
+        with archive_column:
+            if st.button("Archive", key=f"archive_button_{job['id']}"):
+                if archive_job_description(token, job['id']):
+                    st.rerun()
+        with delete_column:
+            if st.button("Delete", key=f"delete_button_{job['id']}"):
+                if delete_job_description(token, job['id']):
+                    st.experimental_set_query_params(page="create", token=token)
+                    st.rerun()
+
+
+# One stylesheet for the whole sidebar history, instead of one per link.
+JOB_HISTORY_STYLE = """
+<style>
+.job-history h3 {
+    margin: 1rem 0 .25rem 0;
+}
+.job-history .link-style a {
+    text-decoration: inherit !important;
+    color: #000 !important;
+    padding: .5rem !important;
+    font-size: .875rem !important;
+    line-height:1.25rem !important;
+    height: 35px;
+    align-items: center;
+    display: flex;
+}
+.job-history .link-style:hover a {
+  background-color: #dcdcdc;
+  border-radius: 7px;
+}
+</style>
+"""
+
+
+def group_job_history(job_descriptions, today):
+    # job_descriptions are sorted newest first, so the groups come out in order.
+    yesterday = today - timedelta(days=1)
+    seven_days_ago = today - timedelta(days=7)
+    thirty_days_ago = today - timedelta(days=30)
+
+    groups = {}
+    for job in job_descriptions:
+        job_date = datetime.fromisoformat(job['created_at']).date()
+        if job_date == today:
+            heading = "Today"
+        elif job_date == yesterday:
+            heading = "Yesterday"
+        elif seven_days_ago < job_date < yesterday:
+            heading = "Last 7 Days"
+        elif thirty_days_ago < job_date <= seven_days_ago:
+            heading = "Last 30 Days"
+        else:
+            heading = job_date.strftime("%B %Y")
+        groups.setdefault(heading, []).append(job)
+    return groups
+
+
+def render_job_history(job_descriptions, token, today):
+    token_param = urlencode({"token": token})
+    parts = [JOB_HISTORY_STYLE, '<div class="job-history">']
+    for heading, jobs in group_job_history(job_descriptions, today).items():
+        parts.append(f"<h3>{escape(heading)}</h3>")
+        for job in jobs:
+            job_link = f"{FRONTEND_URL}/?page=beautify&job_id={job['id']}&{token_param}"
+            parts.append(f'<div class="link-style"><a href="{escape(job_link)}" target="_blank">'
+                         f'{escape(job["role"])}</a></div>')
+    parts.append("</div>")
+    return "".join(parts)
+
+
+@st.cache_data(ttl=HISTORY_CACHE_TTL_SECONDS, show_spinner=False)
+def _job_history_html(token, version, today):
+    # Keyed like the fetch: rebuilt only when the history or the day changes.
+    return render_job_history(_fetch_job_description_history(token, version), token, today)
 
 
 
@@ -352,7 +503,7 @@ def handle_authenticated_user(page, job_id):
             st.experimental_set_query_params(page="create", token=token)
 
         job_descriptions = get_job_description_history(token)
-        display_job_history(job_descriptions)
+        display_job_history(token, job_descriptions)
 
         placeholder = st.empty()
         with placeholder.container():
@@ -373,58 +524,27 @@ def handle_authenticated_user(page, job_id):
         handle_page_navigation(page, job_id, job_descriptions)
 
 
-def display_job_history(job_descriptions):
+def display_job_history(token, job_descriptions):
     if job_descriptions:
-        for job in job_descriptions:
-            if 'created_at' not in job:
-                job['created_at'] = datetime.now().isoformat()
-        job_descriptions.sort(key=lambda x: x['created_at'], reverse=True)
+        version = _history_versions().get(token, 0)
         today = datetime.now().date()
-        yesterday = today - timedelta(days=1)
-        seven_days_ago = today - timedelta(days=7)
-        thirty_days_ago = today - timedelta(days=30)
-
-        today_jobs = []
-        yesterday_jobs = []
-        previous_jobs = []
-        last_seven_days_jobs = []
-        last_thirty_days_jobs = []
-        older_jobs_by_month = {}
-
-        for job in job_descriptions:
-            job_date = datetime.fromisoformat(job['created_at']).date()
-            if job_date == today:
-                today_jobs.append(job)
-            elif job_date == yesterday:
-                yesterday_jobs.append(job)
-            elif seven_days_ago < job_date < yesterday:
-                last_seven_days_jobs.append(job)
-            elif thirty_days_ago < job_date <= seven_days_ago:
-                last_thirty_days_jobs.append(job)
-            else:
-                month_year = job_date.strftime("%B %Y")
-                if month_year not in older_jobs_by_month:
-                    older_jobs_by_month[month_year] = []
-                older_jobs_by_month[month_year].append(job)
-
-        display_job_descriptions(today_jobs, "Today")
-        display_job_descriptions(yesterday_jobs, "Yesterday")
-        display_job_descriptions(previous_jobs, "Last 7 Days")
-        display_job_descriptions(last_thirty_days_jobs, "Last 30 Days")
-
-        for month_year, jobs in older_jobs_by_month.items():
-            display_job_descriptions(jobs, month_year)
-
+        try:
+            history_html = _job_history_html(token, version, today)
+        except requests.exceptions.RequestException:
+            # The cached fetch expired in between: render what was just fetched.
+            history_html = render_job_history(job_descriptions, token, today)
+        st.sidebar.markdown(history_html, unsafe_allow_html=True)
     else:
         st.warning("No job descriptions found.")
 
 
 def handle_page_navigation(page, job_id, job_descriptions):
     if page == "beautify" and job_id:
-        selected_job = next((job for job in job_descriptions if str(job["id"]) == job_id), None)
+        selected_job = get_job_description(st.session_state["token"], job_id)
         if selected_job:
             beautify_job_description(st.session_state["token"], selected_job)
             display_beautified_descriptions(selected_job)
+            manage_job_description(st.session_state["token"], selected_job)
         else:
             st.error("Job description not found.")
     elif page == "create":
@@ -437,7 +557,7 @@ def handle_page_navigation(page, job_id, job_descriptions):
 def load_user_data(token):
     with st.spinner("Loading..."):
         try:
-            response = requests.get(f"{BACKEND_URL}/users/me", headers={"Authorization": f"Bearer {token}"})
+            response = api_request("GET", "/users/me", token=token)
             response.raise_for_status()
             user_data = response.json()
             user_name = user_data["email"].split("@")[0]
@@ -0,0 +1,109 @@
+"""
+Per-request overhead of authentication with several backends configured.
+
+Each backend is a JWT bearer backend with its own secret. Requests carry a
+token for the first backend ("first") or for the last one ("last"), and the
+time of an unauthenticated route is subtracted, so the figures are the cost
+of the current_user dependency alone. Users are served from memory: no
+database is involved.
+
+    python auth_backends.py --requests 2000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import httpx
+from fastapi import Depends, FastAPI
+from fastapi_users import BaseUserManager, FastAPIUsers, UUIDIDMixin
+from fastapi_users.authentication import AuthenticationBackend, BearerTransport, JWTStrategy
+from fastapi_users.db import BaseUserDatabase
+
+
+@dataclass
+class User:
+    email: str
+    hashed_password: str = ""
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
+    is_active: bool = True
+    is_superuser: bool = False
+    is_verified: bool = True
+
+
+class MemoryUserDatabase(BaseUserDatabase[User, uuid.UUID]):
+    def __init__(self, users: Dict[uuid.UUID, User]):
+        self.users = users
+
+    async def get(self, id: uuid.UUID) -> Optional[User]:
+        return self.users.get(id)
+
+
+class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
+    pass
+
+
+def create_app(backend_count: int, user: User):
+    user_db = MemoryUserDatabase({user.id: user})
+
+    async def get_user_manager():
+        yield UserManager(user_db)
+
+    def make_backend(i: int) -> AuthenticationBackend:
+        def get_strategy() -> JWTStrategy:
+            return JWTStrategy(secret=f"SECRET{i}", lifetime_seconds=3600)
+
+        return AuthenticationBackend(
+            name=f"jwt{i}",
+            transport=BearerTransport(tokenUrl=f"auth/jwt{i}/login"),
+            get_strategy=get_strategy,
+        )
+
+    backends = [make_backend(i) for i in range(backend_count)]
+    fastapi_users = FastAPIUsers[User, uuid.UUID](get_user_manager, backends)
+    current_user = fastapi_users.current_user(active=True)
+
+    app = FastAPI()
+
+    @app.get("/anonymous")
+    async def anonymous():
+        return {}
+
+    @app.get("/authenticated")
+    async def authenticated(user: User = Depends(current_user)):
+        return {}
+
+    return app, backends
+
+
+async def measure(client: httpx.AsyncClient, path: str, headers: dict, requests: int) -> float:
+    for _ in range(100):
+        (await client.get(path, headers=headers)).raise_for_status()
+    start = time.perf_counter()
+    for _ in range(requests):
+        await client.get(path, headers=headers)
+    return (time.perf_counter() - start) / requests
+
+
+async def main(args):
+    user = User(email="bench@example.com")
+    print(f"{'backends':>8} {'token':>6} {'auth overhead':>14}")
+    for backend_count in args.backends:
+        app, backends = create_app(backend_count, user)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            baseline = await measure(client, "/anonymous", {}, args.requests)
+            for label, backend in (("first", backends[0]), ("last", backends[-1])):
+                token = await backend.get_strategy().write_token(user)
+                headers = {"Authorization": f"Bearer {token}"}
+                elapsed = await measure(client, "/authenticated", headers, args.requests)
+                print(f"{backend_count:>8} {label:>6} {(elapsed - baseline) * 1e6:>11.0f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--backends", type=int, nargs="+", default=[1, 3, 5])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,62 @@
+"""
+Concurrent load test for /beautify_job_description.
+
+Start the backend with the offline stub LLM backend, then run this script:
+
+    LLM_BACKEND=stub LLM_STUB_LATENCY_SECONDS=2 python app.py
+    python beautify_load.py --requests 50 --concurrency 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+JOB = {
+    "job_description": "We are looking for a Python developer to build REST APIs.",
+    "role": "Python Developer",
+    "experience": "2-4 years",
+    "location": "Chennai",
+}
+
+
+async def get_token(client: httpx.AsyncClient, email: str, password: str) -> str:
+    await client.post("/auth/register", json={"email": email, "password": password})
+    response = await client.post("/auth/jwt/login", data={"username": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def main(args):
+    async with httpx.AsyncClient(base_url=args.url, timeout=None) as client:
+        token = await get_token(client, args.email, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies = []
+
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(args.path, json=JOB, headers=headers)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(args.requests)))
+        elapsed = time.perf_counter() - start
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}: {elapsed:.2f}s total")
+    print(f"throughput: {args.requests / elapsed:.2f} req/s")
+    print(f"latency p50: {statistics.median(latencies):.3f}s max: {max(latencies):.3f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/beautify_job_description")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--email", default="loadtest@example.com")
+    parser.add_argument("--password", default="loadtest")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,80 @@
+"""
+Login throughput, and latency of other requests during a login burst.
+
+Start the backend once hashing on the event loop, then with the hashing pool,
+and run this script against each:
+
+    PASSWORD_HASH_WORKERS=0 python app.py
+    python login_throughput.py --logins 200 --concurrency 50
+
+    PASSWORD_HASH_WORKERS=4 python app.py
+    python login_throughput.py --logins 200 --concurrency 50
+
+A quarter of the logins use unknown e-mails, which still run a dummy hash.
+While logins run, GET /users/me is polled; it hashes nothing, so its latency
+shows how long the event loop is blocked.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> httpx.Response:
+    return await client.post("/auth/jwt/login", data={"username": email, "password": password})
+
+
+async def main(args):
+    emails = [f"login{i}@example.com" for i in range(args.users)]
+    async with httpx.AsyncClient(base_url=args.url, timeout=None) as client:
+        for email in emails:
+            await client.post("/auth/register", json={"email": email, "password": args.password})
+        response = await login(client, emails[0], args.password)
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        login_latencies = []
+        probe_latencies = []
+        done = asyncio.Event()
+
+        async def one(i: int):
+            email = emails[i % len(emails)] if i % 4 else f"unknown{i}@example.com"
+            async with semaphore:
+                start = time.perf_counter()
+                response = await login(client, email, args.password)
+                login_latencies.append(time.perf_counter() - start)
+                if i % 4 and response.status_code != 200:
+                    raise RuntimeError(f"login failed: {response.status_code}")
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                (await client.get("/users/me", headers=headers)).raise_for_status()
+                probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.05)
+
+        prober = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await prober
+
+    print(f"{args.logins} logins, concurrency {args.concurrency}: {elapsed:.2f}s total")
+    print(f"throughput: {args.logins / elapsed:.2f} logins/s")
+    print(f"login latency p50: {statistics.median(login_latencies):.3f}s max: {max(login_latencies):.3f}s")
+    print(f"/users/me during the burst p50: {statistics.median(probe_latencies):.3f}s "
+          f"max: {max(probe_latencies):.3f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--password", default="loadtest")
+    asyncio.run(main(parser.parse_args()))
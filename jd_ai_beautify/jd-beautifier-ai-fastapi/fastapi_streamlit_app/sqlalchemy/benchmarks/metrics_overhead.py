@@ -0,0 +1,68 @@
+"""
+Cost of the /metrics instrumentation on the hot path.
+
+Measures a single histogram observation and counter increment, then the
+per-request overhead of MetricsMiddleware on an in-process app with one
+trivial route. No server or database is involved.
+
+    python metrics_overhead.py --requests 5000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import timeit
+
+import httpx
+from fastapi import FastAPI
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from metrics import HTTP_REQUESTS, HTTP_REQUEST_SECONDS, MetricsMiddleware, registry  # noqa: E402
+
+
+def create_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def measure(app: FastAPI, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(200):
+            (await client.get(f"/items/{i}")).raise_for_status()
+        start = time.perf_counter()
+        for i in range(requests):
+            await client.get(f"/items/{i}")
+        return (time.perf_counter() - start) / requests
+
+
+async def main(args):
+    number = 1_000_000
+    observe = timeit.timeit(lambda: HTTP_REQUEST_SECONDS.observe(0.042, ("GET", "/bench")), number=number)
+    inc = timeit.timeit(lambda: HTTP_REQUESTS.inc(labels=("GET", "/bench", "200")), number=number)
+    print(f"histogram observe {observe / number * 1e9:>8.0f} ns")
+    print(f"counter inc       {inc / number * 1e9:>8.0f} ns")
+
+    baseline = await measure(create_app(False), args.requests)
+    instrumented = await measure(create_app(True), args.requests)
+    print(f"request           {baseline * 1e6:>8.0f} us")
+    print(f"with metrics      {instrumented * 1e6:>8.0f} us ({(instrumented - baseline) * 1e6:+.0f} us)")
+
+    start = time.perf_counter()
+    body = registry.render()
+    print(f"render            {(time.perf_counter() - start) * 1e6:>8.0f} us ({len(body)} bytes)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    asyncio.run(main(parser.parse_args()))
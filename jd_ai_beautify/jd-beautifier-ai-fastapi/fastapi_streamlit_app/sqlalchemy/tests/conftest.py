@@ -0,0 +1,53 @@
+import os
+import sys
+import tempfile
+import uuid
+from typing import AsyncGenerator, Dict
+
+import httpx
+import pytest
+from asgi_lifespan import LifespanManager
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+# The app modules read their settings when imported: one SQLite database and
+# the stub LLM backend for the whole test session.
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+os.environ.setdefault("LLM_BACKEND", "stub")
+os.environ.setdefault("LLM_STUB_LATENCY_SECONDS", "0")
+sys.path.insert(0, APP_DIR)
+
+JOB_DESCRIPTION = {
+    "job_description": "We need a Python developer",
+    "role": "Python Developer",
+    "experience": "2-4 years",
+    "location": "Chennai",
+}
+
+
+@pytest.fixture
+async def app_client(
+    monkeypatch: pytest.MonkeyPatch,
+) -> AsyncGenerator[httpx.AsyncClient, None]:
+    from app import app
+
+    # The app runs from its directory, where alembic.ini finds the migrations.
+    monkeypatch.chdir(APP_DIR)
+
+    async with LifespanManager(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://app.io"
+        ) as client:
+            yield client
+
+
+@pytest.fixture
+async def auth_headers(app_client: httpx.AsyncClient) -> Dict[str, str]:
+    email = f"{uuid.uuid4()}@example.com"
+    await app_client.post("/auth/register", json={"email": email, "password": "guinevere"})
+    response = await app_client.post(
+        "/auth/jwt/login", data={"username": email, "password": "guinevere"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
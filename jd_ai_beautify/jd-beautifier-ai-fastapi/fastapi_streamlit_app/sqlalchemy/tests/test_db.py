@@ -0,0 +1,32 @@
+import asyncio
+import contextlib
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+
+@pytest.mark.app
+@pytest.mark.asyncio
+async def test_replica_hanging_on_connect_is_unhealthy(monkeypatch: pytest.MonkeyPatch):
+    from db import ReplicaRouter, async_session_maker
+
+    replica = create_async_engine("sqlite+aiosqlite://")
+    hanging_replica = create_async_engine("sqlite+aiosqlite://")
+    connect = AsyncEngine.connect
+
+    @contextlib.asynccontextmanager
+    async def hanging_connect():
+        await asyncio.Event().wait()
+        yield
+
+    monkeypatch.setattr(
+        AsyncEngine,
+        "connect",
+        lambda engine: hanging_connect() if engine is hanging_replica else connect(engine),
+    )
+    router = ReplicaRouter([replica, hanging_replica], async_session_maker, check_timeout_seconds=0.1)
+    try:
+        await asyncio.wait_for(router.check(), 1)
+        assert router.healthy == [replica]
+    finally:
+        await router.aclose()
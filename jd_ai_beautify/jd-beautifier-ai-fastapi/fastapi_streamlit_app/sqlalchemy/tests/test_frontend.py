@@ -0,0 +1,117 @@
+import importlib.util
+import os
+from types import ModuleType
+from typing import Any, Dict, Generator, List, Tuple
+
+import pytest
+
+pytest.importorskip("streamlit")
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# This app's frontend, and the standalone copy at the root of jd_ai_beautify.
+FRONTEND_PATHS = [
+    os.path.join(TESTS_DIR, "..", "app_frontend", "app.py"),
+    os.path.join(TESTS_DIR, "..", "..", "..", "..", "app_frontend.py"),
+]
+TOKEN = "TOKEN"
+JOB_SUMMARY = {"id": 1, "role": "Python Developer", "created_at": "2026-10-18T10:00:00"}
+
+
+class FakeResponse:
+    def __init__(self, payload: Any):
+        self.payload = payload
+        self.headers: Dict[str, str] = {}
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> Any:
+        return self.payload
+
+
+@pytest.fixture(params=FRONTEND_PATHS, ids=["app_frontend", "root"])
+def frontend(request: pytest.FixtureRequest) -> Generator[ModuleType, None, None]:
+    # Loaded from its path: the backend module is also named "app".
+    spec = importlib.util.spec_from_file_location("app_frontend", request.param)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    yield module
+    module._fetch_job_description_history.clear()
+    module._history_versions.clear()
+
+
+@pytest.fixture
+def api_calls(
+    frontend: ModuleType, monkeypatch: pytest.MonkeyPatch
+) -> List[Tuple[str, str, Dict[str, Any]]]:
+    calls: List[Tuple[str, str, Dict[str, Any]]] = []
+
+    def api_request(method, path, token=None, **kwargs):
+        calls.append((method, path, kwargs))
+        if path == "/job_description_history":
+            return FakeResponse([JOB_SUMMARY])
+        return FakeResponse({})
+
+    monkeypatch.setattr(frontend, "api_request", api_request)
+    return calls
+
+
+def history_fetches(api_calls: List[Tuple[str, str, Dict[str, Any]]]) -> int:
+    return sum(path == "/job_description_history" for _, path, _ in api_calls)
+
+
+@pytest.mark.app
+@pytest.mark.parametrize(
+    "helper,args,method,path",
+    [
+        ("delete_job_description", (1,), "DELETE", "/job_description/1"),
+        (
+            "rename_job_description",
+            (1, "Senior Python Developer"),
+            "PUT",
+            "/job_description/1/rename",
+        ),
+        ("archive_job_description", (1,), "PUT", "/job_description/1/archive"),
+    ],
+)
+def test_mutation_invalidates_history(frontend, api_calls, helper, args, method, path):
+    assert frontend.get_job_description_history(TOKEN) == [JOB_SUMMARY]
+    assert frontend.get_job_description_history(TOKEN) == [JOB_SUMMARY]
+    assert history_fetches(api_calls) == 1
+
+    assert getattr(frontend, helper)(TOKEN, *args) is True
+    assert api_calls[-1][:2] == (method, path)
+
+    assert frontend.get_job_description_history(TOKEN) == [JOB_SUMMARY]
+    assert history_fetches(api_calls) == 2
+
+
+@pytest.mark.app
+def test_rename_sends_query_parameter(frontend, api_calls):
+    frontend.rename_job_description(TOKEN, 1, "Senior Python Developer")
+
+    _, _, kwargs = api_calls[-1]
+    assert kwargs["params"] == {"new_name": "Senior Python Developer"}
+    assert "json" not in kwargs
+
+
+@pytest.mark.app
+def test_api_request(frontend, monkeypatch: pytest.MonkeyPatch):
+    calls = []
+    monkeypatch.setattr(
+        frontend.api_session(),
+        "request",
+        lambda method, url, **kwargs: calls.append((method, url, kwargs)),
+    )
+
+    frontend.api_request("GET", "/users/me", token=TOKEN)
+
+    method, url, kwargs = calls[0]
+    assert (method, url) == ("GET", f"{frontend.BACKEND_URL}/users/me")
+    assert kwargs["headers"] == {"Authorization": f"Bearer {TOKEN}"}
+    assert kwargs["timeout"] == (
+        frontend.BACKEND_CONNECT_TIMEOUT_SECONDS,
+        frontend.BACKEND_READ_TIMEOUT_SECONDS,
+    )
+    assert frontend.api_session() is frontend.api_session()
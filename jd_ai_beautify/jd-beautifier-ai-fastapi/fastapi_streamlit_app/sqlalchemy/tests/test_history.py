@@ -0,0 +1,82 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+
+import httpx
+import pytest
+
+from conftest import JOB_DESCRIPTION
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+@pytest.mark.app
+@pytest.mark.asyncio
+async def test_created_range_with_offset(
+    app_client: httpx.AsyncClient, auth_headers: Dict[str, str]
+):
+    response = await app_client.post(
+        "/beautify_job_description", json=JOB_DESCRIPTION, headers=auth_headers
+    )
+    assert response.status_code == 200
+
+    history = await app_client.get("/job_description_history", headers=auth_headers)
+    created_at = datetime.fromisoformat(history.json()[0]["created_at"])
+    # created_at is naive UTC; the bounds are the same instants in +05:30.
+    before = (created_at - timedelta(minutes=1)).replace(tzinfo=timezone.utc).astimezone(IST)
+    after = (created_at + timedelta(minutes=1)).replace(tzinfo=timezone.utc).astimezone(IST)
+
+    response = await app_client.get(
+        "/job_description_history",
+        params={"created_from": before.isoformat(), "created_to": after.isoformat()},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+
+    response = await app_client.get(
+        "/job_description_history",
+        params={"created_from": after.isoformat()},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+async def history_roles(app_client: httpx.AsyncClient, auth_headers: Dict[str, str], **params):
+    response = await app_client.get(
+        "/job_description_history", params={"fields": "summary", **params}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    return sorted(job["role"] for job in response.json())
+
+
+@pytest.mark.app
+@pytest.mark.asyncio
+async def test_filters(app_client: httpx.AsyncClient, auth_headers: Dict[str, str]):
+    from sqlalchemy import update
+
+    from db import JobDescription, async_session_maker
+
+    for role in ("100% Remote Developer", "Python_Developer", "Python Developer"):
+        response = await app_client.post(
+            "/beautify_job_description", json={**JOB_DESCRIPTION, "role": role}, headers=auth_headers
+        )
+        assert response.status_code == 200
+    user_id = uuid.UUID((await app_client.get("/users/me", headers=auth_headers)).json()["id"])
+    async with async_session_maker() as session:
+        await session.execute(
+            update(JobDescription)
+            .where(JobDescription.role == "Python Developer", JobDescription.user_id == user_id)
+            .values(archived=None)
+        )
+        await session.commit()
+
+    # % and _ match themselves, not any characters.
+    assert await history_roles(app_client, auth_headers, role="0% R") == ["100% Remote Developer"]
+    assert await history_roles(app_client, auth_headers, role="n_D") == ["Python_Developer"]
+    # NULL is not archived.
+    assert await history_roles(app_client, auth_headers, archived=False) == [
+        "100% Remote Developer", "Python Developer", "Python_Developer"
+    ]
+    assert await history_roles(app_client, auth_headers, archived=True) == []
@@ -0,0 +1,89 @@
+import asyncio
+import uuid
+from typing import Any, Dict
+
+import httpx
+import pytest
+
+from conftest import JOB_DESCRIPTION
+
+
+class FlakyJobQueue:
+    """MemoryJobQueue whose first dequeue and first complete fail."""
+
+    def __init__(self):
+        from jobs import MemoryJobQueue
+
+        self.queue = MemoryJobQueue()
+        self.dequeue_errors = 1
+        self.complete_errors = 1
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.queue, name)
+
+    async def dequeue(self):
+        if self.dequeue_errors:
+            self.dequeue_errors -= 1
+            raise ConnectionError("database unreachable")
+        return await self.queue.dequeue()
+
+    async def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        if self.complete_errors:
+            self.complete_errors -= 1
+            raise ConnectionError("database unreachable")
+        await self.queue.complete(job_id, result)
+
+
+@pytest.mark.app
+@pytest.mark.asyncio
+async def test_worker_survives_queue_errors():
+    from jobs import JOB_RUNNING, JOB_SUCCEEDED, JobWorkerPool
+
+    async def handler(job):
+        return {"beautified_job_description": [job.payload["text"]]}
+
+    queue = FlakyJobQueue()
+    pool = JobWorkerPool(queue, handler, workers=1, error_backoff=0)
+    first_job = await queue.enqueue(uuid.uuid4(), {"text": "first"})
+    second_job = await queue.enqueue(uuid.uuid4(), {"text": "second"})
+    pool.start()
+    try:
+        finished_job = await queue.wait(second_job.id, 5)
+    finally:
+        await pool.stop()
+
+    assert finished_job.status == JOB_SUCCEEDED
+    assert finished_job.result == {"beautified_job_description": ["second"]}
+    # Its result could not be stored: left running, for the stale job pickup.
+    assert (await queue.get(first_job.id)).status == JOB_RUNNING
+
+
+@pytest.mark.app
+@pytest.mark.asyncio
+async def test_async_beautify(
+    app_client: httpx.AsyncClient, auth_headers: Dict[str, str]
+):
+    response = await app_client.post(
+        "/beautify_job_description",
+        params={"async": True},
+        json=JOB_DESCRIPTION,
+        headers=auth_headers,
+    )
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+
+    for _ in range(100):
+        response = await app_client.get(f"/jobs/{job_id}", headers=auth_headers)
+        assert response.status_code == 200
+        if response.json()["status"] == "succeeded":
+            break
+        await asyncio.sleep(0.05)
+    job = response.json()
+    assert job["status"] == "succeeded"
+    assert len(job["result"]["beautified_job_description"]) > 0
+
+    response = await app_client.get(f"/job_description/{job['result']['id']}", headers=auth_headers)
+    assert response.status_code == 200
+
+    response = await app_client.get(f"/jobs/{uuid.uuid4()}", headers=auth_headers)
+    assert response.status_code == 404
@@ -0,0 +1,62 @@
+import asyncio
+import uuid
+from typing import Dict
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@pytest.mark.app
+@pytest.mark.asyncio
+async def test_concurrent_updates_of_cached_user(
+    app_client: httpx.AsyncClient,
+    auth_headers: Dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # Fills the user cache.
+    response = await app_client.get("/users/me", headers=auth_headers)
+    assert response.status_code == 200
+    email = response.json()["email"]
+
+    commit = AsyncSession.commit
+
+    async def slow_commit(self: AsyncSession) -> None:
+        # Both requests hold the user in their session at the same time.
+        await asyncio.sleep(0.1)
+        await commit(self)
+
+    monkeypatch.setattr(AsyncSession, "commit", slow_commit)
+    responses = await asyncio.gather(
+        app_client.patch("/users/me", json={"email": f"a-{email}"}, headers=auth_headers),
+        app_client.patch("/users/me", json={"email": f"b-{email}"}, headers=auth_headers),
+    )
+    assert [response.status_code for response in responses] == [200, 200]
+
+    response = await app_client.get("/users/me", headers=auth_headers)
+    assert response.json()["email"] in {f"a-{email}", f"b-{email}"}
+
+
+@pytest.mark.app
+@pytest.mark.asyncio
+async def test_update_attached_user(
+    app_client: httpx.AsyncClient, auth_headers: Dict[str, str]
+):
+    from db import User, UserDatabase, async_session_maker
+
+    response = await app_client.get("/users/me", headers=auth_headers)
+    user_id = uuid.UUID(response.json()["id"])
+
+    # Built from a token snapshot: only some columns, no session.
+    user = User(id=user_id, email=response.json()["email"], is_active=True)
+    async with async_session_maker() as session:
+        user_db = UserDatabase(session, User)
+        updated_user = await user_db.update(await user_db.attach(user), {"is_verified": True})
+        assert updated_user.is_verified is True
+        assert updated_user.hashed_password
+
+    async with async_session_maker() as session:
+        stored_user = await session.get(User, user_id)
+        assert stored_user is not None
+        assert stored_user.is_verified is True
+        assert stored_user.hashed_password == updated_user.hashed_password
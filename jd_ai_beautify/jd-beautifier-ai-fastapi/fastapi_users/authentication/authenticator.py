@@ -1,8 +1,23 @@
+import inspect
 import re
+from contextlib import AsyncExitStack
 from inspect import Parameter, Signature
-from typing import Callable, List, Optional, Sequence, Tuple, cast
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.dependencies.models import Dependant
+from fastapi.dependencies.utils import get_dependant, solve_dependencies
+from fastapi.exceptions import RequestValidationError
 from makefun import with_signature
 
 from fastapi_users import models
@@ -13,6 +28,8 @@ from fastapi_users.types import DependencyCallable
 
 INVALID_CHARS_PATTERN = re.compile(r"[^0-9a-zA-Z_]")
 INVALID_LEADING_CHARS_PATTERN = re.compile(r"^[^a-zA-Z_]+")
+# The arguments of solve_dependencies changed along FastAPI versions.
+SOLVE_DEPENDENCIES_PARAMETERS = inspect.signature(solve_dependencies).parameters
 
 
 def name_to_variable_name(name: str) -> str:
@@ -27,10 +44,80 @@ def name_to_strategy_variable_name(name: str) -> str:
     return f"strategy_{name_to_variable_name(name)}"
 
 
+def is_lazy_dependency(dependency: Callable[..., Any]) -> bool:
+    """
+    Whether a dependency callable can be called directly, without FastAPI.
+
+    That's the case when it has no parameter to inject and doesn't yield.
+    """
+    if inspect.isgeneratorfunction(dependency) or inspect.isasyncgenfunction(
+        dependency
+    ):
+        return False
+    try:
+        return len(inspect.signature(dependency).parameters) == 0
+    except (TypeError, ValueError):  # pragma: no cover
+        return False
+
+
+async def call_lazy_dependency(dependency: Callable[..., Any]) -> Any:
+    """Call a dependency callable accepted by `is_lazy_dependency`."""
+    result = dependency()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+def get_strategy_dependant(get_strategy: DependencyCallable[Strategy]) -> Dependant:
+    """Build a dependant resolving `get_strategy` as a route dependency would."""
+
+    def strategy_dependency(strategy=Depends(get_strategy)):
+        return strategy  # pragma: no cover
+
+    return get_dependant(path="", call=strategy_dependency)
+
+
+async def solve_strategy_dependant(
+    request: Request, dependant: Dependant, async_exit_stack: AsyncExitStack
+) -> Any:
+    """
+    Resolve a dependant built by `get_strategy_dependant` with FastAPI.
+
+    `dependency_overrides` of the application apply, but the dependencies
+    aren't shared with the ones of the route.
+    """
+    kwargs: Dict[str, Any] = {}
+    if "async_exit_stack" in SOLVE_DEPENDENCIES_PARAMETERS:
+        kwargs["async_exit_stack"] = async_exit_stack
+    if "embed_body_fields" in SOLVE_DEPENDENCIES_PARAMETERS:  # pragma: no cover
+        kwargs["embed_body_fields"] = False
+    solved: Any = await solve_dependencies(
+        request=request,
+        dependant=dependant,
+        dependency_overrides_provider=request.app,
+        **kwargs,
+    )
+    # A tuple up to FastAPI 0.112, a SolvedDependency afterwards.
+    values, errors = (
+        solved[:2] if isinstance(solved, tuple) else (solved.values, solved.errors)
+    )
+    if errors:
+        raise RequestValidationError(errors)
+    return values["strategy"]
+
+
 class DuplicateBackendNamesError(Exception):
     pass
 
 
+class BackendParameters(NamedTuple):
+    backend: AuthenticationBackend
+    token_name: str
+    strategy_name: str
+    lazy_strategy: bool
+    strategy_dependant: Dependant
+
+
 EnabledBackendsDependency = DependencyCallable[Sequence[AuthenticationBackend]]
 
 
@@ -55,6 +142,16 @@ class Authenticator:
     ):
         self.backends = backends
         self.get_user_manager = get_user_manager
+        self._backend_parameters = [
+            BackendParameters(
+                backend,
+                name_to_variable_name(backend.name),
+                name_to_strategy_variable_name(backend.name),
+                is_lazy_dependency(backend.get_strategy),
+                get_strategy_dependant(backend.get_strategy),
+            )
+            for backend in backends
+        ]
 
     def current_user_token(
         self,
@@ -148,6 +245,7 @@ class Authenticator:
     async def _authenticate(
         self,
         *args,
+        request: Request,
         user_manager: BaseUserManager[models.UP, models.ID],
         optional: bool = False,
         active: bool = False,
@@ -157,19 +255,44 @@ class Authenticator:
     ) -> Tuple[Optional[models.UP], Optional[str]]:
         user: Optional[models.UP] = None
         token: Optional[str] = None
-        enabled_backends: Sequence[AuthenticationBackend] = kwargs.get(
-            "enabled_backends", self.backends
+        enabled_backends: Optional[Sequence[AuthenticationBackend]] = kwargs.get(
+            "enabled_backends"
         )
-        for backend in self.backends:
-            if backend in enabled_backends:
-                token = kwargs[name_to_variable_name(backend.name)]
-                strategy: Strategy[models.UP, models.ID] = kwargs[
-                    name_to_strategy_variable_name(backend.name)
-                ]
-                if token is not None:
-                    user = await strategy.read_token(token, user_manager)
-                    if user:
-                        break
+        enabled_backend_ids = (
+            None
+            if enabled_backends is None
+            else {id(backend) for backend in enabled_backends}
+        )
+        async with AsyncExitStack() as async_exit_stack:
+            for parameters in self._backend_parameters:
+                if (
+                    enabled_backend_ids is not None
+                    and id(parameters.backend) not in enabled_backend_ids
+                ):
+                    continue
+                token = kwargs[parameters.token_name]
+                if token is None:
+                    continue
+                # Strategies without dependencies are only built when a token
+                # has to be read, and not at all once a backend yielded a user.
+                if parameters.lazy_strategy:
+                    get_strategy = self._get_strategy_override(
+                        request, parameters.backend
+                    )
+                    if is_lazy_dependency(get_strategy):
+                        strategy = await call_lazy_dependency(get_strategy)
+                    else:
+                        # Overridden with dependencies of its own.
+                        strategy = await solve_strategy_dependant(
+                            request, parameters.strategy_dependant, async_exit_stack
+                        )
+                else:
+                    strategy = kwargs[parameters.strategy_name]
+                user = await cast(Strategy[models.UP, models.ID], strategy).read_token(
+                    token, user_manager
+                )
+                if user:
+                    break
 
         status_code = status.HTTP_401_UNAUTHORIZED
         if user:
@@ -185,6 +308,18 @@ class Authenticator:
             raise HTTPException(status_code=status_code)
         return user, token
 
+    def _get_strategy_override(
+        self, request: Request, backend: AuthenticationBackend
+    ) -> Callable[..., Any]:
+        """
+        Return the callable building the strategy of a lazy backend.
+
+        FastAPI doesn't see those strategies, so `dependency_overrides`
+        of the application are applied here.
+        """
+        dependency_overrides = getattr(request.app, "dependency_overrides", {})
+        return dependency_overrides.get(backend.get_strategy, backend.get_strategy)
+
     def _get_dependency_signature(
         self, get_enabled_backends: Optional[EnabledBackendsDependency] = None
     ) -> Signature:
@@ -198,26 +333,36 @@ class Authenticator:
         """
         try:
             parameters: List[Parameter] = [
+                Parameter(
+                    name="request",
+                    kind=Parameter.POSITIONAL_OR_KEYWORD,
+                    annotation=Request,
+                ),
                 Parameter(
                     name="user_manager",
                     kind=Parameter.POSITIONAL_OR_KEYWORD,
                     default=Depends(self.get_user_manager),
-                )
+                ),
             ]
 
-            for backend in self.backends:
-                parameters += [
+            for backend, token_name, strategy_name, lazy, _ in self._backend_parameters:
+                parameters.append(
                     Parameter(
-                        name=name_to_variable_name(backend.name),
+                        name=token_name,
                         kind=Parameter.POSITIONAL_OR_KEYWORD,
                         default=Depends(cast(Callable, backend.transport.scheme)),
-                    ),
-                    Parameter(
-                        name=name_to_strategy_variable_name(backend.name),
-                        kind=Parameter.POSITIONAL_OR_KEYWORD,
-                        default=Depends(backend.get_strategy),
-                    ),
-                ]
+                    )
+                )
+                # Strategies with dependencies of their own are left to FastAPI,
+                # which resolves them before authenticating.
+                if not lazy:
+                    parameters.append(
+                        Parameter(
+                            name=strategy_name,
+                            kind=Parameter.POSITIONAL_OR_KEYWORD,
+                            default=Depends(backend.get_strategy),
+                        )
+                    )
 
             if get_enabled_backends is not None:
                 parameters += [
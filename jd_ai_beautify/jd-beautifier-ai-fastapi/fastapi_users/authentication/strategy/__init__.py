@@ -4,24 +4,36 @@ from fastapi_users.authentication.strategy.base import (
 )
 from fastapi_users.authentication.strategy.db import (
     AP,
+    AccessTokenCache,
     AccessTokenDatabase,
+    AccessTokenDeleteByTokenDatabase,
     AccessTokenProtocol,
+    AccessTokenUsesDatabase,
     DatabaseStrategy,
 )
 from fastapi_users.authentication.strategy.jwt import JWTStrategy
 
 try:
-    from fastapi_users.authentication.strategy.redis import RedisStrategy
+    from fastapi_users.authentication.strategy.redis import (
+        JSONUserSnapshot,
+        RedisStrategy,
+        UserSnapshotSerializer,
+    )
 except ImportError:  # pragma: no cover
     pass
 
 __all__ = [
     "AP",
+    "AccessTokenCache",
     "AccessTokenDatabase",
+    "AccessTokenDeleteByTokenDatabase",
     "AccessTokenProtocol",
+    "AccessTokenUsesDatabase",
     "DatabaseStrategy",
+    "JSONUserSnapshot",
     "JWTStrategy",
     "Strategy",
     "StrategyDestroyNotSupportedError",
     "RedisStrategy",
+    "UserSnapshotSerializer",
 ]
@@ -1,5 +1,18 @@
-from fastapi_users.authentication.strategy.db.adapter import AccessTokenDatabase
+from fastapi_users.authentication.strategy.db.adapter import (
+    AccessTokenDatabase,
+    AccessTokenDeleteByTokenDatabase,
+    AccessTokenUsesDatabase,
+)
+from fastapi_users.authentication.strategy.db.cache import AccessTokenCache
 from fastapi_users.authentication.strategy.db.models import AP, AccessTokenProtocol
 from fastapi_users.authentication.strategy.db.strategy import DatabaseStrategy
 
-__all__ = ["AP", "AccessTokenDatabase", "AccessTokenProtocol", "DatabaseStrategy"]
+__all__ = [
+    "AP",
+    "AccessTokenCache",
+    "AccessTokenDatabase",
+    "AccessTokenDeleteByTokenDatabase",
+    "AccessTokenProtocol",
+    "AccessTokenUsesDatabase",
+    "DatabaseStrategy",
+]
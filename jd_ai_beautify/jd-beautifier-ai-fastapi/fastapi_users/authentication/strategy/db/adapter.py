@@ -0,0 +1,58 @@
+from datetime import datetime
+from typing import Any, Dict, Generic, Optional, Protocol
+
+from fastapi_users.authentication.strategy.db.models import AP
+
+
+class AccessTokenDatabase(Protocol, Generic[AP]):
+    """Protocol for retrieving, creating and updating access tokens from a database."""
+
+    async def get_by_token(
+        self, token: str, max_age: Optional[datetime] = None
+    ) -> Optional[AP]:
+        """Get a single access token by token."""
+        ...  # pragma: no cover
+
+    async def create(self, create_dict: Dict[str, Any]) -> AP:
+        """Create an access token."""
+        ...  # pragma: no cover
+
+    async def update(self, access_token: AP, update_dict: Dict[str, Any]) -> AP:
+        """Update an access token."""
+        ...  # pragma: no cover
+
+    async def delete(self, access_token: AP) -> None:
+        """Delete an access token."""
+        ...  # pragma: no cover
+
+
+class AccessTokenDeleteByTokenDatabase(AccessTokenDatabase[AP], Protocol):
+    """Access token database able to delete a token without reading it first."""
+
+    async def delete_by_token(self, token: str) -> None:
+        """
+        Delete an access token by token, in a single statement.
+
+        Tokens that don't exist are skipped.
+        """
+        ...  # pragma: no cover
+
+
+class AccessTokenUsesDatabase(AccessTokenDatabase[AP], Protocol):
+    """
+    Access token database able to record the uses of tokens, for sliding expiry.
+
+    The last use of a token is stored in its `created_at`, so no extra column
+    is needed: with sliding expiry, `created_at` is the start of the current
+    lifetime of the token, not its creation date. Don't rely on it to know when
+    a user logged in.
+    """
+
+    async def update_last_used(self, last_used: Dict[str, datetime]) -> None:
+        """
+        Set the `created_at` of several access tokens, by token.
+
+        All of them should be written in a single statement and transaction.
+        Tokens that no longer exist are skipped.
+        """
+        ...  # pragma: no cover
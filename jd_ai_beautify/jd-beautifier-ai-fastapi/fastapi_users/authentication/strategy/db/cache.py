@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import (
+    Any,
+    AsyncContextManager,
+    Callable,
+    Dict,
+    Generic,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from fastapi_users.authentication.strategy.db.adapter import AccessTokenUsesDatabase
+from fastapi_users.authentication.strategy.db.models import AP
+from fastapi_users.cache import TTLCache
+
+
+class _UnknownToken:
+    pass
+
+
+UNKNOWN_TOKEN = _UnknownToken()
+
+
+class CachedAccessToken(NamedTuple):
+    """Values of an access token kept by the cache, bound to no database session."""
+
+    user_id: Any
+    created_at: datetime
+
+
+logger = logging.getLogger(__name__)
+
+
+class AccessTokenCache(Generic[AP]):
+    """
+    In-memory cache of access tokens, shared by `DatabaseStrategy` instances.
+
+    Only the user id and the creation date of the tokens are kept, not the
+    access tokens returned by the database adapter, which may be bound to the
+    session of a request. Unknown tokens are remembered too, for a shorter
+    time, so that invalid tokens don't reach the database on every request.
+
+    With sliding expiry, using a token extends its lifetime: uses are recorded
+    in memory, at most once per `touch_interval_seconds` for each token.
+    `flush_periodically`, run in the background, writes them to the database
+    in one go every `flush_interval_seconds` by moving the `created_at` of
+    the tokens.
+
+    :param max_size: Maximum number of tokens kept.
+    :param ttl_seconds: Lifetime of a cached token.
+    :param negative_ttl_seconds: Lifetime of a cached unknown token.
+    :param sliding_expiry: Whether using a token extends its lifetime.
+    :param touch_interval_seconds: Minimum time between two recorded uses
+    of a token.
+    :param flush_interval_seconds: Time between two writes of the recorded uses.
+    :param timer: Monotonic clock, in seconds.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        ttl_seconds: float = 60,
+        negative_ttl_seconds: float = 5,
+        *,
+        sliding_expiry: bool = False,
+        touch_interval_seconds: float = 60,
+        flush_interval_seconds: float = 30,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.sliding_expiry = sliding_expiry
+        self.touch_interval = timedelta(seconds=touch_interval_seconds)
+        self.flush_interval_seconds = flush_interval_seconds
+        self.timer = timer
+        self._tokens: TTLCache[str, Union[CachedAccessToken, _UnknownToken]] = TTLCache(
+            max_size, ttl_seconds, timer=timer
+        )
+        self._last_used: TTLCache[str, datetime] = TTLCache(
+            max_size, ttl_seconds, timer=timer
+        )
+        self._pending_uses: Dict[str, datetime] = {}
+
+    def get(self, token: str) -> Tuple[bool, Optional[CachedAccessToken]]:
+        """
+        Look up a token.
+
+        :return: Whether the token is cached, and the access token,
+        `None` if it's known to be unknown.
+        """
+        access_token = self._tokens.get(token)
+        if access_token is None:
+            return False, None
+        if isinstance(access_token, _UnknownToken):
+            return True, None
+        return True, access_token
+
+    def set(
+        self, token: str, access_token: Optional[AP]
+    ) -> Optional[CachedAccessToken]:
+        """
+        Cache an access token, or the fact that a token is unknown.
+
+        :return: The cached values of the access token.
+        """
+        if access_token is None:
+            self._tokens.set(token, UNKNOWN_TOKEN, self.negative_ttl_seconds)
+            self._last_used.pop(token)
+            self._pending_uses.pop(token, None)
+            return None
+        created_at = access_token.created_at
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        cached_access_token = CachedAccessToken(access_token.user_id, created_at)
+        self._tokens.set(token, cached_access_token)
+        return cached_access_token
+
+    def last_used(self, token: str, access_token: CachedAccessToken) -> datetime:
+        """Return the last recorded use of a token, or its creation date."""
+        last_used = self._last_used.get(token)
+        if last_used is None or last_used < access_token.created_at:
+            return access_token.created_at
+        return last_used
+
+    def touch(self, token: str, access_token: CachedAccessToken, now: datetime) -> None:
+        """Record a use of a token, if sliding expiry is enabled."""
+        if not self.sliding_expiry:
+            return
+        if now - self.last_used(token, access_token) < self.touch_interval:
+            return
+        self._last_used.set(token, now)
+        self._pending_uses[token] = now
+
+    async def flush(self, database: AccessTokenUsesDatabase[AP]) -> None:
+        """Write the recorded uses of tokens to the database, in one statement."""
+        if not self._pending_uses:
+            return
+        pending_uses, self._pending_uses = self._pending_uses, {}
+        try:
+            await database.update_last_used(pending_uses)
+        except BaseException:
+            # Keep them for the next flush, unless the token was used since.
+            self._pending_uses = {**pending_uses, **self._pending_uses}
+            raise
+
+    async def flush_periodically(
+        self,
+        get_database: Callable[[], AsyncContextManager[AccessTokenUsesDatabase[AP]]],
+    ) -> None:
+        """
+        Flush the recorded uses every `flush_interval_seconds`, until cancelled.
+
+        Meant to run as a task started in the lifespan of the application, so
+        that requests never wait for it. Pending uses are flushed one last time
+        when the task is cancelled.
+
+        :param get_database: Callable returning an async context manager
+        that yields an access token database with its own session.
+        """
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval_seconds)
+                try:
+                    await self._flush_with(get_database)
+                except Exception:
+                    logger.exception("Failed to write the last uses of access tokens")
+        finally:
+            await self._flush_with(get_database)
+
+    async def _flush_with(
+        self,
+        get_database: Callable[[], AsyncContextManager[AccessTokenUsesDatabase[AP]]],
+    ) -> None:
+        if self._pending_uses:
+            async with get_database() as database:
+                await self.flush(database)
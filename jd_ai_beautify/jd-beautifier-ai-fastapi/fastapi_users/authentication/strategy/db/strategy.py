@@ -1,10 +1,14 @@
 import secrets
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Generic, Optional
+from typing import Any, Dict, Generic, Optional, Union
 
 from fastapi_users import exceptions, models
 from fastapi_users.authentication.strategy.base import Strategy
 from fastapi_users.authentication.strategy.db.adapter import AccessTokenDatabase
+from fastapi_users.authentication.strategy.db.cache import (
+    AccessTokenCache,
+    CachedAccessToken,
+)
 from fastapi_users.authentication.strategy.db.models import AP
 from fastapi_users.manager import BaseUserManager
 
@@ -12,11 +16,27 @@ from fastapi_users.manager import BaseUserManager
 class DatabaseStrategy(
     Strategy[models.UP, models.ID], Generic[models.UP, models.ID, AP]
 ):
+    """
+    Strategy storing opaque tokens in a database.
+
+    :param token_cache: Optional cache of access tokens, shared between
+    requests. When set, known and unknown tokens are only read from the
+    database once in a while, and it may extend their lifetime on use.
+
+    Destroying a token takes a single query when the database adapter
+    implements `AccessTokenDeleteByTokenDatabase`.
+    """
+
     def __init__(
-        self, database: AccessTokenDatabase[AP], lifetime_seconds: Optional[int] = None
+        self,
+        database: AccessTokenDatabase[AP],
+        lifetime_seconds: Optional[int] = None,
+        *,
+        token_cache: Optional[AccessTokenCache[AP]] = None,
     ):
         self.database = database
         self.lifetime_seconds = lifetime_seconds
+        self.token_cache = token_cache
 
     async def read_token(
         self, token: Optional[str], user_manager: BaseUserManager[models.UP, models.ID]
@@ -30,7 +50,13 @@ class DatabaseStrategy(
                 seconds=self.lifetime_seconds
             )
 
-        access_token = await self.database.get_by_token(token, max_age)
+        access_token: Optional[Union[AP, CachedAccessToken]]
+        if self.token_cache is None:
+            access_token = await self.database.get_by_token(token, max_age)
+        else:
+            access_token = await self._get_cached_token(
+                self.token_cache, token, max_age
+            )
         if access_token is None:
             return None
 
@@ -43,12 +69,44 @@ class DatabaseStrategy(
     async def write_token(self, user: models.UP) -> str:
         access_token_dict = self._create_access_token_dict(user)
         access_token = await self.database.create(access_token_dict)
+        if self.token_cache is not None:
+            self.token_cache.set(access_token.token, access_token)
         return access_token.token
 
     async def destroy_token(self, token: str, user: models.UP) -> None:
-        access_token = await self.database.get_by_token(token)
-        if access_token is not None:
-            await self.database.delete(access_token)
+        delete_by_token = getattr(self.database, "delete_by_token", None)
+        if delete_by_token is not None:
+            await delete_by_token(token)
+        else:
+            access_token = await self.database.get_by_token(token)
+            if access_token is not None:
+                await self.database.delete(access_token)
+        if self.token_cache is not None:
+            self.token_cache.set(token, None)
+
+    async def _get_cached_token(
+        self,
+        token_cache: AccessTokenCache[AP],
+        token: str,
+        max_age: Optional[datetime],
+    ) -> Optional[CachedAccessToken]:
+        cached, access_token = token_cache.get(token)
+        if not cached:
+            # The lifetime is checked below: with sliding expiry,
+            # the last use may not be written to the database yet.
+            access_token = token_cache.set(
+                token, await self.database.get_by_token(token)
+            )
+        if access_token is None:
+            return None
+
+        last_used = token_cache.last_used(token, access_token)
+        if max_age is not None and last_used < max_age:
+            token_cache.set(token, None)
+            return None
+
+        token_cache.touch(token, access_token, datetime.now(timezone.utc))
+        return access_token
 
     def _create_access_token_dict(self, user: models.UP) -> Dict[str, Any]:
         token = secrets.token_urlsafe()
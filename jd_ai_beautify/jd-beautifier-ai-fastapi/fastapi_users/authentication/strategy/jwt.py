@@ -1,4 +1,4 @@
-from typing import Generic, List, Optional
+from typing import Any, Generic, List, Optional
 
 import jwt
 
@@ -7,7 +7,8 @@ from fastapi_users.authentication.strategy.base import (
     Strategy,
     StrategyDestroyNotSupportedError,
 )
-from fastapi_users.jwt import SecretType, decode_jwt, generate_jwt
+from fastapi_users.cache import TTLCache
+from fastapi_users.jwt import DecodedJWTCache, SecretType, decode_jwt, generate_jwt
 from fastapi_users.manager import BaseUserManager
 
 
@@ -18,6 +19,17 @@ class JWTStrategyDestroyNotSupportedError(StrategyDestroyNotSupportedError):
 
 
 class JWTStrategy(Strategy[models.UP, models.ID], Generic[models.UP, models.ID]):
+    """
+    Stateless strategy encoding the user id in a JWT.
+
+    :param user_cache: Optional cache of user snapshots by id, made and
+    restored by the database adapter. When set, reading a token only queries
+    the database for users missing from it. Pass the same cache to the user
+    manager so that it drops updated and deleted users.
+    :param decoded_token_cache: Optional cache of verified token claims.
+    When set, a token seen before is not verified again until it expires.
+    """
+
     def __init__(
         self,
         secret: SecretType,
@@ -25,12 +37,16 @@ class JWTStrategy(Strategy[models.UP, models.ID], Generic[models.UP, models.ID])
         token_audience: List[str] = ["fastapi-users:auth"],
         algorithm: str = "HS256",
         public_key: Optional[SecretType] = None,
+        user_cache: Optional[TTLCache[models.ID, Any]] = None,
+        decoded_token_cache: Optional[DecodedJWTCache] = None,
     ):
         self.secret = secret
         self.lifetime_seconds = lifetime_seconds
         self.token_audience = token_audience
         self.algorithm = algorithm
         self.public_key = public_key
+        self.user_cache = user_cache
+        self.decoded_token_cache = decoded_token_cache
 
     @property
     def encode_key(self) -> SecretType:
@@ -47,7 +63,12 @@ class JWTStrategy(Strategy[models.UP, models.ID], Generic[models.UP, models.ID])
             return None
 
         try:
-            data = decode_jwt(
+            decode = (
+                self.decoded_token_cache.decode
+                if self.decoded_token_cache is not None
+                else decode_jwt
+            )
+            data = decode(
                 token, self.decode_key, self.token_audience, algorithms=[self.algorithm]
             )
             user_id = data.get("sub")
@@ -58,9 +79,16 @@ class JWTStrategy(Strategy[models.UP, models.ID], Generic[models.UP, models.ID])
 
         try:
             parsed_id = user_manager.parse_id(user_id)
-            return await user_manager.get(parsed_id)
+            if self.user_cache is not None:
+                snapshot = self.user_cache.get(parsed_id)
+                if snapshot is not None:
+                    return await user_manager.user_db.restore(snapshot)
+            user = await user_manager.get(parsed_id)
         except (exceptions.UserNotExists, exceptions.InvalidID):
             return None
+        if self.user_cache is not None:
+            self.user_cache.set(parsed_id, user_manager.user_db.snapshot(user))
+        return user
 
     async def write_token(self, user: models.UP) -> str:
         data = {"sub": str(user.id), "aud": self.token_audience}
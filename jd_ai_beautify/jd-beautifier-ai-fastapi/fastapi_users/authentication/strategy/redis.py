@@ -1,5 +1,17 @@
+import json
 import secrets
-from typing import Generic, Optional
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Generic,
+    Optional,
+    Protocol,
+    Sequence,
+    Set,
+    TypeVar,
+    cast,
+)
 
 import redis.asyncio
 
@@ -7,18 +19,74 @@ from fastapi_users import exceptions, models
 from fastapi_users.authentication.strategy.base import Strategy
 from fastapi_users.manager import BaseUserManager
 
+# Separates the user id from its snapshot in token values; ids never contain it.
+SNAPSHOT_SEPARATOR = " "
+# Keys removed by each DEL command when revoking all the tokens of a user.
+DELETE_CHUNK_SIZE = 1000
+
+ID_contra = TypeVar("ID_contra", contravariant=True)
+
+
+class UserSnapshotSerializer(Protocol[models.UP, ID_contra]):
+    def dumps(self, user: models.UP) -> str: ...  # pragma: no cover
+
+    def loads(self, user_id: ID_contra, data: str) -> models.UP: ...  # pragma: no cover
+
+
+class JSONUserSnapshot(Generic[models.UP, models.ID]):
+    """
+    Compact JSON snapshot of some user attributes.
+
+    :param user_model: User model class, or any callable building a user from
+    the id and the snapshot attributes as keyword arguments.
+    :param fields: Attributes to store. Their values must be JSON-serializable.
+    """
+
+    def __init__(
+        self,
+        user_model: Callable[..., models.UP],
+        fields: Sequence[str] = ("email", "is_active", "is_superuser", "is_verified"),
+    ):
+        self.user_model = user_model
+        self.fields = tuple(fields)
+
+    def dumps(self, user: models.UP) -> str:
+        return json.dumps(
+            [getattr(user, field) for field in self.fields], separators=(",", ":")
+        )
+
+    def loads(self, user_id: models.ID, data: str) -> models.UP:
+        values = json.loads(data)
+        return self.user_model(id=user_id, **dict(zip(self.fields, values)))
+
 
 class RedisStrategy(Strategy[models.UP, models.ID], Generic[models.UP, models.ID]):
+    """
+    Strategy storing opaque tokens in Redis.
+
+    Every token is also added to a set of the tokens of its user, so that
+    they can all be revoked at once with `destroy_user_tokens`.
+
+    :param user_snapshot: Optional serializer storing a snapshot of the user
+    with each token. Reading a token then takes a single Redis round trip and
+    no database query; the snapshot is refreshed by `update_user_snapshots`.
+    The user is attached to the database adapter with its `attach` method.
+    """
+
     def __init__(
         self,
         redis: redis.asyncio.Redis,
         lifetime_seconds: Optional[int] = None,
         *,
         key_prefix: str = "fastapi_users_token:",
+        user_tokens_key_prefix: str = "fastapi_users_user_tokens:",
+        user_snapshot: Optional[UserSnapshotSerializer[models.UP, models.ID]] = None,
     ):
         self.redis = redis
         self.lifetime_seconds = lifetime_seconds
         self.key_prefix = key_prefix
+        self.user_tokens_key_prefix = user_tokens_key_prefix
+        self.user_snapshot = user_snapshot
 
     async def read_token(
         self, token: Optional[str], user_manager: BaseUserManager[models.UP, models.ID]
@@ -26,22 +94,91 @@ class RedisStrategy(Strategy[models.UP, models.ID], Generic[models.UP, models.ID
         if token is None:
             return None
 
-        user_id = await self.redis.get(f"{self.key_prefix}{token}")
-        if user_id is None:
+        value = await self.redis.get(f"{self.key_prefix}{token}")
+        if value is None:
             return None
 
+        user_id, _, snapshot = value.partition(SNAPSHOT_SEPARATOR)
         try:
             parsed_id = user_manager.parse_id(user_id)
+            if snapshot and self.user_snapshot is not None:
+                user = self.user_snapshot.loads(parsed_id, snapshot)
+                return await user_manager.user_db.attach(user)
             return await user_manager.get(parsed_id)
         except (exceptions.UserNotExists, exceptions.InvalidID):
             return None
 
     async def write_token(self, user: models.UP) -> str:
         token = secrets.token_urlsafe()
-        await self.redis.set(
-            f"{self.key_prefix}{token}", str(user.id), ex=self.lifetime_seconds
+        user_tokens_key = self._user_tokens_key(user.id)
+        pipeline = self.redis.pipeline(transaction=False)
+        pipeline.set(
+            f"{self.key_prefix}{token}", self._value(user), ex=self.lifetime_seconds
         )
+        pipeline.sadd(user_tokens_key, token)
+        if self.lifetime_seconds is not None:
+            pipeline.expire(user_tokens_key, self.lifetime_seconds)
+        await pipeline.execute()
         return token
 
     async def destroy_token(self, token: str, user: models.UP) -> None:
-        await self.redis.delete(f"{self.key_prefix}{token}")
+        pipeline = self.redis.pipeline(transaction=False)
+        pipeline.delete(f"{self.key_prefix}{token}")
+        pipeline.srem(self._user_tokens_key(user.id), token)
+        await pipeline.execute()
+
+    async def destroy_user_tokens(self, user: models.UP) -> int:
+        """
+        Revoke every token of a user, e.g. after a password change.
+
+        :param user: The user whose tokens are revoked.
+        :return: The number of tokens revoked.
+        """
+        user_tokens_key = self._user_tokens_key(user.id)
+        tokens = list(await self._user_tokens(user_tokens_key))
+        pipeline = self.redis.pipeline(transaction=False)
+        for i in range(0, len(tokens), DELETE_CHUNK_SIZE):
+            pipeline.delete(
+                *(
+                    f"{self.key_prefix}{token}"
+                    for token in tokens[i : i + DELETE_CHUNK_SIZE]
+                )
+            )
+        pipeline.delete(user_tokens_key)
+        results = await pipeline.execute()
+        return sum(results[:-1])
+
+    async def update_user_snapshots(self, user: models.UP) -> None:
+        """
+        Store a fresh snapshot of a user with each of its tokens.
+
+        Call it after the user is updated, so that authenticated requests
+        don't see the former user until the tokens expire.
+
+        :param user: The updated user.
+        """
+        if self.user_snapshot is None:
+            return
+        user_tokens_key = self._user_tokens_key(user.id)
+        tokens = list(await self._user_tokens(user_tokens_key))
+        if not tokens:
+            return
+        value = self._value(user)
+        pipeline = self.redis.pipeline(transaction=False)
+        for token in tokens:
+            pipeline.set(f"{self.key_prefix}{token}", value, keepttl=True, xx=True)
+        results = await pipeline.execute()
+        expired = [token for token, result in zip(tokens, results) if not result]
+        if expired:
+            await cast(Awaitable[int], self.redis.srem(user_tokens_key, *expired))
+
+    def _value(self, user: models.UP) -> str:
+        if self.user_snapshot is None:
+            return str(user.id)
+        return f"{user.id}{SNAPSHOT_SEPARATOR}{self.user_snapshot.dumps(user)}"
+
+    def _user_tokens(self, user_tokens_key: str) -> Awaitable[Set[str]]:
+        return cast(Awaitable[Set[str]], self.redis.smembers(user_tokens_key))
+
+    def _user_tokens_key(self, user_id: Any) -> str:
+        return f"{self.user_tokens_key_prefix}{user_id}"
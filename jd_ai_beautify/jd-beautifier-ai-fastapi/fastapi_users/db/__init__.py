@@ -1,6 +1,7 @@
 from fastapi_users.db.base import BaseUserDatabase, UserDatabaseDependency
+from fastapi_users.db.loader import UserLoader
 
-__all__ = ["BaseUserDatabase", "UserDatabaseDependency"]
+__all__ = ["BaseUserDatabase", "UserDatabaseDependency", "UserLoader"]
 
 
 try:  # pragma: no cover
@@ -1,4 +1,4 @@
-from typing import Any, Dict, Generic, Optional
+from typing import Any, Dict, Generic, List, Optional, Sequence, Set, Tuple
 
 from fastapi_users.models import ID, OAP, UOAP, UP
 from fastapi_users.types import DependencyCallable
@@ -15,6 +15,25 @@ class BaseUserDatabase(Generic[UP, ID]):
         """Get a single user by email."""
         raise NotImplementedError()
 
+    async def get_many(self, ids: Sequence[ID]) -> List[UP]:
+        """
+        Get the users with the given ids, in no particular order.
+
+        Ids without user are skipped. Override it to get them with a single query.
+        """
+        users = [await self.get(id) for id in ids]
+        return [user for user in users if user is not None]
+
+    async def get_many_by_email(self, emails: Sequence[str]) -> List[UP]:
+        """
+        Get the users with the given e-mails, in no particular order.
+
+        E-mails are compared case-insensitively and those without user are skipped.
+        Override it to get them with a single query.
+        """
+        users = [await self.get_by_email(email) for email in emails]
+        return [user for user in users if user is not None]
+
     async def get_by_oauth_account(self, oauth: str, account_id: str) -> Optional[UP]:
         """Get a single user by OAuth account id."""
         raise NotImplementedError()
@@ -31,6 +50,73 @@ class BaseUserDatabase(Generic[UP, ID]):
         """Delete a user."""
         raise NotImplementedError()
 
+    def snapshot(self, user: UP) -> Any:
+        """
+        Get a copy of a user that can be kept beyond the current request, e.g. in a cache.
+
+        Returns the user itself. Override it when users are bound to a
+        database session, to return their plain values instead.
+        """
+        return user
+
+    async def restore(self, snapshot: Any) -> UP:
+        """
+        Get the user from a snapshot made by `snapshot`.
+
+        Override it along with `snapshot`, e.g. to attach a new instance to
+        the session of this adapter.
+        """
+        return snapshot
+
+    async def attach(self, user: UP) -> UP:
+        """
+        Get a user built outside of the database, e.g. from a token, ready to be updated.
+
+        Returns the user itself. Override it when users are bound to a
+        database session, to attach it to the session of this adapter.
+        """
+        return user
+
+    async def get_page(self, after: Optional[ID] = None, limit: int = 100) -> List[UP]:
+        """Get at most `limit` users ordered by id, starting after the given id."""
+        raise NotImplementedError()
+
+    async def get_existing_emails(self, emails: Sequence[str]) -> Set[str]:
+        """
+        Get the e-mails, among the given ones, already used by a user.
+
+        E-mails are compared case-insensitively and returned lowercase.
+        """
+        users = await self.get_many_by_email(emails)
+        return {user.email.lower() for user in users}
+
+    async def create_many(self, create_dicts: Sequence[Dict[str, Any]]) -> List[UP]:
+        """
+        Create several users.
+
+        Override it to create them in a single transaction.
+        """
+        return [await self.create(create_dict) for create_dict in create_dicts]
+
+    async def update_many(
+        self, updates: Sequence[Tuple[UP, Dict[str, Any]]]
+    ) -> List[UP]:
+        """
+        Update several users.
+
+        Override it to update them in a single transaction.
+        """
+        return [await self.update(user, update_dict) for user, update_dict in updates]
+
+    async def delete_many(self, users: Sequence[UP]) -> None:
+        """
+        Delete several users.
+
+        Override it to delete them in a single transaction.
+        """
+        for user in users:
+            await self.delete(user)
+
     async def add_oauth_account(
         self: "BaseUserDatabase[UOAP, ID]", user: UOAP, create_dict: Dict[str, Any]
     ) -> UOAP:
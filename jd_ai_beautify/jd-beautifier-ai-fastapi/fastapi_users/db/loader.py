@@ -0,0 +1,95 @@
+import asyncio
+import functools
+from typing import Dict, Generic, List, Optional, Sequence, Set
+
+from fastapi_users.db.base import BaseUserDatabase
+from fastapi_users.models import ID, UP
+
+
+class UserLoader(Generic[UP, ID]):
+    """
+    Batches the user lookups of a request.
+
+    Calls to `load` made concurrently, in the same iteration of the event loop,
+    are combined into a single `get_many` call to the database adapter. Users
+    are then kept in memory: create one loader per request.
+
+    :param user_db: Database adapter instance.
+    """
+
+    def __init__(self, user_db: BaseUserDatabase[UP, ID]):
+        self.user_db = user_db
+        self._loaded: Dict[ID, Optional[UP]] = {}
+        self._pending: Dict[ID, asyncio.Future[Optional[UP]]] = {}
+        self._batches: Set[asyncio.Future[List[UP]]] = set()
+
+    async def load(self, id: ID) -> Optional[UP]:
+        """
+        Get a user by id.
+
+        :param id: Id. of the user to retrieve.
+        :return: The user, or None if it does not exist.
+        """
+        if id in self._loaded:
+            return self._loaded[id]
+
+        future = self._pending.get(id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[id] = future
+            if len(self._pending) == 1:
+                # Runs once the callers already scheduled had a chance to
+                # add their ids to the batch.
+                loop.call_soon(self._dispatch)
+        # A cancelled caller must not cancel the lookup for the others.
+        return await asyncio.shield(future)
+
+    async def load_many(self, ids: Sequence[ID]) -> List[Optional[UP]]:
+        """
+        Get users by id, in a single batch.
+
+        :param ids: Ids. of the users to retrieve.
+        :return: The users, in the same order, None for those that do not exist.
+        """
+        return list(await asyncio.gather(*(self.load(id) for id in ids)))
+
+    def prime(self, user: UP) -> None:
+        """Store a user, e.g. after updating it."""
+        self._loaded[user.id] = user
+
+    def clear(self, id: ID) -> None:
+        """Forget a user, so that it's retrieved again on next load."""
+        self._loaded.pop(id, None)
+
+    def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        batch = asyncio.ensure_future(self.user_db.get_many(list(pending)))
+        self._batches.add(batch)
+        batch.add_done_callback(self._batches.discard)
+        batch.add_done_callback(functools.partial(self._resolve, pending))
+
+    def _resolve(
+        self,
+        pending: Dict[ID, "asyncio.Future[Optional[UP]]"],
+        batch: "asyncio.Future[List[UP]]",
+    ) -> None:
+        # Whatever the outcome of the batch, even a cancellation, every caller
+        # waiting for one of its users gets it.
+        if batch.cancelled():
+            for future in pending.values():
+                future.cancel()
+            return
+        error = batch.exception()
+        if error is not None:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        users_by_id = {user.id: user for user in batch.result()}
+        for id, future in pending.items():
+            user = users_by_id.get(id)
+            self._loaded[id] = user
+            if not future.done():
+                future.set_result(user)
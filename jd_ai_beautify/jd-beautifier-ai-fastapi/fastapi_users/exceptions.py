@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, List
 
 
 class FastAPIUsersException(Exception):
@@ -13,6 +13,11 @@ class UserAlreadyExists(FastAPIUsersException):
     pass
 
 
+class UsersAlreadyExist(UserAlreadyExists):
+    def __init__(self, emails: List[str]) -> None:
+        self.emails = emails
+
+
 class UserNotExists(FastAPIUsersException):
     pass
 
@@ -155,6 +155,9 @@ class FastAPIUsers(Generic[models.UP, models.ID]):
         user_schema: Type[schemas.U],
         user_update_schema: Type[schemas.UU],
         requires_verification: bool = False,
+        bulk: bool = False,
+        user_create_schema: Optional[Type[schemas.UC]] = None,
+        bulk_max_size: int = 1000,
     ) -> APIRouter:
         """
         Return a router with routes to manage users.
@@ -163,6 +166,12 @@ class FastAPIUsers(Generic[models.UP, models.ID]):
         :param user_update_schema: Pydantic schema for updating a user.
         :param requires_verification: Whether the endpoints
         require the users to be verified or not. Defaults to False.
+        :param bulk: Whether to add superuser routes to list, update and
+        delete users in bulk. Defaults to False.
+        :param user_create_schema: Pydantic schema for creating a user.
+        When set with `bulk`, users can also be created in bulk.
+        :param bulk_max_size: Maximum number of users per bulk request.
+        Defaults to 1000.
         """
         return get_users_router(
             self.get_user_manager,
@@ -170,4 +179,7 @@ class FastAPIUsers(Generic[models.UP, models.ID]):
             user_update_schema,
             self.authenticator,
             requires_verification,
+            bulk=bulk,
+            user_create_schema=user_create_schema,
+            bulk_max_size=bulk_max_size,
         )
@@ -1,9 +1,13 @@
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
 import jwt
 from pydantic import SecretStr
 
+from fastapi_users.cache import TTLCache
+
 SecretType = Union[str, SecretStr]
 JWT_ALGORITHM = "HS256"
 
@@ -39,3 +43,69 @@ def decode_jwt(
         audience=audience,
         algorithms=algorithms,
     )
+
+
+class DecodedJWTCache:
+    """
+    Claims of already verified tokens, kept until the tokens expire.
+
+    Decoding a token again returns the claims without checking its signature,
+    audience and expiration a second time, which is costly with asymmetric
+    algorithms such as RS256 and ES256.
+
+    Entries are keyed by a digest of the token together with the key, audience
+    and algorithms it was verified with, so a token is never accepted by a
+    decoder configured differently.
+
+    :param max_size: Maximum number of tokens kept.
+    :param ttl_seconds: Lifetime of tokens without an `exp` claim.
+    :param timer: Wall clock, in seconds since the epoch.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl_seconds: float = 300,
+        timer: Callable[[], float] = time.time,
+    ) -> None:
+        self.timer = timer
+        self._cache: TTLCache[str, Dict[str, Any]] = TTLCache(
+            max_size, ttl_seconds, timer=timer
+        )
+
+    def decode(
+        self,
+        encoded_jwt: str,
+        secret: SecretType,
+        audience: List[str],
+        algorithms: List[str] = [JWT_ALGORITHM],
+    ) -> Dict[str, Any]:
+        key = self._key(encoded_jwt, secret, audience, algorithms)
+        data = self._cache.get(key)
+        if data is None:
+            data = decode_jwt(encoded_jwt, secret, audience, algorithms)
+            expires_at = data.get("exp")
+            self._cache.set(
+                key,
+                data,
+                None if expires_at is None else float(expires_at) - self.timer(),
+            )
+        return dict(data)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @staticmethod
+    def _key(
+        encoded_jwt: str,
+        secret: SecretType,
+        audience: List[str],
+        algorithms: List[str],
+    ) -> str:
+        digest = hashlib.sha256()
+        parts = (encoded_jwt, _get_secret_value(secret), *audience, "", *algorithms)
+        for part in parts:
+            encoded = part.encode("utf-8")
+            digest.update(len(encoded).to_bytes(8, "big"))
+            digest.update(encoded)
+        return digest.hexdigest()
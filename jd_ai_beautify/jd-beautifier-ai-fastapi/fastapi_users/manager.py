@@ -1,19 +1,50 @@
+import asyncio
 import uuid
-from typing import Any, Dict, Generic, Optional, Union
+from collections import Counter
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import jwt
 from fastapi import Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
 
 from fastapi_users import exceptions, models, schemas
-from fastapi_users.db import BaseUserDatabase
+from fastapi_users.cache import TTLCache
+from fastapi_users.db import BaseUserDatabase, UserLoader
 from fastapi_users.jwt import SecretType, decode_jwt, generate_jwt
-from fastapi_users.password import PasswordHelper, PasswordHelperProtocol
+from fastapi_users.password import (
+    PasswordHelper,
+    PasswordHelperProtocol,
+    hash_password,
+    verify_and_update_password,
+)
 from fastapi_users.types import DependencyCallable
 
 RESET_PASSWORD_TOKEN_AUDIENCE = "fastapi-users:reset"
 VERIFY_USER_TOKEN_AUDIENCE = "fastapi-users:verify"
 
+UP_contra = TypeVar("UP_contra", bound=models.UserProtocol, contravariant=True)
+
+
+class UserTokenStore(Protocol[UP_contra]):
+    """Token storage keeping a snapshot of the users with their tokens."""
+
+    async def update_user_snapshots(
+        self, user: UP_contra
+    ) -> None: ...  # pragma: no cover
+
+    async def destroy_user_tokens(self, user: UP_contra) -> int: ...  # pragma: no cover
+
 
 class BaseUserManager(Generic[models.UP, models.ID]):
     """
@@ -27,6 +58,15 @@ class BaseUserManager(Generic[models.UP, models.ID]):
     :attribute verification_token_audience: JWT audience of verification token.
 
     :param user_db: Database adapter instance.
+    :param password_helper: Password helper instance, defaults to `PasswordHelper()`.
+    :param user_cache: Optional cache of user snapshots by id, shared with the
+    authentication strategies reading it. Users are removed from it when they
+    are updated, verified or deleted.
+    :param user_loader: Optional loader batching the lookups by id made
+    concurrently during a request.
+    :param token_stores: Token storages keeping user snapshots, like a
+    `RedisStrategy` with `user_snapshot`. The snapshots are refreshed when users
+    are updated or verified, and the tokens revoked when users are deleted.
     """
 
     reset_password_token_secret: SecretType
@@ -39,17 +79,26 @@ class BaseUserManager(Generic[models.UP, models.ID]):
 
     user_db: BaseUserDatabase[models.UP, models.ID]
     password_helper: PasswordHelperProtocol
+    user_cache: Optional[TTLCache[models.ID, Any]]
+    user_loader: Optional[UserLoader[models.UP, models.ID]]
+    token_stores: Sequence[UserTokenStore[models.UP]]
 
     def __init__(
         self,
         user_db: BaseUserDatabase[models.UP, models.ID],
         password_helper: Optional[PasswordHelperProtocol] = None,
+        user_cache: Optional[TTLCache[models.ID, Any]] = None,
+        user_loader: Optional[UserLoader[models.UP, models.ID]] = None,
+        token_stores: Sequence[UserTokenStore[models.UP]] = (),
     ):
         self.user_db = user_db
         if password_helper is None:
             self.password_helper = PasswordHelper()
         else:
             self.password_helper = password_helper  # pragma: no cover
+        self.user_cache = user_cache
+        self.user_loader = user_loader
+        self.token_stores = token_stores
 
     def parse_id(self, value: Any) -> models.ID:
         """
@@ -69,13 +118,30 @@ class BaseUserManager(Generic[models.UP, models.ID]):
         :raises UserNotExists: The user does not exist.
         :return: A user.
         """
-        user = await self.user_db.get(id)
+        if self.user_loader is not None:
+            user = await self.user_loader.load(id)
+        else:
+            user = await self.user_db.get(id)
 
         if user is None:
             raise exceptions.UserNotExists()
 
         return user
 
+    async def get_many(self, ids: Sequence[models.ID]) -> List[models.UP]:
+        """
+        Get users by id.
+
+        :param ids: Ids. of the users to retrieve.
+        :return: The existing users, in the order of their ids.
+        """
+        if self.user_loader is not None:
+            loaded_users = await self.user_loader.load_many(ids)
+            return [user for user in loaded_users if user is not None]
+
+        users_by_id = {user.id: user for user in await self.user_db.get_many(ids)}
+        return [users_by_id[id] for id in ids if id in users_by_id]
+
     async def get_by_email(self, user_email: str) -> models.UP:
         """
         Get a user by e-mail.
@@ -138,7 +204,9 @@ class BaseUserManager(Generic[models.UP, models.ID]):
             else user_create.create_update_dict_superuser()
         )
         password = user_dict.pop("password")
-        user_dict["hashed_password"] = self.password_helper.hash(password)
+        user_dict["hashed_password"] = await hash_password(
+            self.password_helper, password
+        )
 
         created_user = await self.user_db.create(user_dict)
 
@@ -211,7 +279,9 @@ class BaseUserManager(Generic[models.UP, models.ID]):
                 password = self.password_helper.generate()
                 user_dict = {
                     "email": account_email,
-                    "hashed_password": self.password_helper.hash(password),
+                    "hashed_password": await hash_password(
+                        self.password_helper, password
+                    ),
                     "is_verified": is_verified_by_default,
                 }
                 user = await self.user_db.create(user_dict)
@@ -267,6 +337,8 @@ class BaseUserManager(Generic[models.UP, models.ID]):
         }
 
         user = await self.user_db.add_oauth_account(user, oauth_account_dict)
+        self._invalidate_cached_user(user)
+        await self._update_user_snapshots(user)
 
         await self.on_after_update(user, {}, request)
 
@@ -373,7 +445,9 @@ class BaseUserManager(Generic[models.UP, models.ID]):
 
         token_data = {
             "sub": str(user.id),
-            "password_fgpt": self.password_helper.hash(user.hashed_password),
+            "password_fgpt": await hash_password(
+                self.password_helper, user.hashed_password
+            ),
             "aud": self.reset_password_token_audience,
         }
         token = generate_jwt(
@@ -422,8 +496,8 @@ class BaseUserManager(Generic[models.UP, models.ID]):
 
         user = await self.get(parsed_id)
 
-        valid_password_fingerprint, _ = self.password_helper.verify_and_update(
-            user.hashed_password, password_fingerprint
+        valid_password_fingerprint, _ = await verify_and_update_password(
+            self.password_helper, user.hashed_password, password_fingerprint
         )
         if not valid_password_fingerprint:
             raise exceptions.InvalidResetPasswordToken()
@@ -480,8 +554,167 @@ class BaseUserManager(Generic[models.UP, models.ID]):
         """
         await self.on_before_delete(user, request)
         await self.user_db.delete(user)
+        self._invalidate_cached_user(user)
+        await self._destroy_user_tokens(user)
         await self.on_after_delete(user, request)
 
+    async def get_page(
+        self, after: Optional[models.ID] = None, limit: int = 100
+    ) -> List[models.UP]:
+        """
+        Get a page of users, ordered by id.
+
+        :param after: Id. of the last user of the previous page, if any.
+        :param limit: Maximum number of users to return.
+        :return: The users.
+        """
+        return await self.user_db.get_page(after, limit)
+
+    async def create_many(
+        self,
+        user_creates: Sequence[schemas.UC],
+        safe: bool = False,
+        request: Optional[Request] = None,
+    ) -> List[models.UP]:
+        """
+        Create several users in database, all or none.
+
+        Triggers the on_after_register handler for each user on success.
+
+        :param user_creates: The UserCreate models to create.
+        :param safe: If True, sensitive values like is_superuser or is_verified
+        will be ignored during the creation, defaults to False.
+        :param request: Optional FastAPI request that
+        triggered the operation, defaults to None.
+        :raises InvalidPasswordException: A password is invalid.
+        :raises UsersAlreadyExist: Some e-mails are already used, by existing users
+        or by several users to create.
+        :return: The new users, in the same order.
+        """
+        for user_create in user_creates:
+            await self.validate_password(user_create.password, user_create)
+
+        await self._check_emails_available(
+            [user_create.email for user_create in user_creates]
+        )
+
+        user_dicts = [
+            user_create.create_update_dict()
+            if safe
+            else user_create.create_update_dict_superuser()
+            for user_create in user_creates
+        ]
+        hashed_passwords = await asyncio.gather(
+            *(
+                hash_password(self.password_helper, user_dict.pop("password"))
+                for user_dict in user_dicts
+            )
+        )
+        for user_dict, hashed_password in zip(user_dicts, hashed_passwords):
+            user_dict["hashed_password"] = hashed_password
+
+        created_users = await self.user_db.create_many(user_dicts)
+
+        for created_user in created_users:
+            await self.on_after_register(created_user, request)
+
+        return created_users
+
+    async def update_many(
+        self,
+        updates: Sequence[Tuple[schemas.UU, models.UP]],
+        safe: bool = False,
+        request: Optional[Request] = None,
+    ) -> List[models.UP]:
+        """
+        Update several users, all or none.
+
+        Triggers the on_after_update handler for each user on success.
+
+        :param updates: Pairs of UserUpdate model and user to update.
+        :param safe: If True, sensitive values like is_superuser or is_verified
+        will be ignored during the update, defaults to False
+        :param request: Optional FastAPI request that
+        triggered the operation, defaults to None.
+        :raises InvalidPasswordException: A password is invalid.
+        :raises UsersAlreadyExist: Some new e-mails are already used.
+        :return: The updated users, in the same order.
+        """
+        update_dicts = [
+            user_update.create_update_dict()
+            if safe
+            else user_update.create_update_dict_superuser()
+            for user_update, _ in updates
+        ]
+
+        validated_update_dicts: List[Dict[str, Any]] = []
+        new_emails: List[str] = []
+        passwords: List[Tuple[Dict[str, Any], str]] = []
+        for (_, user), update_dict in zip(updates, update_dicts):
+            validated_update_dict: Dict[str, Any] = {}
+            for field, value in update_dict.items():
+                if field == "email" and value != user.email:
+                    new_emails.append(value)
+                    validated_update_dict["email"] = value
+                    validated_update_dict["is_verified"] = False
+                elif field == "password" and value is not None:
+                    await self.validate_password(value, user)
+                    passwords.append((validated_update_dict, value))
+                else:
+                    validated_update_dict[field] = value
+            validated_update_dicts.append(validated_update_dict)
+
+        await self._check_emails_available(new_emails)
+
+        hashed_passwords = await asyncio.gather(
+            *(
+                hash_password(self.password_helper, password)
+                for _, password in passwords
+            )
+        )
+        for (validated_update_dict, _), hashed_password in zip(
+            passwords, hashed_passwords
+        ):
+            validated_update_dict["hashed_password"] = hashed_password
+
+        updated_users = await self.user_db.update_many(
+            [
+                (user, validated_update_dict)
+                for (_, user), validated_update_dict in zip(
+                    updates, validated_update_dicts
+                )
+            ]
+        )
+        for updated_user in updated_users:
+            self._invalidate_cached_user(updated_user)
+            await self._update_user_snapshots(updated_user)
+
+        for updated_user, update_dict in zip(updated_users, update_dicts):
+            await self.on_after_update(updated_user, update_dict, request)
+
+        return updated_users
+
+    async def delete_many(
+        self,
+        users: Sequence[models.UP],
+        request: Optional[Request] = None,
+    ) -> None:
+        """
+        Delete several users, all or none.
+
+        :param users: The users to delete.
+        :param request: Optional FastAPI request that
+        triggered the operation, defaults to None.
+        """
+        for user in users:
+            await self.on_before_delete(user, request)
+        await self.user_db.delete_many(users)
+        for user in users:
+            self._invalidate_cached_user(user)
+            await self._destroy_user_tokens(user)
+        for user in users:
+            await self.on_after_delete(user, request)
+
     async def validate_password(
         self, password: str, user: Union[schemas.UC, models.UP]
     ) -> None:
@@ -648,11 +881,11 @@ class BaseUserManager(Generic[models.UP, models.ID]):
         except exceptions.UserNotExists:
             # Run the hasher to mitigate timing attack
             # Inspired from Django: https://code.djangoproject.com/ticket/20760
-            self.password_helper.hash(credentials.password)
+            await hash_password(self.password_helper, credentials.password)
             return None
 
-        verified, updated_password_hash = self.password_helper.verify_and_update(
-            credentials.password, user.hashed_password
+        verified, updated_password_hash = await verify_and_update_password(
+            self.password_helper, credentials.password, user.hashed_password
         )
         if not verified:
             return None
@@ -674,12 +907,38 @@ class BaseUserManager(Generic[models.UP, models.ID]):
                     validated_update_dict["is_verified"] = False
             elif field == "password" and value is not None:
                 await self.validate_password(value, user)
-                validated_update_dict["hashed_password"] = self.password_helper.hash(
-                    value
+                validated_update_dict["hashed_password"] = await hash_password(
+                    self.password_helper, value
                 )
             else:
                 validated_update_dict[field] = value
-        return await self.user_db.update(user, validated_update_dict)
+        updated_user = await self.user_db.update(user, validated_update_dict)
+        self._invalidate_cached_user(updated_user)
+        await self._update_user_snapshots(updated_user)
+        return updated_user
+
+    async def _check_emails_available(self, emails: Sequence[str]) -> None:
+        counts = Counter(email.lower() for email in emails)
+        if not counts:
+            return
+        unavailable_emails = {email for email, count in counts.items() if count > 1}
+        unavailable_emails |= await self.user_db.get_existing_emails(list(counts))
+        if unavailable_emails:
+            raise exceptions.UsersAlreadyExist(sorted(unavailable_emails))
+
+    def _invalidate_cached_user(self, user: models.UP) -> None:
+        if self.user_cache is not None:
+            self.user_cache.pop(user.id)
+        if self.user_loader is not None:
+            self.user_loader.clear(user.id)
+
+    async def _update_user_snapshots(self, user: models.UP) -> None:
+        for token_store in self.token_stores:
+            await token_store.update_user_snapshots(user)
+
+    async def _destroy_user_tokens(self, user: models.UP) -> None:
+        for token_store in self.token_stores:
+            await token_store.destroy_user_tokens(user)
 
 
 class UUIDIDMixin:
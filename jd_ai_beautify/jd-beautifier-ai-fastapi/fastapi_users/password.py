@@ -1,10 +1,26 @@
+import asyncio
+import dataclasses
+import os
 import secrets
-from typing import Optional, Protocol, Tuple, Union
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Optional,
+    Protocol,
+    Tuple,
+    TypeVar,
+    Union,
+    runtime_checkable,
+)
 
 from pwdlib import PasswordHash
 from pwdlib.hashers.argon2 import Argon2Hasher
 from pwdlib.hashers.bcrypt import BcryptHasher
 
+T = TypeVar("T")
+
 
 class PasswordHelperProtocol(Protocol):
     def verify_and_update(
@@ -16,6 +32,15 @@ class PasswordHelperProtocol(Protocol):
     def generate(self) -> str: ...  # pragma: no cover
 
 
+@runtime_checkable
+class AsyncPasswordHelperProtocol(PasswordHelperProtocol, Protocol):
+    async def verify_and_update_async(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Union[str, None]]: ...  # pragma: no cover
+
+    async def hash_async(self, password: str) -> str: ...  # pragma: no cover
+
+
 class PasswordHelper(PasswordHelperProtocol):
     def __init__(self, password_hash: Optional[PasswordHash] = None) -> None:
         if password_hash is None:
@@ -38,3 +63,171 @@ class PasswordHelper(PasswordHelperProtocol):
 
     def generate(self) -> str:
         return secrets.token_urlsafe()
+
+
+@dataclasses.dataclass
+class PasswordHashMetrics:
+    """
+    Counters of an `AsyncPasswordHelper`.
+
+    :param queued: Operations waiting for a free slot.
+    :param max_queued: Highest value `queued` has reached.
+    :param in_flight: Operations running in the pool.
+    :param completed: Operations finished, successfully or not.
+    :param wait_seconds: Total time spent waiting for a slot.
+    :param run_seconds: Total time spent hashing or verifying in the pool.
+    """
+
+    queued: int = 0
+    max_queued: int = 0
+    in_flight: int = 0
+    completed: int = 0
+    wait_seconds: float = 0.0
+    run_seconds: float = 0.0
+
+
+# Password helper of the current process pool worker, set by its initializer.
+_worker_password_helper: Optional[PasswordHelperProtocol] = None
+
+
+def _init_worker(
+    password_helper: PasswordHelperProtocol,
+) -> None:  # pragma: no cover
+    global _worker_password_helper
+    _worker_password_helper = password_helper
+
+
+def _worker_hash(password: str) -> str:  # pragma: no cover
+    assert _worker_password_helper is not None
+    return _worker_password_helper.hash(password)
+
+
+def _worker_verify_and_update(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Union[str, None]]:  # pragma: no cover
+    assert _worker_password_helper is not None
+    return _worker_password_helper.verify_and_update(plain_password, hashed_password)
+
+
+class AsyncPasswordHelper(AsyncPasswordHelperProtocol):
+    """
+    Password helper running hashing off the event loop.
+
+    Hashing and verification are CPU-bound: this helper runs them in a thread
+    or process pool, at most `max_concurrency` at a time, so that a burst of
+    logins doesn't block the event loop. Argon2 and bcrypt release the GIL,
+    so a thread pool already hashes in parallel.
+
+    :param password_helper: Helper doing the actual work.
+    Defaults to `PasswordHelper()`.
+    :param max_workers: Size of the pool. Defaults to the number of CPUs.
+    :param max_concurrency: Operations submitted to the pool at the same time;
+    the others wait for a slot. Defaults to `max_workers`.
+    :param use_processes: Use a process pool instead of a thread pool.
+    `password_helper` must then be picklable.
+    :param executor: Use this executor instead of creating a pool.
+    It is not shut down by `close`.
+    """
+
+    def __init__(
+        self,
+        password_helper: Optional[PasswordHelperProtocol] = None,
+        *,
+        max_workers: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        use_processes: bool = False,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.password_helper = password_helper or PasswordHelper()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or self.max_workers
+        self.use_processes = use_processes
+        self.metrics = PasswordHashMetrics()
+        self._owns_executor = executor is None
+        if executor is not None:
+            self.executor = executor
+        elif use_processes:
+            self.executor = ProcessPoolExecutor(
+                self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.password_helper,),
+            )
+        else:
+            self.executor = ThreadPoolExecutor(
+                self.max_workers, thread_name_prefix="password-hash"
+            )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Union[str, None]]:
+        return self.password_helper.verify_and_update(plain_password, hashed_password)
+
+    def hash(self, password: str) -> str:
+        return self.password_helper.hash(password)
+
+    def generate(self) -> str:
+        return self.password_helper.generate()
+
+    async def verify_and_update_async(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Union[str, None]]:
+        function = (
+            _worker_verify_and_update
+            if self.use_processes
+            else self.password_helper.verify_and_update
+        )
+        return await self._run(function, plain_password, hashed_password)
+
+    async def hash_async(self, password: str) -> str:
+        function = _worker_hash if self.use_processes else self.password_helper.hash
+        return await self._run(function, password)
+
+    def close(self, wait: bool = True) -> None:
+        """Shut down the pool created by this helper."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=wait)
+
+    async def _run(self, function: Callable[..., T], *args: Any) -> T:
+        if self._semaphore is None:
+            # Created lazily, inside the event loop that uses it.
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        metrics = self.metrics
+        metrics.queued += 1
+        metrics.max_queued = max(metrics.max_queued, metrics.queued)
+        queued_at = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            metrics.queued -= 1
+
+        started_at = time.perf_counter()
+        metrics.wait_seconds += started_at - queued_at
+        metrics.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, function, *args)
+        finally:
+            metrics.in_flight -= 1
+            metrics.completed += 1
+            metrics.run_seconds += time.perf_counter() - started_at
+            self._semaphore.release()
+
+
+async def hash_password(password_helper: PasswordHelperProtocol, password: str) -> str:
+    """Hash with `password_helper`, off the event loop when it supports it."""
+    if isinstance(password_helper, AsyncPasswordHelperProtocol):
+        return await password_helper.hash_async(password)
+    return password_helper.hash(password)
+
+
+async def verify_and_update_password(
+    password_helper: PasswordHelperProtocol, plain_password: str, hashed_password: str
+) -> Tuple[bool, Union[str, None]]:
+    """Verify with `password_helper`, off the event loop when it supports it."""
+    if isinstance(password_helper, AsyncPasswordHelperProtocol):
+        return await password_helper.verify_and_update_async(
+            plain_password, hashed_password
+        )
+    return password_helper.verify_and_update(plain_password, hashed_password)
@@ -1,6 +1,17 @@
-from typing import Type
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Type, Union, cast
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, create_model
 
 from fastapi_users import exceptions, models, schemas
 from fastapi_users.authentication import Authenticator
@@ -14,6 +25,9 @@ def get_users_router(
     user_update_schema: Type[schemas.UU],
     authenticator: Authenticator,
     requires_verification: bool = False,
+    bulk: bool = False,
+    user_create_schema: Optional[Type[schemas.UC]] = None,
+    bulk_max_size: int = 1000,
 ) -> APIRouter:
     """Generate a router with the authentication routes."""
     router = APIRouter()
@@ -111,6 +125,17 @@ def get_users_router(
                 detail=ErrorCode.UPDATE_USER_EMAIL_ALREADY_EXISTS,
             )
 
+    if bulk:
+        _add_bulk_routes(
+            router,
+            get_user_manager,
+            user_schema,
+            user_update_schema,
+            user_create_schema,
+            get_current_superuser,
+            bulk_max_size,
+        )
+
     @router.get(
         "/{id}",
         response_model=user_schema,
@@ -225,3 +250,239 @@ def get_users_router(
         return None
 
     return router
+
+
+class BulkUserUpdateId(BaseModel):
+    """Id of the user to update, added to the update schema by the bulk routes."""
+
+    id: str
+
+
+NDJSON_RESPONSE = {
+    "description": "One user per line, as JSON.",
+    "content": {"application/x-ndjson": {}},
+}
+
+
+def _stream_users(
+    user_schema: Type[schemas.U],
+    users: Sequence[models.UP],
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[dict] = None,
+) -> StreamingResponse:
+    # Validate now, while the database session is still open,
+    # and serialize each user as the response is sent.
+    validated_users = [schemas.model_validate(user_schema, user) for user in users]
+
+    async def lines() -> AsyncIterator[str]:
+        for validated_user in validated_users:
+            yield schemas.model_dump_json(validated_user) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/x-ndjson",
+    )
+
+
+def _add_bulk_routes(
+    router: APIRouter,
+    get_user_manager: UserManagerDependency[models.UP, models.ID],
+    user_schema: Type[schemas.U],
+    user_update_schema: Type[schemas.UU],
+    user_create_schema: Optional[Type[schemas.UC]],
+    get_current_superuser,
+    bulk_max_size: int,
+) -> None:
+    """Add superuser routes to list, create, update and delete users in bulk."""
+    bulk_update_schema = cast(
+        Type[BulkUserUpdateId],
+        create_model(
+            f"Bulk{user_update_schema.__name__}",
+            __base__=(user_update_schema, BulkUserUpdateId),
+        ),
+    )
+    superuser_responses: Dict[Union[int, str], Dict[str, Any]] = {
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "Missing token or inactive user.",
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "Not a superuser.",
+        },
+    }
+
+    async def get_users_or_404(
+        ids: Sequence[str], user_manager: BaseUserManager[models.UP, models.ID]
+    ) -> List[models.UP]:
+        parsed_ids: List[models.ID] = []
+        missing_ids: List[str] = []
+        for id in ids:
+            try:
+                parsed_ids.append(user_manager.parse_id(id))
+            except exceptions.InvalidID:
+                missing_ids.append(id)
+
+        users = await user_manager.get_many(parsed_ids)
+        users_by_id = {user.id: user for user in users}
+        missing_ids += [
+            str(parsed_id) for parsed_id in parsed_ids if parsed_id not in users_by_id
+        ]
+        if missing_ids:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail={"ids": missing_ids}
+            )
+        return [users_by_id[parsed_id] for parsed_id in parsed_ids]
+
+    @router.get(
+        "/bulk",
+        response_class=StreamingResponse,
+        dependencies=[Depends(get_current_superuser)],
+        name="users:list_users",
+        responses={
+            status.HTTP_200_OK: NDJSON_RESPONSE,
+            **superuser_responses,
+            status.HTTP_400_BAD_REQUEST: {
+                "description": "Invalid `after` id.",
+            },
+        },
+    )
+    async def list_users(
+        after: Optional[str] = None,
+        limit: int = Query(100, ge=1, le=bulk_max_size),
+        user_manager: BaseUserManager[models.UP, models.ID] = Depends(get_user_manager),
+    ):
+        try:
+            parsed_after = None if after is None else user_manager.parse_id(after)
+        except exceptions.InvalidID as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST) from e
+        users = await user_manager.get_page(parsed_after, limit)
+        headers = {}
+        if len(users) == limit:
+            headers["X-Next-After"] = str(users[-1].id)
+        return _stream_users(user_schema, users, headers=headers)
+
+    if user_create_schema is not None:
+
+        @router.post(
+            "/bulk",
+            status_code=status.HTTP_201_CREATED,
+            response_class=StreamingResponse,
+            dependencies=[Depends(get_current_superuser)],
+            name="users:create_users",
+            responses={
+                status.HTTP_201_CREATED: NDJSON_RESPONSE,
+                **superuser_responses,
+                status.HTTP_400_BAD_REQUEST: {
+                    "description": "Some e-mails are already used, "
+                    "or a password is invalid.",
+                },
+            },
+        )
+        async def create_users(
+            request: Request,
+            user_creates: List[user_create_schema] = Body(  # type: ignore
+                ..., max_length=bulk_max_size
+            ),
+            user_manager: BaseUserManager[models.UP, models.ID] = Depends(
+                get_user_manager
+            ),
+        ):
+            try:
+                created_users = await user_manager.create_many(
+                    user_creates, safe=False, request=request
+                )
+            except exceptions.UsersAlreadyExist as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail={
+                        "code": ErrorCode.REGISTER_USER_ALREADY_EXISTS,
+                        "emails": e.emails,
+                    },
+                )
+            except exceptions.InvalidPasswordException as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail={
+                        "code": ErrorCode.REGISTER_INVALID_PASSWORD,
+                        "reason": e.reason,
+                    },
+                )
+            return _stream_users(
+                user_schema, created_users, status_code=status.HTTP_201_CREATED
+            )
+
+    @router.patch(
+        "/bulk",
+        response_class=StreamingResponse,
+        dependencies=[Depends(get_current_superuser)],
+        name="users:patch_users",
+        responses={
+            status.HTTP_200_OK: NDJSON_RESPONSE,
+            **superuser_responses,
+            status.HTTP_404_NOT_FOUND: {
+                "description": "Some users do not exist.",
+            },
+            status.HTTP_400_BAD_REQUEST: {
+                "description": "Some e-mails are already used, "
+                "or a password is invalid.",
+            },
+        },
+    )
+    async def update_users(
+        request: Request,
+        user_updates: List[bulk_update_schema] = Body(  # type: ignore
+            ..., max_length=bulk_max_size
+        ),
+        user_manager: BaseUserManager[models.UP, models.ID] = Depends(get_user_manager),
+    ):
+        users = await get_users_or_404(
+            [
+                user_update.id
+                for user_update in cast(List[BulkUserUpdateId], user_updates)
+            ],
+            user_manager,
+        )
+        try:
+            updated_users = await user_manager.update_many(
+                list(zip(user_updates, users)), safe=False, request=request
+            )
+        except exceptions.UsersAlreadyExist as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "code": ErrorCode.UPDATE_USER_EMAIL_ALREADY_EXISTS,
+                    "emails": e.emails,
+                },
+            )
+        except exceptions.InvalidPasswordException as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "code": ErrorCode.UPDATE_USER_INVALID_PASSWORD,
+                    "reason": e.reason,
+                },
+            )
+        return _stream_users(user_schema, updated_users)
+
+    @router.post(
+        "/bulk/delete",
+        status_code=status.HTTP_204_NO_CONTENT,
+        response_class=Response,
+        dependencies=[Depends(get_current_superuser)],
+        name="users:delete_users",
+        responses={
+            **superuser_responses,
+            status.HTTP_404_NOT_FOUND: {
+                "description": "Some users do not exist.",
+            },
+        },
+    )
+    async def delete_users(
+        request: Request,
+        ids: List[str] = Body(..., max_length=bulk_max_size),
+        user_manager: BaseUserManager[models.UP, models.ID] = Depends(get_user_manager),
+    ):
+        users = await get_users_or_404(ids, user_manager)
+        await user_manager.delete_many(users, request=request)
+        return None
@@ -17,6 +17,9 @@ if PYDANTIC_V2:  # pragma: no cover
     def model_validate(schema: Type[SCHEMA], obj: Any, *args, **kwargs) -> SCHEMA:
         return schema.model_validate(obj, *args, **kwargs)  # type: ignore
 
+    def model_dump_json(model: BaseModel, *args, **kwargs) -> str:
+        return model.model_dump_json(*args, **kwargs)  # type: ignore
+
 else:  # pragma: no cover  # type: ignore
 
     def model_dump(model: BaseModel, *args, **kwargs) -> Dict[str, Any]:
@@ -25,6 +28,9 @@ else:  # pragma: no cover  # type: ignore
     def model_validate(schema: Type[SCHEMA], obj: Any, *args, **kwargs) -> SCHEMA:
         return schema.from_orm(obj)  # type: ignore
 
+    def model_dump_json(model: BaseModel, *args, **kwargs) -> str:
+        return model.json(*args, **kwargs)  # type: ignore
+
 
 class CreateUpdateDictModel(BaseModel):
     def create_update_dict(self):
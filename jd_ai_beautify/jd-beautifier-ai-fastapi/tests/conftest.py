@@ -357,6 +357,17 @@ def mock_user_db(
         async def delete(self, user: UserModel) -> None:
             pass
 
+        async def get_page(
+            self, after: Optional[IDType] = None, limit: int = 100
+        ) -> List[UserModel]:
+            users = sorted(
+                [user, verified_user, inactive_user, superuser, verified_superuser],
+                key=lambda u: str(u.id),
+            )
+            if after is not None:
+                users = [u for u in users if str(u.id) > str(after)]
+            return users[:limit]
+
     return MockUserDatabase()
 
 
@@ -156,3 +156,112 @@ async def test_authenticators_with_same_name(get_test_auth_client, get_backend_n
     with pytest.raises(DuplicateBackendNamesError):
         async for _ in get_test_auth_client([get_backend_none(), get_backend_none()]):
             pass
+
+
+@pytest.mark.authentication
+@pytest.mark.asyncio
+async def test_authenticator_stops_at_first_user(
+    get_test_auth_client, get_backend_user, user: UserModel
+):
+    built_strategies: List[str] = []
+
+    def get_strategy():
+        built_strategies.append("after")
+        return UserStrategy(user)
+
+    backend_after = AuthenticationBackend(
+        name="after", transport=MockTransport(), get_strategy=get_strategy
+    )
+
+    async for client in get_test_auth_client([get_backend_user(), backend_after]):
+        response = await client.get("/test-current-user")
+        assert response.status_code == status.HTTP_200_OK
+        assert built_strategies == []
+
+
+@pytest.mark.authentication
+@pytest.mark.asyncio
+async def test_authenticator_strategy_dependencies(
+    get_test_auth_client, get_backend_none, user: UserModel
+):
+    async def get_user() -> UserModel:
+        return user
+
+    async def get_strategy(injected_user: UserModel = Depends(get_user)):
+        return UserStrategy(injected_user)
+
+    async def get_async_strategy():
+        return NoneStrategy()
+
+    backends = [
+        AuthenticationBackend(
+            name="coroutine", transport=MockTransport(), get_strategy=get_async_strategy
+        ),
+        AuthenticationBackend(
+            name="injected", transport=MockTransport(), get_strategy=get_strategy
+        ),
+    ]
+    async for client in get_test_auth_client(backends):
+        response = await client.get("/test-current-user")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["id"] == str(user.id)
+
+
+@pytest.mark.authentication
+@pytest.mark.asyncio
+async def test_authenticator_strategy_override(
+    get_user_manager, get_test_client, get_backend_none, user: UserModel
+):
+    backend = get_backend_none()
+    authenticator = Authenticator([backend], get_user_manager)
+    app = FastAPI()
+
+    @app.get("/test-current-user", response_model=User)
+    def test_current_user(user: UserModel = Depends(authenticator.current_user())):
+        return user
+
+    async for client in get_test_client(app):
+        response = await client.get("/test-current-user")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        app.dependency_overrides[backend.get_strategy] = lambda: UserStrategy(user)
+        response = await client.get("/test-current-user")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["id"] == str(user.id)
+
+
+@pytest.mark.authentication
+@pytest.mark.asyncio
+async def test_authenticator_strategy_override_dependencies(
+    get_user_manager, get_test_client, get_backend_none, user: UserModel
+):
+    backend = get_backend_none()
+    authenticator = Authenticator([backend], get_user_manager)
+    app = FastAPI()
+
+    @app.get("/test-current-user", response_model=User)
+    def test_current_user(user: UserModel = Depends(authenticator.current_user())):
+        return user
+
+    async def get_user() -> UserModel:
+        return user
+
+    def get_strategy(injected_user: UserModel = Depends(get_user)):
+        return UserStrategy(injected_user)
+
+    def get_strategy_generator():
+        yield UserStrategy(user)
+
+    def get_strategy_query(name: str):
+        return UserStrategy(user)  # pragma: no cover
+
+    async for client in get_test_client(app):
+        for override in (get_strategy, get_strategy_generator):
+            app.dependency_overrides[backend.get_strategy] = override
+            response = await client.get("/test-current-user")
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json()["id"] == str(user.id)
+
+        app.dependency_overrides[backend.get_strategy] = get_strategy_query
+        response = await client.get("/test-current-user")
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
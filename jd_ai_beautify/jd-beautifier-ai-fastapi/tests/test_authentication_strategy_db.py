@@ -1,15 +1,20 @@
+import asyncio
+import contextlib
 import dataclasses
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 
 import pytest
+from pytest_mock import MockerFixture
 
 from fastapi_users.authentication.strategy import (
-    AccessTokenDatabase,
+    AccessTokenCache,
     AccessTokenProtocol,
+    AccessTokenUsesDatabase,
     DatabaseStrategy,
 )
+from fastapi_users.authentication.strategy.db.cache import CachedAccessToken
 from tests.conftest import IDType, UserModel
 
 
@@ -23,7 +28,7 @@ class AccessTokenModel(AccessTokenProtocol[IDType]):
     )
 
 
-class AccessTokenDatabaseMock(AccessTokenDatabase[AccessTokenModel]):
+class AccessTokenDatabaseMock(AccessTokenUsesDatabase[AccessTokenModel]):
     store: Dict[str, AccessTokenModel]
 
     def __init__(self):
@@ -60,6 +65,16 @@ class AccessTokenDatabaseMock(AccessTokenDatabase[AccessTokenModel]):
         except KeyError:
             pass
 
+    async def update_last_used(self, last_used: Dict[str, datetime]) -> None:
+        for token, used_at in last_used.items():
+            if token in self.store:
+                self.store[token].created_at = used_at
+
+
+class AccessTokenDeleteByTokenDatabaseMock(AccessTokenDatabaseMock):
+    async def delete_by_token(self, token: str) -> None:
+        self.store.pop(token, None)
+
 
 @pytest.fixture
 def access_token_database() -> AccessTokenDatabaseMock:
@@ -147,3 +162,285 @@ async def test_destroy_token(
     await database_strategy.destroy_token("TOKEN", user)
 
     assert await access_token_database.get_by_token("TOKEN") is None
+
+
+@pytest.mark.authentication
+@pytest.mark.asyncio
+async def test_destroy_token_by_token(user: UserModel, mocker: MockerFixture):
+    access_token_database = AccessTokenDeleteByTokenDatabaseMock()
+    database_strategy = DatabaseStrategy(access_token_database, 3600)
+    await access_token_database.create({"token": "TOKEN", "user_id": user.id})
+    get_by_token_spy = mocker.spy(access_token_database, "get_by_token")
+
+    await database_strategy.destroy_token("TOKEN", user)
+
+    assert get_by_token_spy.call_count == 0
+    assert "TOKEN" not in access_token_database.store
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.authentication
+class TestTokenCache:
+    @pytest.fixture
+    def clock(self) -> FakeClock:
+        return FakeClock()
+
+    @pytest.fixture
+    def token_cache(self, clock: FakeClock) -> AccessTokenCache[AccessTokenModel]:
+        return AccessTokenCache(timer=clock)
+
+    @pytest.fixture
+    def database_strategy(
+        self,
+        access_token_database: AccessTokenDatabaseMock,
+        token_cache: AccessTokenCache[AccessTokenModel],
+    ):
+        return DatabaseStrategy(access_token_database, 3600, token_cache=token_cache)
+
+    @pytest.mark.asyncio
+    async def test_cached_token(
+        self,
+        database_strategy: DatabaseStrategy[UserModel, IDType, AccessTokenModel],
+        access_token_database: AccessTokenDatabaseMock,
+        token_cache: AccessTokenCache[AccessTokenModel],
+        user_manager,
+        user: UserModel,
+        mocker: MockerFixture,
+    ):
+        access_token = await access_token_database.create(
+            {"token": "TOKEN", "user_id": user.id}
+        )
+        get_by_token_spy = mocker.spy(access_token_database, "get_by_token")
+
+        for _ in range(3):
+            authenticated_user = await database_strategy.read_token(
+                "TOKEN", user_manager
+            )
+            assert authenticated_user is not None
+            assert authenticated_user.id == user.id
+        assert get_by_token_spy.call_count == 1
+        # Plain values, never the instance returned by the database.
+        assert token_cache.get("TOKEN") == (
+            True,
+            CachedAccessToken(user.id, access_token.created_at),
+        )
+
+    @pytest.mark.asyncio
+    async def test_naive_created_at(
+        self,
+        database_strategy: DatabaseStrategy[UserModel, IDType, AccessTokenModel],
+        access_token_database: AccessTokenDatabaseMock,
+        user_manager,
+        user: UserModel,
+    ):
+        created_at = datetime.now(timezone.utc)
+        await access_token_database.create(
+            {
+                "token": "TOKEN",
+                "user_id": user.id,
+                "created_at": created_at.replace(tzinfo=None),
+            }
+        )
+        authenticated_user = await database_strategy.read_token("TOKEN", user_manager)
+        assert authenticated_user is not None
+        assert authenticated_user.id == user.id
+
+    @pytest.mark.asyncio
+    async def test_unknown_token(
+        self,
+        database_strategy: DatabaseStrategy[UserModel, IDType, AccessTokenModel],
+        access_token_database: AccessTokenDatabaseMock,
+        clock: FakeClock,
+        user_manager,
+        mocker: MockerFixture,
+    ):
+        get_by_token_spy = mocker.spy(access_token_database, "get_by_token")
+
+        assert await database_strategy.read_token("TOKEN", user_manager) is None
+        assert await database_strategy.read_token("TOKEN", user_manager) is None
+        assert get_by_token_spy.call_count == 1
+
+        clock.now = 5
+        assert await database_strategy.read_token("TOKEN", user_manager) is None
+        assert get_by_token_spy.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_token(
+        self,
+        database_strategy: DatabaseStrategy[UserModel, IDType, AccessTokenModel],
+        access_token_database: AccessTokenDatabaseMock,
+        user_manager,
+        user: UserModel,
+    ):
+        await access_token_database.create(
+            {
+                "token": "TOKEN",
+                "user_id": user.id,
+                "created_at": datetime.now(timezone.utc) - timedelta(seconds=3601),
+            }
+        )
+        assert await database_strategy.read_token("TOKEN", user_manager) is None
+
+    @pytest.mark.asyncio
+    async def test_write_and_destroy_through(
+        self,
+        database_strategy: DatabaseStrategy[UserModel, IDType, AccessTokenModel],
+        access_token_database: AccessTokenDatabaseMock,
+        user_manager,
+        user: UserModel,
+        mocker: MockerFixture,
+    ):
+        token = await database_strategy.write_token(user)
+        get_by_token_spy = mocker.spy(access_token_database, "get_by_token")
+
+        authenticated_user = await database_strategy.read_token(token, user_manager)
+        assert authenticated_user is not None
+        assert get_by_token_spy.call_count == 0
+
+        await database_strategy.destroy_token(token, user)
+        assert await database_strategy.read_token(token, user_manager) is None
+        assert get_by_token_spy.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_sliding_expiry(
+        self,
+        access_token_database: AccessTokenDatabaseMock,
+        clock: FakeClock,
+        user_manager,
+        user: UserModel,
+        mocker: MockerFixture,
+    ):
+        token_cache: AccessTokenCache[AccessTokenModel] = AccessTokenCache(
+            sliding_expiry=True, touch_interval_seconds=60, timer=clock
+        )
+        database_strategy = DatabaseStrategy(
+            access_token_database, 3600, token_cache=token_cache
+        )
+        created_at = datetime.now(timezone.utc) - timedelta(seconds=3000)
+        for token in ("TOKEN", "OTHER_TOKEN"):
+            await access_token_database.create(
+                {"token": token, "user_id": user.id, "created_at": created_at}
+            )
+        update_last_used_spy = mocker.spy(access_token_database, "update_last_used")
+
+        for token in ("TOKEN", "OTHER_TOKEN", "TOKEN"):
+            assert await database_strategy.read_token(token, user_manager) is not None
+        assert update_last_used_spy.call_count == 0
+        last_used = token_cache.last_used("TOKEN", access_token_database.store["TOKEN"])
+        assert last_used > created_at
+
+        await token_cache.flush(access_token_database)
+        assert update_last_used_spy.call_count == 1
+        assert set(update_last_used_spy.call_args.args[0]) == {"TOKEN", "OTHER_TOKEN"}
+        assert access_token_database.store["TOKEN"].created_at == last_used
+
+        await token_cache.flush(access_token_database)
+        assert update_last_used_spy.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_uses(
+        self,
+        access_token_database: AccessTokenDatabaseMock,
+        user: UserModel,
+        mocker: MockerFixture,
+    ):
+        token_cache: AccessTokenCache[AccessTokenModel] = AccessTokenCache(
+            sliding_expiry=True
+        )
+        access_token = await access_token_database.create(
+            {
+                "token": "TOKEN",
+                "user_id": user.id,
+                "created_at": datetime.now(timezone.utc) - timedelta(seconds=3000),
+            }
+        )
+        now = datetime.now(timezone.utc)
+        token_cache.touch("TOKEN", access_token, now)
+        mocker.patch.object(
+            access_token_database, "update_last_used", side_effect=ConnectionError
+        )
+
+        with pytest.raises(ConnectionError):
+            await token_cache.flush(access_token_database)
+
+        mocker.stopall()
+        await token_cache.flush(access_token_database)
+        assert access_token_database.store["TOKEN"].created_at == now
+
+    @pytest.mark.asyncio
+    async def test_flush_periodically(
+        self, access_token_database: AccessTokenDatabaseMock, user: UserModel
+    ):
+        token_cache: AccessTokenCache[AccessTokenModel] = AccessTokenCache(
+            sliding_expiry=True, flush_interval_seconds=3600
+        )
+        access_token = await access_token_database.create(
+            {
+                "token": "TOKEN",
+                "user_id": user.id,
+                "created_at": datetime.now(timezone.utc) - timedelta(seconds=3000),
+            }
+        )
+        opened_databases = []
+
+        @contextlib.asynccontextmanager
+        async def get_database():
+            opened_databases.append(access_token_database)
+            yield access_token_database
+
+        flush_task = asyncio.create_task(token_cache.flush_periodically(get_database))
+        await asyncio.sleep(0)
+        now = datetime.now(timezone.utc)
+        token_cache.touch("TOKEN", access_token, now)
+        flush_task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await flush_task
+
+        assert len(opened_databases) == 1
+        assert access_token_database.store["TOKEN"].created_at == now
+
+    @pytest.mark.asyncio
+    async def test_flush_periodically_retries(
+        self,
+        access_token_database: AccessTokenDatabaseMock,
+        user: UserModel,
+        mocker: MockerFixture,
+    ):
+        token_cache: AccessTokenCache[AccessTokenModel] = AccessTokenCache(
+            sliding_expiry=True, flush_interval_seconds=0
+        )
+        access_token = await access_token_database.create(
+            {
+                "token": "TOKEN",
+                "user_id": user.id,
+                "created_at": datetime.now(timezone.utc) - timedelta(seconds=3000),
+            }
+        )
+        now = datetime.now(timezone.utc)
+        token_cache.touch("TOKEN", access_token, now)
+        update_last_used_mock = mocker.patch.object(
+            access_token_database,
+            "update_last_used",
+            side_effect=[ConnectionError, None],
+        )
+
+        @contextlib.asynccontextmanager
+        async def get_database():
+            yield access_token_database
+
+        flush_task = asyncio.create_task(token_cache.flush_periodically(get_database))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        flush_task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await flush_task
+
+        assert update_last_used_mock.call_count == 2
+        update_last_used_mock.assert_called_with({"TOKEN": now})
@@ -1,10 +1,15 @@
+import dataclasses
+
+import jwt
 import pytest
+from pytest_mock import MockerFixture
 
 from fastapi_users.authentication.strategy import (
     JWTStrategy,
     StrategyDestroyNotSupportedError,
 )
-from fastapi_users.jwt import SecretType, decode_jwt, generate_jwt
+from fastapi_users.cache import TTLCache
+from fastapi_users.jwt import DecodedJWTCache, SecretType, decode_jwt, generate_jwt
 from tests.conftest import IDType, UserModel
 
 LIFETIME = 3600
@@ -136,6 +141,104 @@ class TestReadToken:
         assert authenticated_user.id == user.id
 
 
+@pytest.mark.parametrize("jwt_strategy", ["HS256"], indirect=True)
+@pytest.mark.authentication
+class TestReadTokenUserCache:
+    @pytest.mark.asyncio
+    async def test_cached_user(
+        self,
+        jwt_strategy: JWTStrategy[UserModel, IDType],
+        user_manager,
+        token,
+        user,
+        mocker: MockerFixture,
+    ):
+        jwt_strategy.user_cache = TTLCache()
+        get_spy = mocker.spy(user_manager, "get")
+
+        authenticated_user = await jwt_strategy.read_token(token(user.id), user_manager)
+        assert authenticated_user is not None
+        assert authenticated_user.id == user.id
+        assert jwt_strategy.user_cache.get(user.id) is authenticated_user
+
+        authenticated_user = await jwt_strategy.read_token(token(user.id), user_manager)
+        assert authenticated_user is not None
+        assert authenticated_user.id == user.id
+        assert get_spy.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_cached_snapshot(
+        self,
+        jwt_strategy: JWTStrategy[UserModel, IDType],
+        user_manager,
+        token,
+        user,
+        mocker: MockerFixture,
+    ):
+        jwt_strategy.user_cache = TTLCache()
+        mocker.patch.object(
+            user_manager.user_db, "snapshot", side_effect=dataclasses.asdict
+        )
+        restore_spy = mocker.patch.object(
+            user_manager.user_db,
+            "restore",
+            side_effect=lambda snapshot: dataclasses.replace(user, **snapshot),
+        )
+
+        first_user = await jwt_strategy.read_token(token(user.id), user_manager)
+        assert jwt_strategy.user_cache.get(user.id) == dataclasses.asdict(user)
+
+        second_user = await jwt_strategy.read_token(token(user.id), user_manager)
+        assert second_user.id == first_user.id
+        assert second_user is not first_user
+        restore_spy.assert_called_once_with(dataclasses.asdict(user))
+
+    @pytest.mark.asyncio
+    async def test_not_existing_user_not_cached(
+        self, jwt_strategy: JWTStrategy[UserModel, IDType], user_manager, token
+    ):
+        jwt_strategy.user_cache = TTLCache()
+
+        authenticated_user = await jwt_strategy.read_token(
+            token("d35d213e-f3d8-4f08-954a-7e0d1bea286f"), user_manager
+        )
+        assert authenticated_user is None
+        assert len(jwt_strategy.user_cache) == 0
+
+
+@pytest.mark.parametrize("jwt_strategy", ["HS256", "RS256", "ES256"], indirect=True)
+@pytest.mark.authentication
+class TestReadTokenDecodedTokenCache:
+    @pytest.mark.asyncio
+    async def test_verified_once(
+        self,
+        jwt_strategy: JWTStrategy[UserModel, IDType],
+        user_manager,
+        token,
+        user,
+        mocker: MockerFixture,
+    ):
+        jwt_strategy.decoded_token_cache = DecodedJWTCache()
+        decode_spy = mocker.spy(jwt, "decode")
+        user_token = token(user.id)
+
+        for _ in range(3):
+            authenticated_user = await jwt_strategy.read_token(user_token, user_manager)
+            assert authenticated_user is not None
+            assert authenticated_user.id == user.id
+        assert decode_spy.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_invalid_token_not_cached(
+        self, jwt_strategy: JWTStrategy[UserModel, IDType], user_manager
+    ):
+        jwt_strategy.decoded_token_cache = DecodedJWTCache()
+
+        authenticated_user = await jwt_strategy.read_token("foo", user_manager)
+        assert authenticated_user is None
+        assert len(jwt_strategy.decoded_token_cache) == 0
+
+
 @pytest.mark.parametrize("jwt_strategy", ["HS256", "RS256", "ES256"], indirect=True)
 @pytest.mark.authentication
 @pytest.mark.asyncio
@@ -1,19 +1,22 @@
+import dataclasses
 from datetime import datetime
-from typing import Dict, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import pytest
+from pytest_mock import MockerFixture
 
-from fastapi_users.authentication.strategy import RedisStrategy
+from fastapi_users.authentication.strategy import JSONUserSnapshot, RedisStrategy
 from tests.conftest import IDType, UserModel
 
 
 class RedisMock:
-    store: Dict[str, Tuple[str, Optional[int]]]
+    store: Dict[str, Tuple[Any, Optional[int]]]
 
     def __init__(self):
         self.store = {}
+        self.round_trips = 0
 
-    async def get(self, key: str) -> Optional[str]:
+    def _get(self, key: str) -> Optional[Any]:
         try:
             value, expiration = self.store[key]
             if expiration is not None and expiration < datetime.now().timestamp():
@@ -23,17 +26,90 @@ class RedisMock:
         else:
             return value
 
-    async def set(self, key: str, value: str, ex: Optional[int] = None):
+    def _set(
+        self,
+        key: str,
+        value: str,
+        ex: Optional[int] = None,
+        keepttl: bool = False,
+        xx: bool = False,
+    ) -> Optional[bool]:
+        if xx and self._get(key) is None:
+            return None
         expiration = None
-        if ex is not None:
+        if keepttl:
+            expiration = self.store[key][1]
+        elif ex is not None:
             expiration = int(datetime.now().timestamp() + ex)
         self.store[key] = (value, expiration)
+        return True
 
-    async def delete(self, key: str):
-        try:
-            del self.store[key]
-        except KeyError:
-            pass
+    def _delete(self, *keys: str) -> int:
+        return sum(self.store.pop(key, None) is not None for key in keys)
+
+    def _sadd(self, key: str, *members: str) -> int:
+        current = self._get(key) or set()
+        added = len(set(members) - current)
+        self.store[key] = (current | set(members), self.store.get(key, (0, None))[1])
+        return added
+
+    def _srem(self, key: str, *members: str) -> int:
+        current = self._get(key) or set()
+        removed = len(current & set(members))
+        if key in self.store:
+            self.store[key] = (current - set(members), self.store[key][1])
+        return removed
+
+    def _expire(self, key: str, seconds: int) -> bool:
+        if key not in self.store:
+            return False
+        self.store[key] = (
+            self.store[key][0],
+            int(datetime.now().timestamp() + seconds),
+        )
+        return True
+
+    async def get(self, key: str) -> Optional[str]:
+        self.round_trips += 1
+        return self._get(key)
+
+    async def set(self, key: str, value: str, ex: Optional[int] = None):
+        self.round_trips += 1
+        return self._set(key, value, ex)
+
+    async def delete(self, *keys: str) -> int:
+        self.round_trips += 1
+        return self._delete(*keys)
+
+    async def smembers(self, key: str) -> Set[str]:
+        self.round_trips += 1
+        return set(self._get(key) or set())
+
+    async def srem(self, key: str, *members: str) -> int:
+        self.round_trips += 1
+        return self._srem(key, *members)
+
+    def pipeline(self, transaction: bool = True) -> "PipelineMock":
+        return PipelineMock(self)
+
+
+class PipelineMock:
+    def __init__(self, redis: RedisMock):
+        self.redis = redis
+        self.commands: List[Tuple[Callable[..., Any], tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        def queue(*args, **kwargs):
+            self.commands.append((getattr(self.redis, f"_{name}"), args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> List[Any]:
+        self.redis.round_trips += 1
+        results = [command(*args, **kwargs) for command, args, kwargs in self.commands]
+        self.commands = []
+        return results
 
 
 @pytest.fixture
@@ -109,6 +185,10 @@ async def test_write_token(
 
     value = await redis.get(f"{redis_strategy.key_prefix}{token}")
     assert value == str(user.id)
+    assert await redis.smembers(
+        f"{redis_strategy.user_tokens_key_prefix}{user.id}"
+    ) == {token}
+    assert redis.round_trips == 3
 
 
 @pytest.mark.authentication
@@ -116,8 +196,138 @@ async def test_write_token(
 async def test_destroy_token(
     redis_strategy: RedisStrategy[UserModel, IDType], redis: RedisMock, user
 ):
-    await redis.set(f"{redis_strategy.key_prefix}TOKEN", str(user.id))
+    token = await redis_strategy.write_token(user)
+
+    await redis_strategy.destroy_token(token, user)
+
+    assert await redis.get(f"{redis_strategy.key_prefix}{token}") is None
+    assert (
+        await redis.smembers(f"{redis_strategy.user_tokens_key_prefix}{user.id}")
+        == set()
+    )
+
+
+@pytest.mark.authentication
+@pytest.mark.asyncio
+async def test_destroy_user_tokens(
+    redis_strategy: RedisStrategy[UserModel, IDType],
+    redis: RedisMock,
+    user,
+    inactive_user,
+    user_manager,
+    monkeypatch,
+):
+    monkeypatch.setattr(
+        "fastapi_users.authentication.strategy.redis.DELETE_CHUNK_SIZE", 2
+    )
+    tokens = [await redis_strategy.write_token(user) for _ in range(5)]
+    other_token = await redis_strategy.write_token(inactive_user)
+    redis.round_trips = 0
+
+    assert await redis_strategy.destroy_user_tokens(user) == 5
+    assert redis.round_trips == 2
+
+    for token in tokens:
+        assert await redis_strategy.read_token(token, user_manager) is None
+    assert (
+        await redis.smembers(f"{redis_strategy.user_tokens_key_prefix}{user.id}")
+        == set()
+    )
+    assert await redis.get(f"{redis_strategy.key_prefix}{other_token}") is not None
+
+
+@pytest.mark.authentication
+@pytest.mark.asyncio
+async def test_update_user_snapshots_without_serializer(
+    redis_strategy: RedisStrategy[UserModel, IDType], redis: RedisMock, user
+):
+    token = await redis_strategy.write_token(user)
+    redis.round_trips = 0
+
+    await redis_strategy.update_user_snapshots(user)
+    assert redis.round_trips == 0
+    assert await redis.get(f"{redis_strategy.key_prefix}{token}") == str(user.id)
 
-    await redis_strategy.destroy_token("TOKEN", user)
 
-    assert await redis.get(f"{redis_strategy.key_prefix}TOKEN") is None
+@pytest.mark.authentication
+class TestUserSnapshot:
+    @pytest.fixture
+    def redis_strategy(self, redis):
+        return RedisStrategy(
+            redis,
+            3600,
+            user_snapshot=JSONUserSnapshot(
+                UserModel,
+                fields=("email", "hashed_password", "is_active", "is_verified"),
+            ),
+        )
+
+    @pytest.mark.asyncio
+    async def test_read_token_without_database(
+        self,
+        redis_strategy: RedisStrategy[UserModel, IDType],
+        redis: RedisMock,
+        user_manager,
+        user,
+        mocker: MockerFixture,
+    ):
+        get_spy = mocker.spy(user_manager, "get")
+        attach_spy = mocker.spy(user_manager.user_db, "attach")
+        token = await redis_strategy.write_token(user)
+        redis.round_trips = 0
+
+        authenticated_user = await redis_strategy.read_token(token, user_manager)
+        assert authenticated_user is not None
+        assert dataclasses.asdict(authenticated_user) == dataclasses.asdict(user)
+        assert redis.round_trips == 1
+        assert get_spy.call_count == 0
+        assert attach_spy.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_read_token_without_snapshot(
+        self,
+        redis_strategy: RedisStrategy[UserModel, IDType],
+        redis: RedisMock,
+        user_manager,
+        user,
+    ):
+        await redis.set(f"{redis_strategy.key_prefix}TOKEN", str(user.id))
+        authenticated_user = await redis_strategy.read_token("TOKEN", user_manager)
+        assert authenticated_user is not None
+        assert authenticated_user.id == user.id
+
+    @pytest.mark.asyncio
+    async def test_update_user_snapshots(
+        self,
+        redis_strategy: RedisStrategy[UserModel, IDType],
+        redis: RedisMock,
+        user_manager,
+        user,
+    ):
+        tokens = [await redis_strategy.write_token(user) for _ in range(3)]
+        await redis.delete(f"{redis_strategy.key_prefix}{tokens[0]}")
+        user.is_verified = True
+        redis.round_trips = 0
+
+        await redis_strategy.update_user_snapshots(user)
+        assert redis.round_trips == 3
+
+        assert await redis_strategy.read_token(tokens[0], user_manager) is None
+        for token in tokens[1:]:
+            authenticated_user = await redis_strategy.read_token(token, user_manager)
+            assert authenticated_user is not None
+            assert authenticated_user.is_verified is True
+        assert await redis.smembers(
+            f"{redis_strategy.user_tokens_key_prefix}{user.id}"
+        ) == set(tokens[1:])
+
+    @pytest.mark.asyncio
+    async def test_update_user_snapshots_without_tokens(
+        self,
+        redis_strategy: RedisStrategy[UserModel, IDType],
+        redis: RedisMock,
+        user,
+    ):
+        await redis_strategy.update_user_snapshots(user)
+        assert redis.round_trips == 1
+        assert redis.store == {}
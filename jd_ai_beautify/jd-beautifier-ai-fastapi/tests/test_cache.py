@@ -0,0 +1,66 @@
+import pytest
+
+from fastapi_users.cache import TTLCache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def timer() -> FakeTimer:
+    return FakeTimer()
+
+
+@pytest.mark.fastapi_users
+class TestTTLCache:
+    def test_get_set(self, timer: FakeTimer):
+        cache: TTLCache[str, int] = TTLCache(ttl_seconds=10, timer=timer)
+        assert cache.get("a") is None
+
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert len(cache) == 1
+
+    def test_expiry(self, timer: FakeTimer):
+        cache: TTLCache[str, int] = TTLCache(ttl_seconds=10, timer=timer)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl_seconds=20)
+
+        timer.now = 10
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert len(cache) == 1
+
+    def test_non_positive_ttl(self, timer: FakeTimer):
+        cache: TTLCache[str, int] = TTLCache(timer=timer)
+        cache.set("a", 1)
+        cache.set("a", 2, ttl_seconds=0)
+        assert cache.get("a") is None
+
+    def test_lru_eviction(self, timer: FakeTimer):
+        cache: TTLCache[str, int] = TTLCache(max_size=2, timer=timer)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_pop_clear(self, timer: FakeTimer):
+        cache: TTLCache[str, int] = TTLCache(timer=timer)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        cache.pop("a")
+        cache.pop("unknown")
+        assert cache.get("a") is None
+
+        cache.clear()
+        assert len(cache) == 0
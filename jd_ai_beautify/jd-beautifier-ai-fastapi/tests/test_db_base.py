@@ -1,6 +1,7 @@
 import uuid
 
 import pytest
+from pytest_mock import MockerFixture
 
 from fastapi_users.db import BaseUserDatabase
 from tests.conftest import IDType, OAuthAccountModel, UserModel
@@ -36,3 +37,59 @@ async def test_not_implemented_methods(
 
     with pytest.raises(NotImplementedError):
         await base_user_db.update_oauth_account(user, oauth_account1, {})
+
+    with pytest.raises(NotImplementedError):
+        await base_user_db.get_page()
+
+    with pytest.raises(NotImplementedError):
+        await base_user_db.create_many([{}])
+
+
+@pytest.mark.asyncio
+@pytest.mark.db
+async def test_bulk_methods_default_to_single_methods(
+    mock_user_db: BaseUserDatabase[UserModel, IDType],
+    user: UserModel,
+    superuser: UserModel,
+    mocker: MockerFixture,
+):
+    assert await mock_user_db.get_existing_emails(
+        [user.email.upper(), "lancelot@camelot.bt"]
+    ) == {user.email}
+
+    created_users = await mock_user_db.create_many(
+        [{"email": "lancelot@camelot.bt", "hashed_password": "guinevere"}]
+    )
+    assert [created_user.email for created_user in created_users] == [
+        "lancelot@camelot.bt"
+    ]
+
+    updated_users = await mock_user_db.update_many(
+        [(user, {"first_name": "Arthur"}), (superuser, {"first_name": "Merlin"})]
+    )
+    assert [updated_user.first_name for updated_user in updated_users] == [
+        "Arthur",
+        "Merlin",
+    ]
+
+    delete_spy = mocker.spy(mock_user_db, "delete")
+    await mock_user_db.delete_many([user, superuser])
+    assert delete_spy.call_count == 2
+
+    assert await mock_user_db.restore(mock_user_db.snapshot(user)) is user
+
+
+@pytest.mark.asyncio
+@pytest.mark.db
+async def test_get_many_defaults_to_single_methods(
+    mock_user_db: BaseUserDatabase[UserModel, IDType],
+    user: UserModel,
+    superuser: UserModel,
+):
+    users = await mock_user_db.get_many([user.id, uuid.uuid4(), superuser.id])
+    assert [u.id for u in users] == [user.id, superuser.id]
+
+    users = await mock_user_db.get_many_by_email(
+        ["lancelot@camelot.bt", superuser.email.upper()]
+    )
+    assert [u.id for u in users] == [superuser.id]
@@ -0,0 +1,152 @@
+import asyncio
+import uuid
+
+import pytest
+from pytest_mock import MockerFixture
+
+from fastapi_users.db import BaseUserDatabase, UserLoader
+from tests.conftest import IDType, UserModel
+
+
+@pytest.fixture
+def user_loader(mock_user_db: BaseUserDatabase[UserModel, IDType]):
+    return UserLoader(mock_user_db)
+
+
+@pytest.mark.asyncio
+@pytest.mark.db
+class TestUserLoader:
+    async def test_concurrent_loads_are_batched(
+        self,
+        user_loader: UserLoader[UserModel, IDType],
+        mock_user_db: BaseUserDatabase[UserModel, IDType],
+        user: UserModel,
+        superuser: UserModel,
+        mocker: MockerFixture,
+    ):
+        get_many_spy = mocker.spy(mock_user_db, "get_many")
+        unknown_id = uuid.uuid4()
+
+        users = await asyncio.gather(
+            user_loader.load(user.id),
+            user_loader.load(superuser.id),
+            user_loader.load(user.id),
+            user_loader.load(unknown_id),
+        )
+
+        assert [u.id if u else None for u in users] == [
+            user.id,
+            superuser.id,
+            user.id,
+            None,
+        ]
+        assert get_many_spy.call_count == 1
+        assert set(get_many_spy.call_args[0][0]) == {user.id, superuser.id, unknown_id}
+
+    async def test_loaded_users_are_kept(
+        self,
+        user_loader: UserLoader[UserModel, IDType],
+        mock_user_db: BaseUserDatabase[UserModel, IDType],
+        user: UserModel,
+        mocker: MockerFixture,
+    ):
+        get_many_spy = mocker.spy(mock_user_db, "get_many")
+        unknown_id = uuid.uuid4()
+
+        await user_loader.load_many([user.id, unknown_id])
+        assert await user_loader.load(user.id) is not None
+        assert await user_loader.load(unknown_id) is None
+        assert get_many_spy.call_count == 1
+
+        user_loader.clear(user.id)
+        assert await user_loader.load(user.id) is not None
+        assert get_many_spy.call_count == 2
+
+    async def test_prime(
+        self,
+        user_loader: UserLoader[UserModel, IDType],
+        mock_user_db: BaseUserDatabase[UserModel, IDType],
+        mocker: MockerFixture,
+    ):
+        get_many_spy = mocker.spy(mock_user_db, "get_many")
+        lancelot = UserModel(email="lancelot@camelot.bt", hashed_password="guinevere")
+
+        user_loader.prime(lancelot)
+
+        assert await user_loader.load(lancelot.id) is lancelot
+        assert get_many_spy.call_count == 0
+
+    async def test_sequential_loads_are_separate_batches(
+        self,
+        user_loader: UserLoader[UserModel, IDType],
+        mock_user_db: BaseUserDatabase[UserModel, IDType],
+        user: UserModel,
+        superuser: UserModel,
+        mocker: MockerFixture,
+    ):
+        get_many_spy = mocker.spy(mock_user_db, "get_many")
+
+        await user_loader.load(user.id)
+        await user_loader.load(superuser.id)
+
+        assert get_many_spy.call_count == 2
+
+    async def test_error_is_raised_to_every_caller(
+        self,
+        user_loader: UserLoader[UserModel, IDType],
+        mock_user_db: BaseUserDatabase[UserModel, IDType],
+        user: UserModel,
+        superuser: UserModel,
+        mocker: MockerFixture,
+    ):
+        mocker.patch.object(
+            mock_user_db, "get_many", side_effect=RuntimeError("connection lost")
+        )
+
+        results = await asyncio.gather(
+            user_loader.load(user.id),
+            user_loader.load(superuser.id),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+        # Failures are not kept.
+        mocker.patch.object(mock_user_db, "get_many", return_value=[user])
+        loaded_user = await user_loader.load(user.id)
+        assert loaded_user is not None and loaded_user.id == user.id
+
+    async def test_cancelled_caller_does_not_cancel_batch(
+        self,
+        user_loader: UserLoader[UserModel, IDType],
+        user: UserModel,
+    ):
+        first = asyncio.ensure_future(user_loader.load(user.id))
+        second = asyncio.ensure_future(user_loader.load(user.id))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        loaded_user = await second
+        assert loaded_user is not None and loaded_user.id == user.id
+
+    async def test_cancelled_batch_cancels_callers(
+        self,
+        user_loader: UserLoader[UserModel, IDType],
+        mock_user_db: BaseUserDatabase[UserModel, IDType],
+        user: UserModel,
+        mocker: MockerFixture,
+    ):
+        started = asyncio.Event()
+
+        async def get_many(ids):
+            started.set()
+            await asyncio.Event().wait()
+
+        mocker.patch.object(mock_user_db, "get_many", side_effect=get_many)
+        load = asyncio.ensure_future(user_loader.load(user.id))
+        await started.wait()
+        for batch in list(user_loader._batches):
+            batch.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(load, 1)
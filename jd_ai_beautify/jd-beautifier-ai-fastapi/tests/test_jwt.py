@@ -1,6 +1,8 @@
+import jwt as pyjwt
 import pytest
+from pytest_mock import MockerFixture
 
-from fastapi_users.jwt import SecretType, decode_jwt, generate_jwt
+from fastapi_users.jwt import DecodedJWTCache, SecretType, decode_jwt, generate_jwt
 
 
 @pytest.mark.jwt
@@ -13,3 +15,67 @@ def test_generate_decode_jwt(secret: SecretType):
 
     assert decoded["foo"] == "bar"
     assert decoded["aud"] == audience
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.jwt
+class TestDecodedJWTCache:
+    def test_decoded_once(self, secret: SecretType, mocker: MockerFixture):
+        decoded_jwt_cache = DecodedJWTCache()
+        decode_spy = mocker.spy(pyjwt, "decode")
+        jwt = generate_jwt({"foo": "bar", "aud": "TEST_AUDIENCE"}, secret, 3600)
+
+        first = decoded_jwt_cache.decode(jwt, secret, ["TEST_AUDIENCE"])
+        first["foo"] = "baz"
+        second = decoded_jwt_cache.decode(jwt, secret, ["TEST_AUDIENCE"])
+
+        assert second["foo"] == "bar"
+        assert decode_spy.call_count == 1
+
+    def test_evicted_at_expiration(self, secret: SecretType, mocker: MockerFixture):
+        jwt = generate_jwt({"aud": "TEST_AUDIENCE"}, secret, 3600)
+        expires_at = decode_jwt(jwt, secret, ["TEST_AUDIENCE"])["exp"]
+        clock = FakeClock(expires_at - 10)
+        decoded_jwt_cache = DecodedJWTCache(timer=clock)
+        decode_spy = mocker.spy(pyjwt, "decode")
+
+        decoded_jwt_cache.decode(jwt, secret, ["TEST_AUDIENCE"])
+        clock.now = expires_at - 1
+        decoded_jwt_cache.decode(jwt, secret, ["TEST_AUDIENCE"])
+        assert decode_spy.call_count == 1
+
+        clock.now = expires_at
+        decoded_jwt_cache.decode(jwt, secret, ["TEST_AUDIENCE"])
+        assert decode_spy.call_count == 2
+
+    def test_without_expiration(self, secret: SecretType, mocker: MockerFixture):
+        clock = FakeClock(1000)
+        decoded_jwt_cache = DecodedJWTCache(ttl_seconds=60, timer=clock)
+        decode_spy = mocker.spy(pyjwt, "decode")
+        jwt = generate_jwt({"aud": "TEST_AUDIENCE"}, secret)
+
+        decoded_jwt_cache.decode(jwt, secret, ["TEST_AUDIENCE"])
+        clock.now = 1059
+        decoded_jwt_cache.decode(jwt, secret, ["TEST_AUDIENCE"])
+        assert decode_spy.call_count == 1
+
+        clock.now = 1060
+        decoded_jwt_cache.decode(jwt, secret, ["TEST_AUDIENCE"])
+        assert decode_spy.call_count == 2
+
+    def test_other_key_verifies_again(self, secret: SecretType):
+        decoded_jwt_cache = DecodedJWTCache()
+        jwt = generate_jwt({"aud": "TEST_AUDIENCE"}, secret, 3600)
+        decoded_jwt_cache.decode(jwt, secret, ["TEST_AUDIENCE"])
+
+        with pytest.raises(pyjwt.InvalidSignatureError):
+            decoded_jwt_cache.decode(jwt, "OTHER_SECRET", ["TEST_AUDIENCE"])
+        with pytest.raises(pyjwt.InvalidAudienceError):
+            decoded_jwt_cache.decode(jwt, secret, ["OTHER_AUDIENCE"])
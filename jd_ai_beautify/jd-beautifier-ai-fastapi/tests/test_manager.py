@@ -5,6 +5,8 @@ import pytest
 from fastapi.security import OAuth2PasswordRequestForm
 from pytest_mock import MockerFixture
 
+from fastapi_users.cache import TTLCache
+from fastapi_users.db import UserLoader
 from fastapi_users.exceptions import (
     InvalidID,
     InvalidPasswordException,
@@ -17,8 +19,10 @@ from fastapi_users.exceptions import (
 )
 from fastapi_users.jwt import decode_jwt, generate_jwt
 from fastapi_users.manager import IntegerIDMixin
+from fastapi_users.password import AsyncPasswordHelper
 from tests.conftest import (
     UserCreate,
+    UserManager,
     UserManagerMock,
     UserModel,
     UserOAuthModel,
@@ -652,6 +656,176 @@ class TestDelete:
         assert user_manager.on_after_delete.called is True
 
 
+@pytest.mark.asyncio
+@pytest.mark.manager
+class TestGetMany:
+    async def test_order_of_ids(
+        self,
+        user: UserModel,
+        superuser: UserModel,
+        user_manager: UserManagerMock[UserModel],
+    ):
+        users = await user_manager.get_many([superuser.id, uuid.uuid4(), user.id])
+        assert [u.id for u in users] == [superuser.id, user.id]
+
+    async def test_user_loader(
+        self,
+        user: UserModel,
+        superuser: UserModel,
+        user_manager: UserManagerMock[UserModel],
+        mocker: MockerFixture,
+    ):
+        user_manager.user_loader = UserLoader(user_manager.user_db)
+        get_many_spy = mocker.spy(user_manager.user_db, "get_many")
+
+        users = await user_manager.get_many([superuser.id, uuid.uuid4(), user.id])
+        assert [u.id for u in users] == [superuser.id, user.id]
+        assert (await user_manager.get(user.id)).id == user.id
+        assert get_many_spy.call_count == 1
+
+    async def test_user_loader_cleared_on_update(
+        self,
+        user: UserModel,
+        user_manager: UserManagerMock[UserModel],
+        mocker: MockerFixture,
+    ):
+        user_manager.user_loader = UserLoader(user_manager.user_db)
+        get_many_spy = mocker.spy(user_manager.user_db, "get_many")
+
+        await user_manager.get(user.id)
+        await user_manager.update(UserUpdate(first_name="Arthur"), user)
+        await user_manager.get(user.id)
+        assert get_many_spy.call_count == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.manager
+class TestUserCache:
+    @pytest.fixture
+    def user_cache(self, user_manager: UserManagerMock[UserModel], user: UserModel):
+        user_cache: TTLCache = TTLCache()
+        user_cache.set(user.id, user)
+        user_manager.user_cache = user_cache
+        return user_cache
+
+    async def test_update(
+        self,
+        user: UserModel,
+        user_manager: UserManagerMock[UserModel],
+        user_cache: TTLCache,
+    ):
+        await user_manager.update(UserUpdate(first_name="Arthur"), user)
+        assert user_cache.get(user.id) is None
+
+    async def test_verify(
+        self,
+        user: UserModel,
+        user_manager: UserManagerMock[UserModel],
+        user_cache: TTLCache,
+        verify_token,
+    ):
+        await user_manager.verify(verify_token(user_id=user.id, email=user.email))
+        assert user_cache.get(user.id) is None
+
+    async def test_delete(
+        self,
+        user: UserModel,
+        user_manager: UserManagerMock[UserModel],
+        user_cache: TTLCache,
+    ):
+        await user_manager.delete(user)
+        assert user_cache.get(user.id) is None
+
+    async def test_oauth_associate(
+        self,
+        user_oauth: UserOAuthModel,
+        user_manager_oauth: UserManagerMock[UserOAuthModel],
+    ):
+        user_cache: TTLCache = TTLCache()
+        user_cache.set(user_oauth.id, user_oauth)
+        user_manager_oauth.user_cache = user_cache
+
+        await user_manager_oauth.oauth_associate_callback(
+            user_oauth, "service1", "TOKEN", "new_user_oauth1", "galahad@camelot.bt"
+        )
+        assert user_cache.get(user_oauth.id) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.manager
+class TestTokenStores:
+    @pytest.fixture
+    def token_store(
+        self, user_manager: UserManagerMock[UserModel], mocker: MockerFixture
+    ):
+        token_store = mocker.MagicMock()
+        token_store.update_user_snapshots = mocker.AsyncMock()
+        token_store.destroy_user_tokens = mocker.AsyncMock(return_value=1)
+        user_manager.token_stores = [token_store]
+        return token_store
+
+    async def test_update(
+        self,
+        user: UserModel,
+        user_manager: UserManagerMock[UserModel],
+        token_store,
+    ):
+        await user_manager.update(UserUpdate(is_active=False), user)
+        token_store.update_user_snapshots.assert_awaited_once()
+        assert token_store.update_user_snapshots.await_args[0][0].is_active is False
+        token_store.destroy_user_tokens.assert_not_awaited()
+
+    async def test_update_many(
+        self,
+        user: UserModel,
+        verified_user: UserModel,
+        user_manager: UserManagerMock[UserModel],
+        token_store,
+    ):
+        await user_manager.update_many(
+            [(UserUpdate(is_active=False), user), (UserUpdate(), verified_user)]
+        )
+        assert [
+            call[0][0].id for call in token_store.update_user_snapshots.await_args_list
+        ] == [user.id, verified_user.id]
+
+    async def test_delete(
+        self,
+        user: UserModel,
+        user_manager: UserManagerMock[UserModel],
+        token_store,
+    ):
+        await user_manager.delete(user)
+        token_store.destroy_user_tokens.assert_awaited_once_with(user)
+
+    async def test_delete_many(
+        self,
+        user: UserModel,
+        verified_user: UserModel,
+        user_manager: UserManagerMock[UserModel],
+        token_store,
+    ):
+        await user_manager.delete_many([user, verified_user])
+        assert [
+            call[0][0].id for call in token_store.destroy_user_tokens.await_args_list
+        ] == [user.id, verified_user.id]
+
+    async def test_oauth_associate(
+        self,
+        user_oauth: UserOAuthModel,
+        user_manager_oauth: UserManagerMock[UserOAuthModel],
+        mocker: MockerFixture,
+    ):
+        token_store = mocker.MagicMock()
+        token_store.update_user_snapshots = mocker.AsyncMock()
+        user_manager_oauth.token_stores = [token_store]
+
+        await user_manager_oauth.oauth_associate_callback(
+            user_oauth, "service1", "TOKEN", "new_user_oauth1", "galahad@camelot.bt"
+        )
+        token_store.update_user_snapshots.assert_awaited_once()
+
+
 @pytest.mark.asyncio
 @pytest.mark.manager
 class TestAuthenticate:
@@ -713,6 +887,30 @@ class TestAuthenticate:
         assert user.email == "king.arthur@camelot.bt"
         assert update_spy.called is True
 
+    async def test_async_password_helper(
+        self,
+        create_oauth2_password_request_form: Callable[
+            [str, str], OAuth2PasswordRequestForm
+        ],
+        mock_user_db,
+    ):
+        password_helper = AsyncPasswordHelper(max_workers=1)
+        user_manager = UserManager(mock_user_db, password_helper)
+
+        form = create_oauth2_password_request_form(
+            "king.arthur@camelot.bt", "guinevere"
+        )
+        user = await user_manager.authenticate(form)
+        assert user is not None
+        assert user.email == "king.arthur@camelot.bt"
+
+        # Runs the dummy hash for unknown users in the pool as well
+        form = create_oauth2_password_request_form("lancelot@camelot.bt", "guinevere")
+        assert await user_manager.authenticate(form) is None
+
+        assert password_helper.metrics.completed == 2
+        password_helper.close()
+
 
 def test_integer_id_mixin():
     integer_id_mixin = IntegerIDMixin()
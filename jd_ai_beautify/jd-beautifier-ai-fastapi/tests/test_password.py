@@ -0,0 +1,160 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Union
+
+import pytest
+
+from fastapi_users.password import (
+    AsyncPasswordHelper,
+    AsyncPasswordHelperProtocol,
+    PasswordHelper,
+    hash_password,
+    verify_and_update_password,
+)
+
+
+class BlockingPasswordHelper(PasswordHelper):
+    """Hashes only once released, to observe queued and in-flight operations."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def hash(self, password: str) -> str:
+        self.release.wait(5)
+        return f"hashed:{password}"
+
+    def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Union[str, None]]:
+        self.release.wait(5)
+        return hashed_password == f"hashed:{plain_password}", None
+
+
+@pytest.fixture
+def async_password_helper():
+    password_helper = AsyncPasswordHelper(max_workers=2)
+    yield password_helper
+    password_helper.close()
+
+
+@pytest.mark.manager
+async def test_async_hash_and_verify(async_password_helper: AsyncPasswordHelper):
+    hashed_password = await async_password_helper.hash_async("guinevere")
+
+    (
+        verified,
+        updated_password_hash,
+    ) = await async_password_helper.verify_and_update_async(
+        "guinevere", hashed_password
+    )
+    assert verified is True
+    assert updated_password_hash is None
+
+    verified, _ = await async_password_helper.verify_and_update_async(
+        "lancelot", hashed_password
+    )
+    assert verified is False
+
+    assert async_password_helper.metrics.completed == 3
+    assert async_password_helper.metrics.in_flight == 0
+    assert async_password_helper.metrics.run_seconds > 0
+
+
+@pytest.mark.manager
+def test_async_helper_sync_methods(async_password_helper: AsyncPasswordHelper):
+    hashed_password = async_password_helper.hash("guinevere")
+    assert async_password_helper.verify_and_update("guinevere", hashed_password) == (
+        True,
+        None,
+    )
+    assert len(async_password_helper.generate()) > 0
+
+
+@pytest.mark.manager
+async def test_concurrency_limit_and_queue_depth():
+    blocking_helper = BlockingPasswordHelper()
+    password_helper = AsyncPasswordHelper(
+        blocking_helper, max_workers=4, max_concurrency=2
+    )
+
+    tasks = [
+        asyncio.create_task(password_helper.hash_async(f"password{i}"))
+        for i in range(5)
+    ]
+    await asyncio.sleep(0.05)
+    assert password_helper.metrics.in_flight == 2
+    assert password_helper.metrics.queued == 3
+    assert password_helper.metrics.max_queued == 3
+
+    blocking_helper.release.set()
+    results = await asyncio.gather(*tasks)
+    assert results == [f"hashed:password{i}" for i in range(5)]
+    assert password_helper.metrics.queued == 0
+    assert password_helper.metrics.in_flight == 0
+    assert password_helper.metrics.completed == 5
+    assert password_helper.metrics.wait_seconds > 0
+    password_helper.close()
+
+
+@pytest.mark.manager
+async def test_cancelled_while_queued():
+    blocking_helper = BlockingPasswordHelper()
+    password_helper = AsyncPasswordHelper(blocking_helper, max_workers=1)
+
+    running = asyncio.create_task(password_helper.hash_async("running"))
+    queued = asyncio.create_task(password_helper.hash_async("queued"))
+    await asyncio.sleep(0.05)
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    assert password_helper.metrics.queued == 0
+
+    blocking_helper.release.set()
+    assert await running == "hashed:running"
+    password_helper.close()
+
+
+@pytest.mark.manager
+async def test_process_pool():
+    password_helper = AsyncPasswordHelper(max_workers=1, use_processes=True)
+    try:
+        hashed_password = await password_helper.hash_async("guinevere")
+        verified, _ = await password_helper.verify_and_update_async(
+            "guinevere", hashed_password
+        )
+        assert verified is True
+    finally:
+        password_helper.close()
+
+
+@pytest.mark.manager
+async def test_external_executor_not_closed():
+    with ThreadPoolExecutor(1) as executor:
+        password_helper = AsyncPasswordHelper(executor=executor)
+        password_helper.close()
+        assert await password_helper.hash_async("guinevere")
+
+
+@pytest.mark.manager
+class TestHelpers:
+    async def test_sync_helper(self):
+        password_helper = PasswordHelper()
+        assert not isinstance(password_helper, AsyncPasswordHelperProtocol)
+
+        hashed_password = await hash_password(password_helper, "guinevere")
+        verified, _ = await verify_and_update_password(
+            password_helper, "guinevere", hashed_password
+        )
+        assert verified is True
+
+    async def test_async_helper(self, async_password_helper: AsyncPasswordHelper):
+        assert isinstance(async_password_helper, AsyncPasswordHelperProtocol)
+
+        hashed_password = await hash_password(async_password_helper, "guinevere")
+        verified, _ = await verify_and_update_password(
+            async_password_helper, "guinevere", hashed_password
+        )
+        assert verified is True
+        assert async_password_helper.metrics.completed == 2
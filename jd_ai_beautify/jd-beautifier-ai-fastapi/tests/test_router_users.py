@@ -1,4 +1,5 @@
-from typing import Any, AsyncGenerator, Dict, Tuple, cast
+import json
+from typing import Any, AsyncGenerator, Dict, List, Tuple, cast
 
 import httpx
 import pytest
@@ -7,7 +8,13 @@ from fastapi import FastAPI, status
 
 from fastapi_users.authentication import Authenticator
 from fastapi_users.router import ErrorCode, get_users_router
-from tests.conftest import User, UserModel, UserUpdate, get_mock_authentication
+from tests.conftest import (
+    User,
+    UserCreate,
+    UserModel,
+    UserUpdate,
+    get_mock_authentication,
+)
 
 
 @pytest.fixture
@@ -958,3 +965,281 @@ class TestDeleteUser:
 
         deleted_user = mock_user_db.delete.call_args[0][0]
         assert deleted_user.id == user.id
+
+
+@pytest_asyncio.fixture
+async def bulk_client(
+    get_test_client, get_user_manager, mock_authentication
+) -> AsyncGenerator[httpx.AsyncClient, None]:
+    authenticator = Authenticator([mock_authentication], get_user_manager)
+    user_router = get_users_router(
+        get_user_manager,
+        User,
+        UserUpdate,
+        authenticator,
+        bulk=True,
+        user_create_schema=UserCreate,
+        bulk_max_size=3,
+    )
+    app = FastAPI()
+    app.include_router(user_router)
+
+    async for client in get_test_client(app):
+        yield client
+
+
+def ndjson(response: httpx.Response) -> List[Dict[str, Any]]:
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.mark.router
+@pytest.mark.asyncio
+class TestBulk:
+    async def test_regular_user(self, bulk_client: httpx.AsyncClient, user: UserModel):
+        response = await bulk_client.get(
+            "/bulk", headers={"Authorization": f"Bearer {user.id}"}
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    async def test_list_users(
+        self, bulk_client: httpx.AsyncClient, superuser: UserModel
+    ):
+        headers = {"Authorization": f"Bearer {superuser.id}"}
+        response = await bulk_client.get("/bulk?limit=3", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        first_page = ndjson(response)
+        assert len(first_page) == 3
+        assert response.headers["X-Next-After"] == first_page[-1]["id"]
+
+        response = await bulk_client.get(
+            "/bulk",
+            params={"limit": 3, "after": response.headers["X-Next-After"]},
+            headers=headers,
+        )
+        second_page = ndjson(response)
+        assert len(second_page) == 2
+        assert "X-Next-After" not in response.headers
+        ids = [u["id"] for u in first_page + second_page]
+        assert ids == sorted(ids)
+
+    async def test_list_users_limit(
+        self, bulk_client: httpx.AsyncClient, superuser: UserModel
+    ):
+        response = await bulk_client.get(
+            "/bulk?limit=4", headers={"Authorization": f"Bearer {superuser.id}"}
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    async def test_list_users_invalid_after(
+        self, bulk_client: httpx.AsyncClient, superuser: UserModel
+    ):
+        response = await bulk_client.get(
+            "/bulk?after=foo", headers={"Authorization": f"Bearer {superuser.id}"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_create_users(
+        self, bulk_client: httpx.AsyncClient, superuser: UserModel, user_manager
+    ):
+        response = await bulk_client.post(
+            "/bulk",
+            json=[
+                {"email": "lancelot@camelot.bt", "password": "guinevere"},
+                {"email": "percival@avalon.bt", "password": "angharad"},
+            ],
+            headers={"Authorization": f"Bearer {superuser.id}"},
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        data = ndjson(response)
+        assert [u["email"] for u in data] == [
+            "lancelot@camelot.bt",
+            "percival@avalon.bt",
+        ]
+        assert user_manager.on_after_register.call_count == 2
+
+    async def test_create_users_existing_emails(
+        self,
+        bulk_client: httpx.AsyncClient,
+        superuser: UserModel,
+        user: UserModel,
+        user_manager,
+    ):
+        response = await bulk_client.post(
+            "/bulk",
+            json=[
+                {"email": user.email.upper(), "password": "guinevere"},
+                {"email": "lancelot@camelot.bt", "password": "guinevere"},
+                {"email": "Lancelot@camelot.bt", "password": "guinevere"},
+            ],
+            headers={"Authorization": f"Bearer {superuser.id}"},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == {
+            "code": ErrorCode.REGISTER_USER_ALREADY_EXISTS,
+            "emails": ["king.arthur@camelot.bt", "lancelot@camelot.bt"],
+        }
+        assert user_manager.on_after_register.called is False
+
+    async def test_create_users_invalid_password(
+        self, bulk_client: httpx.AsyncClient, superuser: UserModel
+    ):
+        response = await bulk_client.post(
+            "/bulk",
+            json=[
+                {"email": "lancelot@camelot.bt", "password": "guinevere"},
+                {"email": "percival@avalon.bt", "password": "g"},
+            ],
+            headers={"Authorization": f"Bearer {superuser.id}"},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == {
+            "code": ErrorCode.REGISTER_INVALID_PASSWORD,
+            "reason": "Password should be at least 3 characters",
+        }
+
+    async def test_create_too_many_users(
+        self, bulk_client: httpx.AsyncClient, superuser: UserModel
+    ):
+        response = await bulk_client.post(
+            "/bulk",
+            json=[
+                {"email": f"knight{i}@camelot.bt", "password": "guinevere"}
+                for i in range(4)
+            ],
+            headers={"Authorization": f"Bearer {superuser.id}"},
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    async def test_update_users(
+        self,
+        bulk_client: httpx.AsyncClient,
+        superuser: UserModel,
+        user: UserModel,
+        verified_user: UserModel,
+        user_manager,
+    ):
+        response = await bulk_client.patch(
+            "/bulk",
+            json=[
+                {"id": str(user.id), "is_verified": True},
+                {"id": str(verified_user.id), "email": "lancelot@camelot.bt"},
+            ],
+            headers={"Authorization": f"Bearer {superuser.id}"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = ndjson(response)
+        assert data[0]["is_verified"] is True
+        assert data[1]["email"] == "lancelot@camelot.bt"
+        assert data[1]["is_verified"] is False
+        assert user_manager.on_after_update.call_count == 2
+
+    async def test_update_users_password(
+        self,
+        bulk_client: httpx.AsyncClient,
+        superuser: UserModel,
+        user: UserModel,
+        verified_user: UserModel,
+        user_manager,
+        mocker,
+    ):
+        update_many_spy = mocker.spy(user_manager.user_db, "update_many")
+        response = await bulk_client.patch(
+            "/bulk",
+            json=[
+                {"id": str(user.id), "password": "merlin"},
+                {"id": str(verified_user.id), "password": "excalibur"},
+            ],
+            headers={"Authorization": f"Bearer {superuser.id}"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        updates = update_many_spy.call_args[0][0]
+        for (_, update_dict), password in zip(updates, ["merlin", "excalibur"]):
+            verified, _ = user_manager.password_helper.verify_and_update(
+                password, update_dict["hashed_password"]
+            )
+            assert verified is True
+
+    async def test_update_users_invalid_password(
+        self,
+        bulk_client: httpx.AsyncClient,
+        superuser: UserModel,
+        user: UserModel,
+        user_manager,
+    ):
+        response = await bulk_client.patch(
+            "/bulk",
+            json=[{"id": str(user.id), "password": "m"}],
+            headers={"Authorization": f"Bearer {superuser.id}"},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == {
+            "code": ErrorCode.UPDATE_USER_INVALID_PASSWORD,
+            "reason": "Password should be at least 3 characters",
+        }
+        assert user_manager.on_after_update.called is False
+
+    async def test_update_users_existing_email(
+        self,
+        bulk_client: httpx.AsyncClient,
+        superuser: UserModel,
+        user: UserModel,
+        verified_user: UserModel,
+    ):
+        response = await bulk_client.patch(
+            "/bulk",
+            json=[{"id": str(user.id), "email": verified_user.email}],
+            headers={"Authorization": f"Bearer {superuser.id}"},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == {
+            "code": ErrorCode.UPDATE_USER_EMAIL_ALREADY_EXISTS,
+            "emails": [verified_user.email],
+        }
+
+    async def test_update_not_existing_users(
+        self, bulk_client: httpx.AsyncClient, superuser: UserModel, user: UserModel
+    ):
+        missing_id = "d35d213e-f3d8-4f08-954a-7e0d1bea286f"
+        response = await bulk_client.patch(
+            "/bulk",
+            json=[
+                {"id": str(user.id), "is_verified": True},
+                {"id": missing_id, "is_verified": True},
+            ],
+            headers={"Authorization": f"Bearer {superuser.id}"},
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.json()["detail"] == {"ids": [missing_id]}
+
+    async def test_delete_invalid_ids(
+        self, bulk_client: httpx.AsyncClient, superuser: UserModel, user: UserModel
+    ):
+        response = await bulk_client.post(
+            "/bulk/delete",
+            json=[str(user.id), "foo"],
+            headers={"Authorization": f"Bearer {superuser.id}"},
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.json()["detail"] == {"ids": ["foo"]}
+
+    async def test_delete_users(
+        self,
+        bulk_client: httpx.AsyncClient,
+        superuser: UserModel,
+        user: UserModel,
+        inactive_user: UserModel,
+        user_manager,
+        mocker,
+    ):
+        delete_many_spy = mocker.spy(user_manager.user_db, "delete_many")
+        response = await bulk_client.post(
+            "/bulk/delete",
+            json=[str(user.id), str(inactive_user.id)],
+            headers={"Authorization": f"Bearer {superuser.id}"},
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert delete_many_spy.call_count == 1
+        assert user_manager.on_before_delete.call_count == 2
+        assert user_manager.on_after_delete.call_count == 2